@@ -0,0 +1,23 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from write_queue import WriteQueue
+
+
+class BackgroundWriter(QObject):
+    """
+    Moves the store's persistence off the UI thread.
+
+    Installs a ``WriteQueue`` on ``store`` and re-emits its callbacks as Qt
+    signals, so slots run on the UI thread: ``written(names)`` after a batch
+    reached the disk and ``failed(message)`` when it could not be written
+    (it is retried on the next save or on exit, and set aside after
+    ``MAX_ATTEMPTS`` failures).
+    """
+
+    written = pyqtSignal(list)
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        store.use_writer(WriteQueue(store.backend, self.written.emit, self.failed.emit))
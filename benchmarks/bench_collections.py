@@ -0,0 +1,108 @@
+"""
+One big library versus the same prompts split into collections.
+
+Builds two data directories with the same synthetic prompts (50 mil by
+default): a single ``prompts.json``, and five collections of a fifth each
+(the default one plus four shards under ``prompts.collections/``). Each is
+opened by a fresh process (``PROMPTS_DIR``), which reports the time and
+``tracemalloc`` peak of loading the active library, switching to another
+collection and moving one prompt between two collections, plus the files
+the move touched.
+
+    python benchmarks/bench_collections.py [quantidade]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import generate_library  # noqa: E402
+
+COLLECTIONS = 5
+
+
+def tree_state(directory):
+    """``{path: (mtime_ns, size)}`` of every file under ``directory``."""
+    state = {}
+    for path, _, names in os.walk(directory):
+        for name in names:
+            stat = os.stat(os.path.join(path, name))
+            state[os.path.relpath(os.path.join(path, name), directory)] = (stat.st_mtime_ns, stat.st_size)
+    return state
+
+
+def build_sharded(directory, count):
+    """Split a generated library into the default collection plus COLLECTIONS - 1 shards."""
+    from journal import write_snapshot
+    from prompt_collections import CollectionRegistry
+
+    generate_library(directory, count)
+    path = os.path.join(directory, "prompts.json")
+    with open(path, "r", encoding="utf-8") as file:
+        prompts = json.load(file)["prompts"]
+    size = -(-count // COLLECTIONS)
+    registry = CollectionRegistry(directory, os.path.join(directory, "prompts"))
+    write_snapshot(path, prompts[:size])
+    for number in range(1, COLLECTIONS):
+        base = registry.create(f"Coleção {number}")
+        write_snapshot(base + ".json", prompts[number * size:(number + 1) * size])
+
+
+def timed(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def worker():
+    import functions
+
+    result = {"carregar": timed(functions.load_prompts)}
+    if len(functions.list_collections()) > 1:
+        result["trocar de coleção"] = timed(lambda: functions.switch_collection("Coleção 1"))
+        name = functions.get_store().names()[0]
+        before = tree_state(functions.DATA_DIR)
+        result["mover um prompt"] = timed(lambda: functions.move_prompt(name, "Coleção 2"))
+        functions.get_store().close()
+        after = tree_state(functions.DATA_DIR)
+        result["arquivos alterados"] = sorted(path for path in after if after[path] != before.get(path))
+    json.dump(result, sys.stdout)
+
+
+def run(count):
+    print(f"{count} prompts")
+    for label, build in (("arquivo único", generate_library), (f"{COLLECTIONS} coleções", build_sharded)):
+        directory = tempfile.mkdtemp(prefix="bench_collections_")
+        try:
+            build(directory, count)
+            env = dict(os.environ, PROMPTS_DIR=directory)
+            output = subprocess.run([sys.executable, __file__, "--worker"], env=env, check=True,
+                                    capture_output=True, text=True).stdout
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        result = json.loads(output)
+        changed = result.pop("arquivos alterados", None)
+        print(f"  {label}")
+        for step, (elapsed, peak) in result.items():
+            print(f"    {step:<20} {elapsed:8.1f} ms   pico {peak / 2 ** 20:7.1f} MB")
+        if changed is not None:
+            print(f"    arquivos alterados pela movimentação: {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        worker()
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
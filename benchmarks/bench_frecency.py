@@ -0,0 +1,89 @@
+"""
+Cost of one use (copy) with the main selector ordered by frecency.
+
+Loads a synthetic library (20 mil prompts by default) into a ``PromptStore``
+with its usage file, puts the main selector's model and proxy on top
+(``QT_QPA_PLATFORM=offscreen``), ordered by frecency with the most used
+prompts pinned, and replays uses drawn from a Zipf-like distribution (a
+few prompts get most of the uses). Reports the time of one full sort of
+the selector (what every use would cost with a full re-sort), the
+p50/p95/max of one use (counter update plus the proxy
+moving the rows that changed) and the files written per 1000 uses.
+
+    python benchmarks/bench_frecency.py [quantidade] [--uses N]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import generate_library, percentile  # noqa: E402
+
+
+def run(count, uses):
+    from PyQt6.QtWidgets import QApplication
+    import instrumentation
+    from prompt_store import PromptStore
+    from usage_stats import UsageStats
+    from prompt_model import PromptListModel, PromptFilterProxyModel
+
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    directory = tempfile.mkdtemp(prefix="bench_frecency_")
+    try:
+        generate_library(directory, count)
+        base = os.path.join(directory, "prompts")
+        store = PromptStore(base + ".json", usage=UsageStats(base + ".usage.json"))
+        model = PromptListModel(store)
+        frecency = store.key_function("frecency")
+        proxy = PromptFilterProxyModel(model, sort_key=frecency, pinned=store.usage.pinned)
+
+        def full_sort():
+            start = time.perf_counter()
+            proxy.set_sort_key(frecency)
+            return (time.perf_counter() - start) * 1000
+
+        full_sort()
+
+        # Poucos prompts concentram a maioria dos usos
+        rng = random.Random(42)
+        names = store.names()
+        weights = [1 / (rank + 1) for rank in range(len(names))]
+        picks = rng.choices(names, weights, k=uses)
+
+        counters = instrumentation.snapshot()["counters"]
+        writes = counters.get("arquivo.gravacoes", 0)
+        latencies = []
+        for name in picks:
+            start = time.perf_counter()
+            store.touch(name)
+            latencies.append((time.perf_counter() - start) * 1000)
+        writes = instrumentation.snapshot()["counters"].get("arquivo.gravacoes", 0) - writes
+        sort_ms = full_sort()  # Com pontuações: o que cada uso custaria reordenando tudo
+        store.close()
+
+        top = [proxy.index(row, 0).data() for row in range(1, 4)]
+        expected = sorted(set(picks), key=store.usage.score, reverse=True)[:3]
+        print(f"{count} prompts, {uses} usos")
+        print(f"  ordenação completa do seletor: {sort_ms:.1f} ms")
+        print(f"  por uso: p50 {percentile(latencies, 0.5):.3f} ms | p95 {percentile(latencies, 0.95):.3f} ms"
+              f" | máx {max(latencies):.3f} ms")
+        print(f"  gravações a cada 1000 usos: {writes * 1000 / uses:.0f} (só {os.path.basename(base)}.usage.json)")
+        print(f"  topo do seletor confere com as pontuações: {top == expected}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("count", nargs="?", type=int, default=20_000)
+    parser.add_argument("--uses", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.count, args.uses)
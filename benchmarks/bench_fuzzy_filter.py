@@ -0,0 +1,125 @@
+"""
+Per-keystroke latency of the type-to-filter search.
+
+Builds a trigram index over a synthetic library and replays typing a few
+queries one character at a time, reporting p50/p95/max per keystroke.
+Then does the same in the main window (``QT_QPA_PLATFORM=offscreen``) over
+a generated library of the largest size: each keystroke in the filter box
+runs the search, the selector proxy update, the combo box refresh and the
+repaint. Clearing the box is timed too. Target: under one frame (~16 ms)
+at 50k prompts.
+
+    python benchmarks/bench_fuzzy_filter.py [quantidade ...]
+"""
+import os
+import gc
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fuzzy_index import TrigramIndex  # noqa: E402
+from bench_suite import generate_library, percentile  # noqa: E402
+
+WORDS = [
+    "transcrição", "oitiva", "síntese", "boletim", "ocorrência", "laudo", "pericial",
+    "relato", "declaração", "preliminar", "adequação", "fato", "típico", "conclusão",
+    "indiciamento", "portaria", "relatório", "depoimento", "testemunha", "vítima",
+    "investigado", "inquérito", "despacho", "ofício", "mandado", "audiência",
+]
+QUERIES = ["transcricao oitiva", "laudo peri", "sintese bo", "depoimneto testemunha", "portaria 12"]
+FRAME_MS = 16.0
+
+
+def synthetic_names(count, seed=42):
+    rng = random.Random(seed)
+    return [
+        f"{' '.join(rng.sample(WORDS, rng.randint(2, 4))).upper()} {i}"
+        for i in range(count)
+    ]
+
+
+def run(count):
+    names = synthetic_names(count)
+    index = TrigramIndex()
+
+    start = time.perf_counter()
+    for name in names:
+        index.add(name)
+    build_ms = (time.perf_counter() - start) * 1000
+    gc.collect()  # Não atribui a coleta da construção à primeira tecla
+
+    latencies = []
+    for query in QUERIES:
+        for end in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:end], limit=200)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Atualização incremental (salvar um prompt) versus reconstrução completa
+    start = time.perf_counter()
+    index.add("NOVO PROMPT DE TESTE")
+    index.remove("NOVO PROMPT DE TESTE")
+    update_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{count} prompts: índice em {build_ms:.0f} ms, atualização incremental {update_ms:.3f} ms")
+    report("por tecla (só a busca)", latencies)
+
+
+def report(label, latencies):
+    p50, p95, worst = percentile(latencies, 0.5), percentile(latencies, 0.95), max(latencies)
+    print(f"  {label}: p50 {p50:.2f} ms | p95 {p95:.2f} ms | máx {worst:.2f} ms "
+          f"({'OK' if p95 < FRAME_MS else 'ACIMA'} do orçamento de {FRAME_MS:.0f} ms)")
+
+
+def run_window(count):
+    """Keystrokes in the main window's filter box, end to end."""
+    directory = tempfile.mkdtemp(prefix="bench_fuzzy_")
+    try:
+        generate_library(directory, count)
+        os.environ["PROMPTS_DIR"] = directory  # Lido na importação de functions
+        os.environ["PROMPTS_SINGLE_INSTANCE"] = "0"
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        from PyQt6.QtWidgets import QApplication
+        import functions
+        import main
+
+        app = QApplication.instance() or QApplication(sys.argv)
+        window = main.PromptManagerApp()
+        window.show()
+        start = time.perf_counter()
+        while not functions.warm_search_index(0):  # A janela constrói o índice entre eventos
+            app.processEvents()
+        warm_ms = (time.perf_counter() - start) * 1000
+        gc.collect()
+
+        def keystroke(text):
+            start = time.perf_counter()
+            window.filter_entry.setText(text)
+            app.processEvents()  # Atualização do combo e repintura
+            return (time.perf_counter() - start) * 1000
+
+        latencies, clears = [], []
+        for query in QUERIES:
+            latencies += [keystroke(query[:end]) for end in range(1, len(query) + 1)]
+            clears.append(keystroke(""))
+
+        print(f"{count} prompts na janela: índice construído entre eventos em {warm_ms:.0f} ms")
+        report("por tecla (busca + proxy + combo)", latencies)
+        report("limpar o filtro", clears)
+        window.close()
+        functions.get_store().close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000]
+    for size in sizes:
+        run(size)
+    run_window(max(sizes))
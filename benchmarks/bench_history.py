@@ -0,0 +1,78 @@
+"""
+Revision history after thousands of edits.
+
+Applies random edits (a word inserted, a sentence removed or added) to the
+longest prompt of ``prompts.json`` and records every one in a ``HistoryStore``
+in a temporary directory. Reports the log size against the full contents
+it can rebuild, the time per recorded revision and the time to rebuild a
+random revision from a cold store (log read from disk, no cache).
+
+    python benchmarks/bench_history.py [edições]
+"""
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore, split_pieces  # noqa: E402
+
+WORDS = ("o a de que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele "
+         "das tem à seu sua ou ser quando muito há nos já está também só pelo pela até isso ela").split()
+REBUILD_SAMPLES = 100
+
+
+def edit(content, rng):
+    pieces = split_pieces(content)
+    index = rng.randrange(len(pieces))
+    roll = rng.random()
+    if roll < 0.5:
+        pieces[index] = pieces[index].replace(" ", f" {rng.choice(WORDS)} ", 1)
+    elif roll < 0.7 and len(pieces) > 3:
+        del pieces[index]
+    else:
+        pieces.insert(index, " ".join(rng.choice(WORDS) for _ in range(8)) + ". ")
+    return "".join(pieces)
+
+
+def run(edits):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "prompts.json"), "r", encoding="utf-8") as file:
+        content = max((prompt["content"] for prompt in json.load(file)["prompts"]), key=len)
+    rng = random.Random(5)
+
+    with tempfile.TemporaryDirectory() as directory:
+        history = HistoryStore(directory)
+        versions = [content]
+        history.record("P", content)
+        start = time.perf_counter()
+        for _ in range(edits):
+            content = edit(content, rng)
+            if history.record("P", content):
+                versions.append(content)
+        write_ms = (time.perf_counter() - start) * 1000 / edits
+
+        stored = os.path.getsize(history.path_for("P"))
+        full = sum(len(version.encode("utf-8")) for version in versions)
+        cold = HistoryStore(directory)
+        samples = rng.sample(range(1, len(versions) + 1), min(REBUILD_SAMPLES, len(versions)))
+        start = time.perf_counter()
+        for rev in samples:
+            assert cold.content_at("P", rev) == versions[rev - 1], rev
+        rebuild_ms = (time.perf_counter() - start) * 1000 / len(samples)
+        start = time.perf_counter()
+        listed = len(cold.revisions("P"))
+        list_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{listed} revisões de um prompt de ~{len(content)} caracteres")
+    print(f"  histórico   {stored / 1024:8.0f} KB para {full / 1024:8.0f} KB de conteúdo ({stored / full:.1%})")
+    print(f"  gravação    {write_ms:8.2f} ms por revisão")
+    print(f"  reconstruir {rebuild_ms:8.2f} ms por revisão (arquivo lido a cada vez)")
+    print(f"  listar      {list_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
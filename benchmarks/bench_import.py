@@ -0,0 +1,111 @@
+"""
+Bulk import of a large library (100 mil prompts by default).
+
+Generates the synthetic library of ``bench_suite`` as JSON and as JSONL and
+imports it into an empty library, each run in a fresh process pointed at a
+temporary ``PROMPTS_DIR``:
+
+* ``save_prompt_to_file`` por registro: ``json.load`` of the whole input
+  and one save per record, the only way before ``import``. It is measured
+  on the first ``--sample`` records and extrapolated;
+* ``import_prompts``: streaming reader, hash-index conflict check and one
+  batched write, for JSON and JSONL.
+
+Reports the time, the ``tracemalloc`` peak and the storage writes
+(``arquivo.gravacoes``). A second import of the same file shows the cost of
+recognising every record as identical.
+
+    python benchmarks/bench_import.py [quantidade] [--sample N]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import generate_library  # noqa: E402
+
+
+def timed(func):
+    import instrumentation
+
+    writes = instrumentation.snapshot()["counters"].get("arquivo.gravacoes", 0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, instrumentation.snapshot()["counters"].get("arquivo.gravacoes", 0) - writes
+
+
+def worker(mode, source, sample):
+    import functions
+
+    functions.initialize_prompts_file()
+    if mode == "por registro":
+        def run():
+            with open(source, "r", encoding="utf-8") as file:
+                prompts = json.load(file)["prompts"]
+            for prompt in prompts[:sample]:
+                functions.save_prompt_to_file(prompt["name"], prompt["content"], prompt["color"])
+        result = {"importar": timed(run)}
+    else:
+        result = {"importar": timed(lambda: functions.import_prompts(source))}
+        result["reimportar (tudo igual)"] = timed(lambda: functions.import_prompts(source))
+    json.dump(result, sys.stdout)
+
+
+def run(count, sample):
+    from library_io import read_prompts, write_prompts
+
+    source_dir = tempfile.mkdtemp(prefix="bench_import_")
+    try:
+        generate_library(source_dir, count)
+        json_path = os.path.join(source_dir, "prompts.json")
+        jsonl_path = os.path.join(source_dir, "prompts.jsonl")
+        write_prompts(read_prompts(json_path), jsonl_path)
+        print(f"{count} prompts ({os.path.getsize(json_path) / 2 ** 20:.0f} MB em JSON)")
+
+        for label, mode, source in (
+            (f"save_prompt_to_file por registro ({sample}, extrapolado)", "por registro", json_path),
+            ("import_prompts JSON", "import", json_path),
+            ("import_prompts JSONL", "import", jsonl_path),
+        ):
+            data_dir = tempfile.mkdtemp(prefix="bench_import_data_")
+            try:
+                env = dict(os.environ, PROMPTS_DIR=data_dir)
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, source, str(sample)],
+                    env=env, check=True, capture_output=True, text=True,
+                ).stdout
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+            print(f"  {label}")
+            for step, (elapsed, peak, writes) in json.loads(output).items():
+                if mode == "por registro":
+                    elapsed, writes = elapsed * count / sample, writes * count // sample
+                print(f"    {step:<24} {elapsed:8.2f} s   pico {peak / 2 ** 20:7.1f} MB   {writes:7d} gravações")
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        _, _, mode, source, sample = sys.argv
+        worker(mode, source, int(sample))
+    else:
+        parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+        parser.add_argument("count", nargs="?", type=int, default=100_000)
+        parser.add_argument("--sample", type=int, default=2000,
+                            help="Registros gravados um a um no caminho antigo")
+        args = parser.parse_args()
+        run(args.count, args.sample)
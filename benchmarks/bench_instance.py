@@ -0,0 +1,109 @@
+"""
+Command-to-clipboard time with a resident instance versus a cold start.
+
+Starts ``main.py`` (``QT_QPA_PLATFORM=offscreen``) on a synthetic library
+(5 mil prompts by default) in a temporary ``PROMPTS_DIR`` and reports:
+
+* cold start: launch until the new instance answers on its local socket
+  (Python + PyQt6 + library load + window), what every copy used to cost;
+* round trip: one ``copy`` request sent from this process (socket,
+  template rendering and clipboard in the resident instance);
+* hand-over: ``echo texto | python main.py --copy NOME`` and
+  ``python cli.py copy NOME`` as separate processes, next to an empty
+  ``python -c pass`` (interpreter start alone).
+
+The first instance is then killed without cleaning up, and a second one
+must recover its stale socket.
+
+    python benchmarks/bench_instance.py [quantidade] [--runs N]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import single_instance  # noqa: E402
+from bench_suite import generate_library, percentile  # noqa: E402
+
+
+def start_resident(env, timeout=60):
+    """Launch main.py and wait until it answers; returns (process, seconds)."""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    while single_instance.send_request({"cmd": "ping"}) is None:
+        if process.poll() is not None or time.perf_counter() - start > timeout:
+            raise SystemExit("A instância residente não subiu.")
+        time.sleep(0.005)
+    return process, time.perf_counter() - start
+
+
+def timed_process(command, env, text):
+    start = time.perf_counter()
+    subprocess.run(command, env=env, input=text, check=True, capture_output=True, text=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(count, runs):
+    directory = tempfile.mkdtemp(prefix="bench_instance_")
+    os.environ["PROMPTS_DIR"] = directory  # single_instance deriva o nome do servidor daqui
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    process = None
+    try:
+        generate_library(directory, count)
+        from functions import get_store
+
+        name = get_store().names()[0]
+        text = "Texto do usuário. " * 50
+
+        process, cold = start_resident(env)
+        request = {"cmd": "copy", "name": name, "text": text}
+        round_trips = []
+        for _ in range(runs * 5):
+            start = time.perf_counter()
+            reply = single_instance.send_request(request)
+            round_trips.append((time.perf_counter() - start) * 1000)
+            assert reply["ok"], reply
+
+        commands = {
+            "python -c pass": [sys.executable, "-c", "pass"],
+            "main.py --copy": [sys.executable, os.path.join(ROOT, "main.py"), "--copy", name],
+            "cli.py copy": [sys.executable, os.path.join(ROOT, "cli.py"), "copy", name],
+        }
+        launches = {label: [timed_process(command, env, text) for _ in range(runs)]
+                    for label, command in commands.items()}
+
+        # Queda: o socket fica para trás e a próxima instância precisa reaproveitá-lo
+        process.kill()
+        process.wait()
+        process, recovered = start_resident(env)
+
+        print(f"{count} prompts")
+        print(f"  partida a frio até responder:   {cold * 1000:8.0f} ms")
+        print(f"  ida e volta (copy):             {percentile(round_trips, 0.5):8.1f} ms p50"
+              f" | {percentile(round_trips, 0.95):.1f} ms p95")
+        for label, times in launches.items():
+            print(f"  {label:<30}  {percentile(times, 0.5):8.0f} ms p50")
+        print(f"  após queda (socket antigo):     {recovered * 1000:8.0f} ms até responder")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+            if os.path.exists(single_instance.server_address()):
+                os.remove(single_instance.server_address())  # Terminada sem passar pelo aboutToQuit
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("count", nargs="?", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.count, args.runs)
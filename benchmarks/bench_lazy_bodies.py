@@ -0,0 +1,77 @@
+"""
+Resident memory and latency of lazy prompt bodies (``PROMPTS_BACKEND=chunks``).
+
+Loads the same synthetic library through the JSON journal backend (every
+body in memory) and through the chunk store (metadata only, bodies read via
+``mmap`` on demand) and reports load time, memory still allocated after the
+load (``tracemalloc``) and the cost of reading a body cold and from the LRU.
+
+    python benchmarks/bench_lazy_bodies.py [quantidade]
+"""
+import os
+import gc
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import generate_library  # noqa: E402
+from journal import JournalBackend  # noqa: E402
+from chunk_store import ChunkBackend, migrate_json_to_chunks  # noqa: E402
+from prompt_store import PromptStore  # noqa: E402
+
+
+def load_store(path, backend):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = PromptStore(path, backend)
+    store.all()
+    elapsed = (time.perf_counter() - start) * 1000
+    gc.collect()
+    resident = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, elapsed, resident
+
+
+def body_latency(store, names):
+    start = time.perf_counter()
+    for name in names:
+        store.content(name)
+    cold = (time.perf_counter() - start) * 1000 / len(names)
+    start = time.perf_counter()
+    for name in names:
+        store.content(name)
+    cached = (time.perf_counter() - start) * 1000 / len(names)
+    return cold, cached
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as directory:
+        generate_library(directory, count)
+        json_path = os.path.join(directory, "prompts.json")
+        chunks_dir = os.path.join(directory, "prompts.store")
+        migrate_json_to_chunks(json_path, chunks_dir)
+        body_bytes = os.path.getsize(json_path)
+
+        rows = []
+        for label, backend in (("journal (conteúdo residente)", JournalBackend(json_path)),
+                               ("trechos + mmap (sob demanda)", ChunkBackend(chunks_dir))):
+            store, load_ms, resident = load_store(json_path, backend)
+            names = random.Random(1).sample(store.names(), 20)
+            cold, cached = body_latency(store, names)
+            rows.append((label, load_ms, resident, cold, cached))
+            store.close()
+            del store
+
+    print(f"{count} prompts ({body_bytes / 1e6:.1f} MB em JSON legado)")
+    for label, load_ms, resident, cold, cached in rows:
+        print(f"  {label:30s} carga {load_ms:8.1f} ms, memória {resident / 1e6:7.1f} MB "
+              f"({resident / count:6.0f} B/prompt), conteúdo frio {cold:.3f} ms, em cache {cached:.4f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,95 @@
+"""
+Per-prompt memory footprint: plain dicts versus ``Prompt`` records.
+
+Parses the same synthetic library twice and keeps it resident the way the
+store does: once as the dicts ``json.load`` produces (what the store held
+before ``prompt_record``; every colour is its own string) and once as
+``__slots__`` ``Prompt`` records sharing interned ``PromptColor`` values.
+Reports memory still allocated afterwards (``tracemalloc``), in total and
+without the name/content strings, which both layouts keep as they are.
+
+The synthetic library gives every prompt its own random colour (the worst
+case for interning); the second pass recolours it from a small palette, as
+real libraries are.
+
+    python benchmarks/bench_prompt_memory.py [quantidade]
+"""
+import os
+import gc
+import sys
+import json
+import random
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_suite import generate_library  # noqa: E402
+from journal import DEFAULT_COLOR  # noqa: E402
+from prompt_record import Prompt  # noqa: E402
+
+PALETTE_SIZE = 16  # Cores distintas na segunda passada
+
+
+def as_dicts(text):
+    prompts = json.loads(text)["prompts"]
+    for prompt in prompts:
+        prompt.setdefault("color", DEFAULT_COLOR)
+    return prompts, {prompt["name"]: prompt for prompt in prompts}
+
+
+def as_records(text):
+    prompts = [Prompt.from_dict(data) for data in json.loads(text)["prompts"]]
+    return prompts, {prompt.name: prompt for prompt in prompts}
+
+
+def recolor(text, size=PALETTE_SIZE, seed=7):
+    rng = random.Random(seed)
+    palette = [f"#{rng.randrange(0x1000000):06X}" for _ in range(size)]
+    data = json.loads(text)
+    for prompt in data["prompts"]:
+        prompt["color"] = rng.choice(palette)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def resident(build, text):
+    """Bytes allocated by ``build(text)`` that are still alive once it returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(text)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def compare(text, count, title):
+    rows = []
+    for label, build in (("dicionários (antes)", as_dicts), ("Prompt com __slots__ (depois)", as_records)):
+        (prompts, index), size = resident(build, text)
+        first = prompts[0]
+        name_of = (lambda p: p["name"]) if isinstance(first, dict) else (lambda p: p.name)
+        content_of = (lambda p: p["content"]) if isinstance(first, dict) else (lambda p: p.content)
+        strings = sum(sys.getsizeof(name_of(p)) + sys.getsizeof(content_of(p)) for p in prompts)
+        rows.append((label, size, size - strings))
+        del prompts, index, first
+
+    print(f"{count} prompts, {title}")
+    for label, size, overhead in rows:
+        print(f"  {label:30s} {size / 1e6:7.2f} MB  {size / count:7.0f} B/prompt  "
+              f"(sem nome/conteúdo: {overhead / count:5.0f} B/prompt)")
+    before, after = rows[0][2], rows[1][2]
+    print(f"  estrutura por prompt: {before / count:.0f} -> {after / count:.0f} B ({after / before:.0%})")
+
+
+def run(count):
+    with tempfile.TemporaryDirectory() as directory:
+        generate_library(directory, count)
+        with open(os.path.join(directory, "prompts.json"), "r", encoding="utf-8") as file:
+            text = file.read()
+    compare(text, count, "uma cor aleatória por prompt")
+    compare(recolor(text), count, f"paleta de {PALETTE_SIZE} cores")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,57 @@
+"""
+CPU cost of the status message animation (offscreen Qt platform).
+
+Simulates a burst of rapid clicks (many ``show_status`` calls), then measures
+process CPU time while the burst animates and afterwards while the window is
+idle. Idle CPU should be ~0 once the message has faded out.
+
+    python benchmarks/bench_status_animation.py [cliques]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+
+def spin(milliseconds):
+    loop = QEventLoop()
+    QTimer.singleShot(milliseconds, loop.quit)
+    loop.exec()
+
+
+def cpu_during(milliseconds):
+    start = time.process_time()
+    spin(milliseconds)
+    return (time.process_time() - start) * 1000
+
+
+def run(clicks):
+    import main
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = main.PromptManagerApp()
+    window.show()
+    spin(200)  # Primeira pintura e tarefas adiadas
+
+    start = time.process_time()
+    for click in range(clicks):
+        window.show_status("O texto foi copiado para a área de transferência!", tipo="success")
+        spin(20)  # ~50 cliques por segundo
+    burst_ms = (time.process_time() - start) * 1000
+
+    after_burst_ms = cpu_during(3000)
+    idle_ms = cpu_during(2000)
+
+    print(f"{clicks} cliques: CPU durante a rajada {burst_ms:.0f} ms, "
+          f"nos 3 s seguintes {after_burst_ms:.0f} ms, ociosa por 2 s {idle_ms:.0f} ms")
+    window.close()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
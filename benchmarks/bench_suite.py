@@ -0,0 +1,337 @@
+"""
+End-to-end benchmark suite (headless, ``offscreen`` Qt platform).
+
+For each library size a synthetic ``prompts.json`` is generated from the
+bundled prompts (long, realistic bodies) in a temporary directory and the
+application is pointed at it through ``PROMPTS_DIR``. Each size runs in its
+own process, so memory numbers do not leak between sizes. Measured:
+
+* ``load_prompts`` (cold: parse + index), ``save_prompt_to_file`` (update and
+  insert), ``delete_prompt``
+* ``sort_prompts_by_color_similarity`` (cold and cached sort keys)
+* selector population: shared model + colour-sorted proxy into a ``QComboBox``
+  (what the main tab does at startup), and switching the main selector's
+  ordering once the sort keys are cached
+* ``copy_to_clipboard_action`` end to end
+* rendering a template into a 5 MB transcript (``get_template`` + ``render``)
+* cold startup of ``main()`` until the first paint (separate interpreter),
+  also on a large library (``STARTUP_SIZES``) where the prompt selectors
+  hold tens of thousands of rows
+
+Times are the median of the repetitions; peak memory is the ``tracemalloc``
+peak of one extra run (and peak RSS for the startup process). Results go to a
+JSON file, one per commit by default, for comparison across commits:
+
+    python benchmarks/bench_suite.py [--sizes 100 10000 100000] [--output ARQ]
+    python benchmarks/bench_suite.py --compare ANTIGO.json NOVO.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_SIZES = [100, 10_000, 100_000]
+# Inicialização também medida nestes tamanhos (biblioteca grande: seletores com dezenas de milhares de linhas)
+STARTUP_SIZES = [50_000]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+WORKER_FLAG = "--worker"
+
+
+# ---------------------------------------------------------------------- #
+# Biblioteca sintética
+# ---------------------------------------------------------------------- #
+def generate_library(directory, count, seed=42):
+    """Write ``count`` prompts derived from the bundled ``prompts.json`` into ``directory``."""
+    with open(os.path.join(ROOT, "prompts.json"), "r", encoding="utf-8") as file:
+        samples = json.load(file)["prompts"]
+    rng = random.Random(seed)
+    words = sorted({word for sample in samples for word in sample["name"].split() if len(word) > 2})
+
+    prompts = []
+    for i in range(count):
+        sample = rng.choice(samples)
+        paragraphs = sample["content"].split("\n")
+        rng.shuffle(paragraphs)
+        prompts.append({
+            "name": f"{' '.join(rng.sample(words, min(len(words), rng.randint(2, 4))))} {i}",
+            "content": "\n".join(paragraphs) + f"\n\nVariação {i}.",
+            "color": f"#{rng.randrange(0x1000000):06X}",
+        })
+
+    with open(os.path.join(directory, "prompts.json"), "w", encoding="utf-8") as file:
+        json.dump({"prompts": prompts}, file, ensure_ascii=False, indent=4)
+
+
+# ---------------------------------------------------------------------- #
+# Medição (processo de trabalho, um por tamanho)
+# ---------------------------------------------------------------------- #
+def percentile(values, fraction):
+    """Value at ``fraction`` (0.5 = median, 0.95 = p95) of ``values``."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(func, repeat=5, setup=None):
+    """Median wall time (ms) over ``repeat`` runs and ``tracemalloc`` peak (KiB) of one more."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"ms": round(statistics.median(times), 3), "peak_kib": round(peak / 1024, 1), "repeat": repeat}
+
+
+def run_worker(size):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtWidgets import QApplication, QComboBox
+
+    import functions
+    import main
+    from prompt_model import PromptListModel, PromptFilterProxyModel
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    repeat = 5 if size <= 10_000 else 3
+
+    def reset_store():
+        functions._store = None
+        functions._search_index = None
+
+    results["load_prompts"] = measure(functions.load_prompts, repeat, setup=reset_store)
+    store = functions.get_store()
+    names = store.names()
+    rng = random.Random(7)
+
+    def save_update():
+        name = rng.choice(names)
+        functions.save_prompt_to_file(name, store.content(name) + " ", store.get(name).color, name)
+
+    counter = iter(range(10 ** 9))
+    inserted = []
+
+    def save_insert():
+        name = f"BENCH NOVO {next(counter)}"
+        functions.save_prompt_to_file(name, "conteúdo de teste " * 50, "#336699")
+        inserted.append(name)
+
+    def delete():
+        functions.delete_prompt(inserted.pop())
+
+    results["save_prompt_to_file (atualizar)"] = measure(save_update, 20)
+    results["save_prompt_to_file (inserir)"] = measure(save_insert, 20)
+    results["delete_prompt"] = measure(delete, 20)
+
+    window = main.PromptManagerApp()
+    prompts = store.all()
+
+    def clear_sort_keys():
+        store._forget_sort_keys()
+
+    results["sort_prompts_by_color_similarity (frio)"] = measure(
+        lambda: window.sort_prompts_by_color_similarity(prompts), repeat, setup=clear_sort_keys)
+    results["sort_prompts_by_color_similarity (cache)"] = measure(
+        lambda: window.sort_prompts_by_color_similarity(prompts), repeat)
+
+    def populate_selector():
+        model = PromptListModel(store)
+        proxy = PromptFilterProxyModel(model, window.ordering_key("color"))
+        combo = QComboBox()
+        combo.setModel(proxy)
+        combo.count()
+        combo.deleteLater()
+
+    results["populate_selector"] = measure(populate_selector, repeat)
+
+    orderings = ["alpha", "color"]
+    for ordering in orderings:
+        window.main_proxy.set_sort_key(window.ordering_key(ordering))  # Chaves em cache
+
+    def switch_ordering():
+        orderings.reverse()
+        window.main_proxy.set_sort_key(window.ordering_key(orderings[0]))
+
+    results["trocar ordenação (cache)"] = measure(switch_ordering, repeat)
+
+    window.text_box.setPlainText("Texto do usuário para o benchmark.")
+    window.selector.setCurrentIndex(1)
+
+    def copy():
+        window.copy_to_clipboard_action()
+        app.processEvents()
+
+    results["copy_to_clipboard_action"] = measure(copy, 20)
+
+    template_name = "BENCH MODELO"
+    template_body = store.content(names[0]) + "\n\nDeclarante: {{nome}}, processo {{processo|s/n}}.\n{{texto}}\n"
+    functions.save_prompt_to_file(template_name, template_body, "#336699")
+    transcript = "Transcrição de teste com alguma fala.\n" * (5 * 2 ** 20 // 38)
+    values = {"nome": "Fulano de Tal"}
+    results["modelo 5 MB"] = measure(
+        lambda: functions.get_template(template_name).render(transcript, values), repeat)
+
+    window.close()
+    store.close()
+    return results
+
+
+def measure_startup(data_dir, repeat):
+    """Cold start of ``main.py`` until the first paint, in fresh interpreters."""
+    import startup_report
+
+    probe = (
+        "import runpy, sys\n"
+        "sys.argv = [sys.argv[1], sys.argv[2]]\n"
+        "try:\n"
+        "    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "try:\n"
+        "    import resource\n"
+        "    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "    print('PEAK_RSS_KIB', rss // 1024 if sys.platform == 'darwin' else rss)\n"
+        "except ImportError:\n"
+        "    pass\n"
+    )
+    times, peaks = [], []
+    for _ in range(repeat):
+        env = dict(os.environ, PROMPTS_DIR=data_dir, QT_QPA_PLATFORM="offscreen",
+                   **{startup_report.T0_ENV: repr(time.time())})
+        result = subprocess.run(
+            [sys.executable, "-c", probe, os.path.join(ROOT, "main.py"), startup_report.CHILD_FLAG],
+            capture_output=True, text=True, env=env, encoding="utf-8", errors="replace",
+            cwd=ROOT,  # Com -c, os imports do main.py são resolvidos a partir do diretório atual
+        )
+        for line in result.stdout.splitlines():
+            if line.startswith(startup_report.MILESTONE_PREFIX):
+                milestones = dict(json.loads(line[len(startup_report.MILESTONE_PREFIX):]))
+                times.append(milestones["primeira pintura"] * 1000)
+            elif line.startswith("PEAK_RSS_KIB"):
+                peaks.append(int(line.split()[1]))
+        if not times:
+            raise RuntimeError(f"Inicialização falhou:\n{result.stderr[-2000:]}")
+
+    return {
+        "ms": round(statistics.median(times), 3),
+        "peak_rss_kib": max(peaks) if peaks else None,
+        "repeat": repeat,
+    }
+
+
+# ---------------------------------------------------------------------- #
+# Orquestração e resultados
+# ---------------------------------------------------------------------- #
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecido"
+
+
+def run_suite(sizes, output, startup_repeat, startup_sizes=STARTUP_SIZES):
+    report = {
+        "revision": git_revision(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": {},
+    }
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"prompts-bench-{size}-") as data_dir:
+            generate_library(data_dir, size)
+            env = dict(os.environ, PROMPTS_DIR=data_dir, QT_QPA_PLATFORM="offscreen")
+            worker = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), WORKER_FLAG, str(size)],
+                capture_output=True, text=True, env=env, encoding="utf-8", errors="replace",
+            )
+            if worker.returncode != 0:
+                raise RuntimeError(f"Benchmark de {size} prompts falhou:\n{worker.stderr[-2000:]}")
+            results = json.loads(worker.stdout.strip().splitlines()[-1])
+            results["startup (main até a 1ª pintura)"] = measure_startup(data_dir, startup_repeat)
+        report["sizes"][str(size)] = results
+        print_results(size, results)
+
+    for size in startup_sizes:
+        if size in sizes:
+            continue  # Já medida junto com o resto
+        with tempfile.TemporaryDirectory(prefix=f"prompts-bench-{size}-") as data_dir:
+            generate_library(data_dir, size)
+            results = {"startup (main até a 1ª pintura)": measure_startup(data_dir, startup_repeat)}
+        report["sizes"][str(size)] = results
+        print_results(size, results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {output}")
+
+
+def print_results(size, results):
+    print(f"== {size} prompts ==")
+    for name, result in results.items():
+        peak = result.get("peak_kib", result.get("peak_rss_kib"))
+        unit = "KiB (tracemalloc)" if "peak_kib" in result else "KiB (RSS)"
+        print(f"  {result['ms']:10.2f} ms  {peak if peak is not None else '-':>10} {unit}  {name}")
+
+
+def compare(old_path, new_path):
+    with open(old_path, "r", encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, "r", encoding="utf-8") as file:
+        new = json.load(file)
+
+    print(f"{old['revision']} -> {new['revision']}")
+    for size, results in new["sizes"].items():
+        print(f"== {size} prompts ==")
+        for name, result in results.items():
+            before = old["sizes"].get(size, {}).get(name)
+            if before is None:
+                print(f"  {'':>10}    {result['ms']:10.2f} ms           {name}")
+                continue
+            change = (result["ms"] - before["ms"]) / before["ms"] * 100 if before["ms"] else 0.0
+            print(f"  {before['ms']:10.2f} -> {result['ms']:10.2f} ms  {change:+7.1f}%  {name}")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == WORKER_FLAG:
+        print(json.dumps(run_worker(int(sys.argv[2]))))
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmarks de armazenamento, seletores e inicialização")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--output", help="Arquivo JSON de resultados (padrão: benchmarks/results/<commit>.json)")
+    parser.add_argument("--startup-repeat", type=int, default=3)
+    parser.add_argument("--startup-sizes", type=int, nargs="*", default=STARTUP_SIZES,
+                        help="Tamanhos em que só a inicialização é medida")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTIGO", "NOVO"), help="Compara dois arquivos de resultados")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    output = args.output or os.path.join(RESULTS_DIR, f"{git_revision()}.json")
+    run_suite(args.sizes, output, args.startup_repeat, args.startup_sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Loading and composing a large transcript (offscreen Qt platform).
+
+Writes a synthetic transcript (20 MB by default) and compares two paths
+through the main window:
+
+* colar: the whole text goes into the editor with ``setPlainText`` (like a
+  paste into the old ``QTextEdit``) and is read back with
+  ``toPlainText().strip()`` and composed with an f-string;
+* arquivo: ``open_transcript`` reads it in chunks on a pool thread, the editor
+  only shows the preview and the copy composes from the loaded string.
+
+Reports the longest event-loop stall (a 10 ms heartbeat timer), total load
+time, composition time and its ``tracemalloc`` peak.
+
+    python benchmarks/bench_transcript.py [MB]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+LINE = "DECLARANTE: que no dia dos fatos estava em casa quando ouviu barulho na rua.\n"
+
+
+class StallMeter:
+    """Largest gap between ticks of a 10 ms timer: how long the UI stayed frozen."""
+
+    def __init__(self):
+        self.timer = QTimer()
+        self.timer.setInterval(10)
+        self.timer.timeout.connect(self._tick)
+        self.longest = 0.0
+        self._last = None
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            self.longest = max(self.longest, now - self._last)
+        self._last = now
+
+    def start(self):
+        self.longest, self._last = 0.0, time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self._tick()
+        self.timer.stop()
+        return self.longest * 1000
+
+
+def compose_peak(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(megabytes):
+    import main
+    import functions
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = main.PromptManagerApp()
+    window.resize(650, 550)
+    window.show()
+    app.processEvents()
+    window.selector.setCurrentIndex(1)
+    template = functions.get_template(window.selector.currentText())
+    meter = StallMeter()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "transcricao.txt")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(LINE * (megabytes * 2 ** 20 // len(LINE.encode("utf-8"))))
+        size_mb = os.path.getsize(path) / 2 ** 20
+        with open(path, "r", encoding="utf-8") as file:
+            pasted = file.read()
+
+        # Caminho antigo: tudo no editor rico, cópia completa na leitura e na composição
+        editor = QTextEdit()
+        editor.show()
+        meter.start()
+        start = time.perf_counter()
+        editor.setPlainText(pasted)
+        app.processEvents()
+        paste_ms = (time.perf_counter() - start) * 1000
+        paste_stall = meter.stop()
+        del pasted
+
+        def compose_old():
+            user_text = editor.toPlainText().strip()
+            return f'{template.render()} "{user_text}"'
+
+        _, old_compose_ms, old_peak = compose_peak(compose_old)
+        editor.close()
+        editor.deleteLater()
+        app.processEvents()
+
+        # Caminho novo: leitura em segundo plano, prévia no editor, composição direto da string
+        loop = QEventLoop()
+        window.transcript_loader.loaded.connect(lambda *_: QTimer.singleShot(0, loop.quit))
+        meter.start()
+        start = time.perf_counter()
+        window.open_transcript(path)
+        loop.exec()
+        load_ms = (time.perf_counter() - start) * 1000
+        load_stall = meter.stop()
+
+        _, new_compose_ms, new_peak = compose_peak(lambda: template.render(window.text_box.user_text()))
+
+    print(f"Transcrição de {size_mb:.1f} MB")
+    print(f"  colar no QTextEdit   carga {paste_ms:7.0f} ms, maior pausa da UI {paste_stall:7.0f} ms, "
+          f"composição {old_compose_ms:6.1f} ms (pico {old_peak / 2 ** 20:6.1f} MB)")
+    print(f"  abrir arquivo        carga {load_ms:7.0f} ms, maior pausa da UI {load_stall:7.0f} ms, "
+          f"composição {new_compose_ms:6.1f} ms (pico {new_peak / 2 ** 20:6.1f} MB)")
+    window.close()
+    app.processEvents()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,431 @@
+"""
+Content-addressed prompt storage (``PROMPTS_BACKEND=chunks``).
+
+Prompt bodies are cut into content-defined chunks (at line ends, and at
+sentence ends inside very long lines), each chunk is stored once in
+``chunks.pack`` under its BLAKE2 digest and zlib-compressed when that makes
+it smaller. Names, colours and the chunk ids of every prompt live in a small
+separate index (``index.json`` + journal, compact UTF-8 JSON) that can be
+read without touching any body.
+
+    python chunk_store.py report [prompts.json]    # tamanho comparado ao JSON legado
+    python chunk_store.py migrate [prompts.json] [diretório]
+"""
+import os
+import re
+import sys
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from journal import JournalBackend, DEFAULT_COLOR
+from instrumentation import span, count
+from prompt_record import Prompt
+
+MIN_CHUNK = 256     # Trechos menores são juntados ao seguinte (caracteres)
+MAX_CHUNK = 4096    # Linhas maiores são cortadas em fim de frase
+GC_RATIO = 0.5      # Reescreve o pack ao fechar se mais da metade for lixo
+BODY_CACHE_SIZE = 32  # Conteúdos recentes mantidos decodificados (LRU)
+
+# Cabeçalho de cada trecho no pack: id, digest, compactado?, tamanho dos dados
+RECORD = struct.Struct("<I16sBI")
+FLAG_RAW, FLAG_ZLIB = 0, 1
+
+_SENTENCE = re.compile(r".*?(?:[.!?;:]\s+|$)", re.S)
+
+
+def _pieces(text, max_size):
+    for line in text.splitlines(keepends=True):
+        if len(line) <= max_size:
+            yield line
+            continue
+        # Linha longa (parágrafo inteiro): corta em fim de frase, ou à força
+        for sentence in _SENTENCE.findall(line):
+            for start in range(0, len(sentence), max_size):
+                yield sentence[start:start + max_size]
+
+
+def split_chunks(text, min_size=MIN_CHUNK, max_size=MAX_CHUNK):
+    """
+    Cut ``text`` into chunks whose boundaries depend only on the content, so a
+    paragraph shared by several prompts becomes the same chunk in all of them
+    and an edit only changes the chunks around it.
+    """
+    chunks, current, size = [], [], 0
+    for piece in _pieces(text, max_size):
+        current.append(piece)
+        size += len(piece)
+        if size >= min_size:
+            chunks.append("".join(current))
+            current, size = [], 0
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def chunk_digest(data):
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ChunkBackend:
+    """
+    Storage backend over a deduplicated chunk pack plus a name/colour index.
+
+    Same interface as ``JournalBackend`` (``load``, ``record_upsert``,
+    ``record_delete``, ``record_batch``, ``write_all``, ``close``) plus
+    ``load_index`` (names and colours only) and ``load_lazy``, which the store
+    prefers: only metadata is resident and bodies are read through ``mmap``
+    when first needed, with an LRU of recent bodies. New chunks are appended to the
+    pack and fsynced before the index references them; chunks no longer used
+    are dropped by rewriting the pack on ``close`` once they dominate it.
+
+    The window and the CLI may share a library: writes hold an exclusive
+    lock on ``chunks.lock`` and first catch up with the records other
+    processes appended, so chunk ids always come from the pack on disk.
+    """
+
+    def __init__(self, directory, compress=True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pack_path = os.path.join(directory, "chunks.pack")
+        self.lock_path = os.path.join(directory, "chunks.lock")
+        self.compress = compress
+        self.index = JournalBackend(os.path.join(directory, "index.json"), compact_json=True)
+        self._lock = threading.Lock()
+        self._chunks = {}     # id -> (posição dos dados, tamanho, flag)
+        self._by_digest = {}  # digest -> id
+        self._next_id = 1
+        self._pack_end = 0
+        self._pack_file = None  # (st_dev, st_ino) do pack lido: muda quando outro processo o reescreve
+        self._map = None
+        self._bodies = OrderedDict()  # ids dos trechos -> conteúdo (LRU)
+        self._scan_pack()
+
+    def _scan_pack(self):
+        """Read the record headers from ``_pack_end`` on into the chunk directory (bodies are skipped)."""
+        try:
+            file = open(self.pack_path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            count("arquivo.leituras")
+            stat = os.fstat(file.fileno())
+            size, self._pack_file = stat.st_size, (stat.st_dev, stat.st_ino)
+            offset = self._pack_end
+            while offset + RECORD.size <= size:
+                file.seek(offset)
+                chunk_id, digest, flag, length = RECORD.unpack(file.read(RECORD.size))
+                if offset + RECORD.size + length > size:
+                    break  # Registro truncado por uma queda: será sobrescrito
+                self._chunks[chunk_id] = (offset + RECORD.size, length, flag)
+                self._by_digest[digest] = chunk_id
+                self._next_id = max(self._next_id, chunk_id + 1)
+                offset += RECORD.size + length
+            self._pack_end = offset
+
+    def _refresh(self):
+        """Catch up with records appended to the pack, or a pack rewritten, by another process."""
+        try:
+            stat = os.stat(self.pack_path)
+        except FileNotFoundError:
+            return
+        if (stat.st_dev, stat.st_ino) == self._pack_file and stat.st_size == self._pack_end:
+            return
+        self._unmap()
+        if (stat.st_dev, stat.st_ino) != self._pack_file or stat.st_size < self._pack_end:
+            # Reescrito pela coleta de lixo de outro processo: as posições mudaram
+            self._chunks, self._by_digest, self._pack_end = {}, {}, 0
+            self._bodies.clear()
+        self._scan_pack()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the pack among processes, up to date with what they wrote."""
+        with self._lock, open(self.lock_path, "a+b") as file:
+            if fcntl is not None:
+                fcntl.flock(file.fileno(), fcntl.LOCK_EX)  # Liberado ao fechar o arquivo
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                self._refresh()
+                yield
+            finally:
+                if fcntl is None:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def load_index(self):
+        """Names and colours in library order, without reading any body."""
+        return [{"name": entry["name"], "color": entry.get("color") or DEFAULT_COLOR}
+                for entry in self.index.load()]
+
+    def load(self):
+        with span("chunks.carregar"):
+            entries = self.index.load()
+            texts = self._read_chunks({chunk_id for entry in entries for chunk_id in entry["content"]})
+            return [
+                {"name": entry["name"], "content": "".join(texts[chunk_id] for chunk_id in entry["content"]),
+                 "color": entry.get("color") or DEFAULT_COLOR}
+                for entry in entries
+            ]
+
+    def load_lazy(self):
+        """``Prompt`` records with name/colour in memory and bodies read on demand."""
+        with span("chunks.carregar_metadados"):
+            return [Prompt.lazy(entry["name"], entry.get("color"), array("I", entry["content"]), self)
+                    for entry in self.index.load()]
+
+    def read_body(self, chunk_ids):
+        """Assemble one body from the mapped pack, through the LRU of recent bodies."""
+        if not chunk_ids:
+            return ""  # Conteúdo vazio: nada a mapear (o pacote pode nem existir ainda)
+        key = chunk_ids.tobytes()
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                return body
+
+            if any(chunk_id not in self._chunks for chunk_id in chunk_ids):
+                self._refresh()  # Trechos gravados por outro processo (a CLI, por exemplo)
+            self._map_pack()
+            parts = []
+            for chunk_id in chunk_ids:
+                offset, length, flag = self._chunks[chunk_id]
+                raw = self._map[offset:offset + length]
+                parts.append((zlib.decompress(raw) if flag == FLAG_ZLIB else raw).decode("utf-8"))
+            body = "".join(parts)
+
+            self._bodies[key] = body
+            if len(self._bodies) > BODY_CACHE_SIZE:
+                self._bodies.popitem(last=False)
+            return body
+
+    def _map_pack(self):
+        while self._map is None:
+            self._refresh()
+            count("arquivo.leituras")
+            with open(self.pack_path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                if (stat.st_dev, stat.st_ino) == self._pack_file:  # Não foi trocado desde a leitura
+                    self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _unmap(self):
+        # O pack vai mudar de tamanho ou ser substituído (no Windows um arquivo
+        # mapeado não pode ser truncado nem trocado): o próximo acesso remapeia
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    def _read_chunks(self, chunk_ids):
+        """Decode each requested chunk once (shared chunks are decoded a single time)."""
+        if not chunk_ids:
+            return {}
+        count("arquivo.leituras")
+        with self._locked(), open(self.pack_path, "rb") as file:
+            data = file.read(self._pack_end)
+        texts = {}
+        view = memoryview(data)
+        for chunk_id in chunk_ids:
+            offset, length, flag = self._chunks[chunk_id]
+            raw = view[offset:offset + length]
+            texts[chunk_id] = (zlib.decompress(raw) if flag == FLAG_ZLIB else bytes(raw)).decode("utf-8")
+        return texts
+
+    # ------------------------------------------------------------------ #
+    # Escrita
+    # ------------------------------------------------------------------ #
+    def record_upsert(self, prompt, original_name=None):
+        self.record_batch([("upsert", prompt, original_name)])
+
+    def record_delete(self, name):
+        self.record_batch([("delete", name)])
+
+    def record_batch(self, ops):
+        """Store the new chunks of ``ops`` (one append + fsync), then update the index."""
+        index_ops = []
+        with self._locked():
+            records = []
+            for op in ops:
+                if op[0] == "upsert":
+                    prompt = op[1]
+                    entry = {"name": prompt["name"], "content": self._intern(prompt["content"], records),
+                             "color": prompt.get("color", DEFAULT_COLOR)}
+                    index_ops.append(("upsert", entry, op[2]))
+                else:
+                    index_ops.append(op)
+            if records:
+                self._append_or_forget(records)
+            self.index.record_batch(index_ops)
+
+    def _intern(self, content, records):
+        """Return the chunk ids of ``content``, queueing chunks not stored yet in ``records``."""
+        ids = []
+        for text in split_chunks(content):
+            raw = text.encode("utf-8")
+            digest = chunk_digest(raw)
+            chunk_id = self._by_digest.get(digest)
+            if chunk_id is None:
+                chunk_id = self._next_id
+                self._next_id += 1
+                self._by_digest[digest] = chunk_id
+                data, flag = raw, FLAG_RAW
+                if self.compress:
+                    packed = zlib.compress(raw, 6)
+                    if len(packed) < len(raw):
+                        data, flag = packed, FLAG_ZLIB
+                records.append((chunk_id, digest, flag, data))
+            ids.append(chunk_id)
+        return ids
+
+    def _append_or_forget(self, records):
+        try:
+            self._append(records)
+        except OSError:
+            # Os trechos não chegaram ao disco: não podem ser reaproveitados depois
+            for chunk_id, digest, _, _ in records:
+                self._by_digest.pop(digest, None)
+                self._chunks.pop(chunk_id, None)
+            raise
+
+    def _append(self, records):
+        count("arquivo.gravacoes")
+        self._unmap()
+        with open(self.pack_path, "ab") as file:
+            # Com o lock e o pack relido, o que passa de _pack_end é só um
+            # registro incompleto deixado por uma queda: é descartado
+            file.truncate(self._pack_end)
+            offset = self._pack_end
+            for chunk_id, digest, flag, data in records:
+                file.write(RECORD.pack(chunk_id, digest, flag, len(data)))
+                file.write(data)
+                self._chunks[chunk_id] = (offset + RECORD.size, len(data), flag)
+                offset += RECORD.size + len(data)
+            file.flush()
+            os.fsync(file.fileno())
+            stat = os.fstat(file.fileno())
+        self._pack_end, self._pack_file = offset, (stat.st_dev, stat.st_ino)
+
+    def write_all(self, prompts):
+        """Replace the whole library; chunks left unused are collected afterwards."""
+        with self._locked():
+            records = []
+            entries = [{"name": prompt["name"], "content": self._intern(prompt["content"], records),
+                        "color": prompt.get("color", DEFAULT_COLOR)} for prompt in prompts]
+            if records:
+                self._append_or_forget(records)
+            # O índice só passa a apontar para os trechos novos depois do fsync do pack
+            self.index.write_all(entries)
+        self.collect_garbage()
+
+    # ------------------------------------------------------------------ #
+    # Manutenção
+    # ------------------------------------------------------------------ #
+    def live_ids(self):
+        return {chunk_id for entry in self.index.load() for chunk_id in entry["content"]}
+
+    def collect_garbage(self, force=False):
+        """Rewrite the pack without unreferenced chunks (ids are kept, the index is untouched)."""
+        with self._locked():
+            live = self.live_ids()
+            live_bytes = sum(RECORD.size + self._chunks[chunk_id][1] for chunk_id in live)
+            if not force and live_bytes >= self._pack_end * (1 - GC_RATIO):
+                return False
+
+            with span("chunks.coletar_lixo"):
+                with open(self.pack_path, "rb") as file:
+                    data = file.read(self._pack_end)
+                digests = {chunk_id: digest for digest, chunk_id in self._by_digest.items()}
+                chunks, by_digest, offset = {}, {}, 0
+                tmp_path = self.pack_path + ".tmp"
+                with open(tmp_path, "wb") as file:
+                    for chunk_id in sorted(live):
+                        start, length, flag = self._chunks[chunk_id]
+                        file.write(RECORD.pack(chunk_id, digests[chunk_id], flag, length))
+                        file.write(data[start:start + length])
+                        chunks[chunk_id] = (offset + RECORD.size, length, flag)
+                        by_digest[digests[chunk_id]] = chunk_id
+                        offset += RECORD.size + length
+                    file.flush()
+                    os.fsync(file.fileno())
+                    stat = os.fstat(file.fileno())
+                self._unmap()
+                os.replace(tmp_path, self.pack_path)
+                self._chunks, self._by_digest, self._pack_end = chunks, by_digest, offset
+                self._pack_file = (stat.st_dev, stat.st_ino)
+            return True
+
+    def close(self):
+        self.index.close()
+        self.collect_garbage()
+        with self._lock:
+            self._unmap()
+
+
+def migrate_json_to_chunks(json_path, directory):
+    """One-shot migration of a ``prompts.json`` library (with its journal). Returns the count."""
+    prompts = JournalBackend(json_path).load()
+    backend = ChunkBackend(directory)
+    backend.write_all(prompts)
+    backend.close()
+    return len(prompts)
+
+
+def directory_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, entry)) for entry in os.listdir(directory))
+
+
+def size_report(json_path):
+    """Compare the legacy JSON layout with compact JSON and the chunk store, in bytes."""
+    prompts = JournalBackend(json_path).load()
+    legacy = len(json.dumps({"prompts": prompts}, indent=4).encode("utf-8"))
+    compact = len(json.dumps({"prompts": prompts}, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    body_bytes = sum(len(prompt["content"].encode("utf-8")) for prompt in prompts)
+
+    rows = [("JSON legado (indent=4, \\u)", legacy), ("JSON compacto (UTF-8)", compact)]
+    with tempfile.TemporaryDirectory() as directory:
+        for label, compress in (("trechos deduplicados", False), ("trechos deduplicados + zlib", True)):
+            target = os.path.join(directory, label.replace(" ", "_"))
+            backend = ChunkBackend(target, compress=compress)
+            backend.write_all(prompts)
+            backend.close()
+            index_bytes = os.path.getsize(backend.index.snapshot_path)
+            rows.append((f"{label} (índice {index_bytes} B)", directory_size(target)))
+            unique = len(backend._chunks)
+            total = sum(len(split_chunks(prompt["content"])) for prompt in prompts)
+
+    print(f"{len(prompts)} prompts, {body_bytes} B de conteúdo (UTF-8); "
+          f"{total} trechos, {unique} únicos")
+    for label, size in rows:
+        print(f"  {size:12d} B  {size / legacy:6.1%}  {label}")
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    source = sys.argv[2] if len(sys.argv) > 2 else os.path.join(script_dir, "prompts.json")
+    if command == "report":
+        size_report(source)
+    elif command == "migrate":
+        target = sys.argv[3] if len(sys.argv) > 3 else os.path.join(os.path.dirname(source), "prompts.store")
+        count_migrated = migrate_json_to_chunks(source, target)
+        print(f"{count_migrated} prompts migrados de {source} para {target}.")
+    else:
+        raise SystemExit(__doc__)
@@ -0,0 +1,329 @@
+"""
+Headless command-line interface for the prompt library (no PyQt6 import).
+
+    python cli.py list [--json]
+    python cli.py show NOME
+    python cli.py create NOME [--file ARQUIVO] [--color #RRGGBB]   (conteúdo do stdin sem --file)
+    python cli.py delete NOME
+    python cli.py compose NOME [ARQUIVO ...] [--input-dir DIR] [--output-dir DIR] [--set CAMPO=VALOR ...]
+    python cli.py history NOME [--rev N] [--restore N]
+    python cli.py collections [--create NOME] [--use NOME]
+    python cli.py move NOME COLEÇÃO [--copy]
+    python cli.py import CAMINHO [--format json|jsonl|csv|md] [--on-conflict skip|overwrite|rename]
+    python cli.py export CAMINHO [--format json|jsonl|csv|md]
+    python cli.py copy NOME [--set CAMPO=VALOR ...]   (texto do stdin; pela janela residente)
+    python cli.py open [NOME]
+
+``--collection NOME`` (before the command) runs it on another collection
+without changing the active one.
+
+``compose`` combines the prompt with the user text exactly like the copy
+button of the main window (``--set`` fills the ``{{campo}}`` placeholders of
+a template; see ``templates``). The text comes from stdin, from the given files or
+from every file in ``--input-dir``; results go to stdout or, with
+``--output-dir``, to one file per input. ``copy`` and ``open`` are handed to
+the resident ``main.py`` window (see ``single_instance``), which puts the
+composed text on the clipboard or shows the prompt. Also runnable as
+``python -m cli``.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+
+import instrumentation
+from functions import (
+    get_store, save_prompt_to_file, delete_prompt, get_template, list_prompt_index,
+    prompt_history, prompt_revision, restore_revision, close_history,
+    list_collections, active_collection, create_collection, switch_collection, move_prompt,
+    import_prompts, export_prompts
+)
+from library_io import FORMATS, POLICIES
+import single_instance
+
+# Separador entre composições quando várias entradas vão para o stdout
+DEFAULT_SEPARATOR = "\n\n"
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        return file.read()
+
+
+def require_prompt(name):
+    prompt = get_store().get(name)
+    if prompt is None:
+        raise SystemExit(f"Prompt '{name}' não encontrado.")
+    return prompt
+
+
+def iter_inputs(args):
+    """Yield ``(source_name, text)`` for each input, one file in memory at a time."""
+    paths = list(args.files)
+    if args.input_dir:
+        paths += sorted(
+            os.path.join(args.input_dir, entry)
+            for entry in os.listdir(args.input_dir)
+            if entry.endswith(args.suffix) and os.path.isfile(os.path.join(args.input_dir, entry))
+        )
+
+    if not paths:
+        yield "stdin", sys.stdin.read()
+        return
+    for path in paths:
+        yield path, read_text(path)
+
+
+# ---------------------------------------------------------------------- #
+# Comandos
+# ---------------------------------------------------------------------- #
+def cmd_list(args):
+    prompts = list_prompt_index()
+    if args.json:
+        json.dump([{"name": p["name"], "color": p["color"]} for p in prompts], sys.stdout,
+                  ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return
+    for prompt in prompts:
+        sys.stdout.write(f"{prompt['color']}  {prompt['name']}\n")
+
+
+def cmd_show(args):
+    sys.stdout.write(require_prompt(args.name).content + "\n")
+
+
+def cmd_create(args):
+    content = read_text(args.file) if args.file else sys.stdin.read()
+    try:
+        save_prompt_to_file(args.name, content.strip(), args.color, args.original_name)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+def cmd_delete(args):
+    require_prompt(args.name)
+    delete_prompt(args.name)
+
+
+def parse_fields(assignments):
+    values = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        if not sep:
+            raise SystemExit(f"Campo inválido '{assignment}': use CAMPO=VALOR.")
+        values[name.strip()] = value
+    return values
+
+
+def cmd_compose(args):
+    require_prompt(args.name)
+    template = get_template(args.name)  # Compilado uma vez para todas as entradas
+    values = parse_fields(args.set)
+    missing = template.missing(values)
+    if missing:
+        raise SystemExit(f"Campos obrigatórios sem valor: {', '.join(missing)} (use --set CAMPO=VALOR).")
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    first = True
+    for source, text in iter_inputs(args):
+        composed = template.render(text, values)
+        if args.output_dir:
+            target = os.path.join(args.output_dir, os.path.basename(source) if source != "stdin" else "stdin.txt")
+            with open(target, "w", encoding="utf-8") as file:
+                file.write(composed)
+            sys.stderr.write(f"{source} -> {target}\n")
+            continue
+
+        if not first:
+            sys.stdout.write(args.separator)
+        sys.stdout.write(composed)
+        sys.stdout.flush()  # Entrega cada resultado assim que fica pronto
+        first = False
+
+    if not args.output_dir and not first:
+        sys.stdout.write("\n")
+
+
+def cmd_history(args):
+    require_prompt(args.name)
+    try:
+        if args.restore:
+            restore_revision(args.name, args.restore)
+            return
+        if args.rev:
+            sys.stdout.write(prompt_revision(args.name, args.rev) + "\n")
+            return
+    except KeyError:
+        raise SystemExit(f"Revisão {args.restore or args.rev} de '{args.name}' não encontrada.")
+    except ValueError as e:
+        raise SystemExit(str(e))  # Revisão danificada no histórico
+    for revision in prompt_history(args.name):
+        when = datetime.fromtimestamp(revision.ts).strftime("%Y-%m-%d %H:%M:%S")
+        sys.stdout.write(f"{revision.rev:5d}  {when}  {revision.size:8d} caracteres\n")
+
+
+def cmd_collections(args):
+    try:
+        if args.create:
+            create_collection(args.create)
+        if args.use:
+            switch_collection(args.use)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    active = active_collection()
+    for name in list_collections():
+        sys.stdout.write(f"{'*' if name == active else ' '} {name}\n")
+
+
+def cmd_move(args):
+    require_prompt(args.name)
+    try:
+        move_prompt(args.name, args.target, args.copy)
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+
+def cmd_import(args):
+    if not os.path.exists(args.path):
+        raise SystemExit(f"'{args.path}' não encontrado.")
+    try:
+        plan = import_prompts(args.path, args.format, args.on_conflict)
+    except (ValueError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Falha ao importar {args.path}: {e}")
+    sys.stderr.write(f"{plan.summary()}\n")
+
+
+def cmd_export(args):
+    try:
+        written = export_prompts(args.path, args.format)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    sys.stderr.write(f"{written} prompts exportados para {args.path}\n")
+
+
+def send_to_window(request):
+    reply = single_instance.send_request(request)
+    if reply is None:
+        raise SystemExit("Nenhuma janela residente: abra o programa com 'python main.py' (ou use compose).")
+    if not reply.get("ok"):
+        raise SystemExit(reply.get("message"))
+    sys.stderr.write(reply.get("message", "") + "\n")
+
+
+def cmd_copy(args):
+    # Nada da biblioteca é lido aqui: a janela residente já tem tudo em memória
+    text = "" if sys.stdin is None or sys.stdin.isatty() else sys.stdin.read()
+    send_to_window({"cmd": "copy", "name": args.name, "text": text, "values": parse_fields(args.set)})
+
+
+def cmd_open(args):
+    send_to_window({"cmd": "select", "name": args.name} if args.name else {"cmd": "show"})
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Gerenciador de prompts (linha de comando)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Relatório de spans e cProfile no stderr (perfil em {instrumentation.PROFILE_FILE})")
+    parser.add_argument("--collection", metavar="NOME", help="Usa esta coleção (padrão: a ativa)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Lista os prompts (cor e nome)")
+    list_parser.add_argument("--json", action="store_true", help="Saída em JSON")
+    list_parser.set_defaults(func=cmd_list)
+
+    show_parser = commands.add_parser("show", help="Mostra o conteúdo de um prompt")
+    show_parser.add_argument("name")
+    show_parser.set_defaults(func=cmd_show)
+
+    create_parser = commands.add_parser("create", help="Cria ou atualiza um prompt")
+    create_parser.add_argument("name")
+    create_parser.add_argument("--file", help="Lê o conteúdo deste arquivo (padrão: stdin)")
+    create_parser.add_argument("--color", default="#444444", help="Cor em HEX (padrão: #444444)")
+    create_parser.add_argument("--original-name", help="Nome anterior, para renomear")
+    create_parser.set_defaults(func=cmd_create)
+
+    delete_parser = commands.add_parser("delete", help="Exclui um prompt")
+    delete_parser.add_argument("name")
+    delete_parser.set_defaults(func=cmd_delete)
+
+    compose_parser = commands.add_parser("compose", help='Gera prompt + "texto do usuário"')
+    compose_parser.add_argument("name")
+    compose_parser.add_argument("files", nargs="*", help="Arquivos com o texto do usuário (padrão: stdin)")
+    compose_parser.add_argument("--input-dir", help="Compõe cada arquivo deste diretório")
+    compose_parser.add_argument("--suffix", default=".txt", help="Extensão dos arquivos de --input-dir")
+    compose_parser.add_argument("--output-dir", help="Grava um arquivo de saída por entrada")
+    compose_parser.add_argument("--separator", default=DEFAULT_SEPARATOR,
+                                help="Separador entre resultados no stdout")
+    compose_parser.add_argument("--set", action="append", default=[], metavar="CAMPO=VALOR",
+                                help="Preenche um campo {{CAMPO}} do modelo (pode repetir)")
+    compose_parser.set_defaults(func=cmd_compose)
+
+    history_parser = commands.add_parser("history", help="Lista, mostra ou restaura revisões de um prompt")
+    history_parser.add_argument("name")
+    history_parser.add_argument("--rev", type=int, help="Mostra o conteúdo desta revisão")
+    history_parser.add_argument("--restore", type=int, metavar="N", help="Restaura a revisão N (grava uma nova)")
+    history_parser.set_defaults(func=cmd_history)
+
+    collections_parser = commands.add_parser("collections", help="Lista, cria ou ativa coleções")
+    collections_parser.add_argument("--create", metavar="NOME", help="Cria uma coleção vazia")
+    collections_parser.add_argument("--use", metavar="NOME", help="Torna a coleção ativa")
+    collections_parser.set_defaults(func=cmd_collections)
+
+    move_parser = commands.add_parser("move", help="Move um prompt para outra coleção")
+    move_parser.add_argument("name")
+    move_parser.add_argument("target", metavar="COLEÇÃO")
+    move_parser.add_argument("--copy", action="store_true", help="Copia em vez de mover")
+    move_parser.set_defaults(func=cmd_move)
+
+    import_parser = commands.add_parser("import", help="Importa prompts (JSON, JSONL, CSV ou pasta Markdown)")
+    import_parser.add_argument("path", metavar="CAMINHO")
+    import_parser.add_argument("--format", choices=FORMATS, help="Formato (padrão: pela extensão)")
+    import_parser.add_argument("--on-conflict", choices=POLICIES, default="skip",
+                               help="Nome já existente com outro conteúdo: ignorar, substituir ou renomear")
+    import_parser.set_defaults(func=cmd_import)
+
+    export_parser = commands.add_parser("export", help="Exporta a coleção (JSON, JSONL, CSV ou pasta Markdown)")
+    export_parser.add_argument("path", metavar="CAMINHO")
+    export_parser.add_argument("--format", choices=FORMATS, help="Formato (padrão: pela extensão)")
+    export_parser.set_defaults(func=cmd_export)
+
+    copy_parser = commands.add_parser("copy", help="Copia prompt + texto do stdin pela janela residente")
+    copy_parser.add_argument("name")
+    copy_parser.add_argument("--set", action="append", default=[], metavar="CAMPO=VALOR",
+                             help="Preenche um campo {{CAMPO}} do modelo (pode repetir)")
+    copy_parser.set_defaults(func=cmd_copy)
+
+    open_parser = commands.add_parser("open", help="Mostra a janela residente (com o prompt selecionado)")
+    open_parser.add_argument("name", nargs="?")
+    open_parser.set_defaults(func=cmd_open)
+    return parser
+
+
+def main(argv=None):
+    # Textos em português: garante UTF-8 mesmo em consoles com outra codificação
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8")
+
+    args = build_parser().parse_args(argv)
+    instrumentation.configure_logging("WARNING")
+    profiler = instrumentation.start_profiler() if args.profile else None
+    try:
+        # O journal é compactado pela aplicação; aqui cada gravação é só um append
+        with instrumentation.action(args.command):
+            if args.collection:
+                try:
+                    switch_collection(args.collection, remember=False)
+                except ValueError as e:
+                    raise SystemExit(str(e))
+            args.func(args)
+    finally:
+        close_history()  # Revisões ainda na fila de gravação
+        if profiler is not None:
+            instrumentation.finish_profiler(profiler)
+
+
+if __name__ == "__main__":
+    main()
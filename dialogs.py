@@ -0,0 +1,232 @@
+import time
+from collections import deque
+
+from PyQt6.QtWidgets import QApplication, QFrame, QVBoxLayout, QLabel, QProgressBar
+from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QObject, QTimer, QEvent
+
+# Styles and emojis for message types
+STYLES = {
+    "success": {"color": "#4CAF50", "emoji": "✅", "border_color": "#4CAF50", "title": "Sucesso"},
+    "error": {"color": "#F44336", "emoji": "❌", "border_color": "#F44336", "title": "Erro"},
+    "warning": {"color": "#FFC107", "emoji": "⚠️", "border_color": "#FFC107", "title": "Alerta"},
+    "info": {"color": "#2196F3", "emoji": "ℹ️", "border_color": "#2196F3", "title": "Informação"},
+}
+
+TOAST_SIZE = (300, 140)
+TOAST_SPACING = 8
+TOAST_DURATION_MS = 1500  # Mesma duração do antigo diálogo (100 passos de 15 ms)
+POOL_SIZE = 3             # Toasts visíveis ao mesmo tempo; o resto espera na fila
+MAX_QUEUE = 20
+FRAME_MS = 30
+
+
+class Toast(QFrame):
+    """One pre-built toast; restyled and reused for every message it shows."""
+
+    def __init__(self, host=None):
+        super().__init__(host)
+        if host is None:
+            # Sem janela hospedeira: janela própria, sem foco e sem moldura
+            self.setWindowFlags(
+                Qt.WindowType.FramelessWindowHint | Qt.WindowType.Tool
+                | Qt.WindowType.WindowStaysOnTopHint
+            )
+            self.setAttribute(Qt.WidgetAttribute.WA_ShowWithoutActivating)
+        self.setFixedSize(*TOAST_SIZE)
+        self.message_type = None
+        self.started = 0.0
+        self.duration_ms = TOAST_DURATION_MS
+        self.on_click = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 5, 10, 5)
+        layout.setSpacing(5)
+
+        self.title_label = QLabel()
+        self.title_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.title_label)
+
+        self.content_label = QLabel()
+        self.content_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
+        self.content_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.content_label.setWordWrap(True)
+        layout.addWidget(self.content_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(False)
+        layout.addWidget(self.progress_bar)
+        self.hide()
+
+    def present(self, content, message_type, duration_ms):
+        # O estilo só é refeito quando o tipo muda (é a parte cara)
+        if message_type != self.message_type:
+            self.message_type = message_type
+            style = STYLES[message_type]
+            self.setStyleSheet(f"""
+                Toast {{
+                    background-color: rgba(30, 30, 30, 0.9);
+                    border: 3px solid {style['border_color']};
+                    border-radius: 5px;
+                }}
+                QLabel {{ color: {style['color']}; }}
+                QProgressBar {{
+                    border: none;
+                    height: 6px;
+                    background-color: rgba(50, 50, 50, 0.7);
+                    border-radius: 6px;
+                }}
+                QProgressBar::chunk {{
+                    background-color: {style['color']};
+                    border-radius: 6px;
+                }}
+            """)
+            self.title_label.setText(f"{style['emoji']} {style['title']}")
+        self.content_label.setText(content)
+        self.progress_bar.setValue(0)
+        self.duration_ms = duration_ms
+        self.started = time.monotonic()
+
+    def progress(self):
+        return int(min(1.0, (time.monotonic() - self.started) * 1000 / self.duration_ms) * 100)
+
+    def mousePressEvent(self, event):
+        # Close on Click
+        if self.on_click:
+            self.on_click(self)
+
+
+class ToastManager(QObject):
+    """
+    Non-modal toasts over ``host`` (or on their own when ``host`` is None).
+
+    A pool of ``POOL_SIZE`` toasts is built on first use and reused; extra
+    messages wait in a queue. One timer advances every visible progress bar
+    and stops as soon as no toast is on screen. Nothing here runs a nested
+    event loop, so callers return immediately.
+    """
+
+    def __init__(self, host=None, pool_size=POOL_SIZE):
+        super().__init__(host)
+        self.host = host
+        self.pool_size = pool_size
+        self._pool = []
+        self._visible = []
+        self._queue = deque(maxlen=MAX_QUEUE)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(FRAME_MS)
+        self._timer.timeout.connect(self._tick)
+
+        if host is not None:
+            host.installEventFilter(self)  # Reposiciona quando a janela muda de tamanho
+
+    def show(self, content, message_type="info", duration_ms=TOAST_DURATION_MS):
+        if message_type not in STYLES:
+            message_type = "info"
+        # Mesma mensagem já na tela: só reinicia a contagem
+        for toast in self._visible:
+            if toast.content_label.text() == content and toast.message_type == message_type:
+                toast.started = time.monotonic()
+                return
+        self._queue.append((content, message_type, duration_ms))
+        self._fill()
+
+    def clear(self):
+        self._queue.clear()
+        for toast in list(self._visible):
+            self._dismiss(toast)
+
+    def _take_toast(self):
+        for toast in self._pool:
+            if toast not in self._visible:
+                return toast
+        if len(self._pool) < self.pool_size:
+            toast = Toast(self.host)
+            toast.on_click = self._dismiss
+            self._pool.append(toast)
+            return toast
+        return None
+
+    def _fill(self):
+        while self._queue:
+            toast = self._take_toast()
+            if toast is None:
+                break
+            toast.present(*self._queue.popleft())
+            self._visible.append(toast)
+            toast.show()
+            toast.raise_()
+        self._layout()
+        if self._visible and not self._timer.isActive():
+            self._timer.start()
+
+    def _dismiss(self, toast):
+        if toast in self._visible:
+            toast.hide()
+            self._visible.remove(toast)
+        self._fill()
+        if not self._visible:
+            self._timer.stop()
+
+    def _layout(self):
+        width, height = TOAST_SIZE
+        if self.host is not None:
+            area = self.host.rect()
+            origin_x, origin_y = 0, 0
+        else:
+            screen = QApplication.primaryScreen()
+            area = screen.availableGeometry()
+            origin_x, origin_y = area.x(), area.y()
+
+        # Empilha de baixo para cima, centralizado
+        x = origin_x + (area.width() - width) // 2
+        y = origin_y + area.height() - height - TOAST_SPACING
+        for toast in self._visible:
+            toast.move(x, y)
+            y -= height + TOAST_SPACING
+
+    def _tick(self):
+        for toast in list(self._visible):
+            value = toast.progress()
+            if value >= 100:
+                self._dismiss(toast)
+            elif value != toast.progress_bar.value():
+                toast.progress_bar.setValue(value)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Resize and self._visible:
+            self._layout()
+        return False
+
+
+_managers = {}
+
+
+def toast_manager(parent_window=None):
+    """Return the toast manager shared by ``parent_window`` (created on demand)."""
+    key = id(parent_window)
+    manager = _managers.get(key)
+    if manager is None:
+        manager = ToastManager(parent_window)
+        _managers[key] = manager
+        if parent_window is not None:
+            parent_window.destroyed.connect(lambda *_: _managers.pop(key, None))
+    return manager
+
+
+def custom_messagebox(content, message_type="info", parent_window=None):
+    """
+    Display a custom message with colored border and text as a toast.
+
+    Returns immediately; the toast closes by itself (or on click).
+
+    :param content: Message content.
+    :param message_type: "success", "error", "warning", or "info".
+    :param parent_window: Window the toast is shown over.
+    """
+    if QApplication.instance() is None:
+        raise RuntimeError("custom_messagebox requer uma QApplication em execução.")
+    toast_manager(parent_window).show(content, message_type)
@@ -0,0 +1,126 @@
+import os
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QFileSystemWatcher, pyqtSignal
+
+# Espera após o último evento antes de reler (sincronizadores gravam em rajadas)
+DEBOUNCE_MS = 400
+
+
+class _ParseSignals(QObject):
+    finished = pyqtSignal(object, object)  # (prompts, fingerprint)
+    failed = pyqtSignal(str)
+
+
+class _ParseTask(QRunnable):
+    """Parses the library on a pool thread so the UI never blocks on JSON."""
+
+    def __init__(self, backend):
+        super().__init__()
+        self.backend = backend
+        self.signals = _ParseSignals()
+
+    def run(self):
+        try:
+            prompts, fingerprint = self.backend.load_external()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(prompts, fingerprint)
+
+
+class PromptsFileWatcher(QObject):
+    """
+    Watches ``prompts.json`` for changes made outside the application.
+
+    Bursts of file-system events are debounced into one check; if the file
+    really differs from the version the store knows (mtime/size, then SHA-1),
+    it is parsed on a ``QThreadPool`` thread and the result is applied to the
+    store as a per-prompt diff, so the selectors only update the changed rows.
+    """
+
+    changes_applied = pyqtSignal(int)
+    reload_failed = pyqtSignal(str)
+
+    def __init__(self, store, path, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = os.path.abspath(path)
+        self._parsing = False
+        self._pending = False
+        self._task = None
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._check)
+
+        self._watcher = QFileSystemWatcher(self)
+        # O diretório também é observado: a troca atômica (os.replace) remove o
+        # arquivo observado e ele precisa ser registrado de novo
+        self._watcher.addPath(os.path.dirname(self.path))
+        self._watch_file()
+        self._watcher.fileChanged.connect(self._schedule)
+        self._watcher.directoryChanged.connect(self._schedule)
+
+    def watch(self, path):
+        """Follow another file (the shard of the collection just opened)."""
+        path = os.path.abspath(path)
+        if path == self.path:
+            return
+        stale = self._watcher.files() + self._watcher.directories()
+        if stale:
+            self._watcher.removePaths(stale)
+        self.path = path
+        self._debounce.stop()
+        self._watcher.addPath(os.path.dirname(self.path))
+        self._watch_file()
+
+    def _watch_file(self):
+        if os.path.exists(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+
+    def _schedule(self, *_):
+        self._watch_file()
+        self._debounce.start()  # Reinicia a contagem a cada evento da rajada
+
+    def _check(self):
+        if self._parsing:
+            self._pending = True
+            return
+        if self.store.pending_writes():
+            self._debounce.start()  # Compara com o disco só depois das gravações em andamento
+            return
+        if not self.store.backend.has_external_change():
+            return  # Gravação da própria aplicação ou arquivo apenas "tocado"
+
+        self._parsing = True
+        self._task = _ParseTask(self.store.backend)
+        self._task.signals.finished.connect(self._apply)
+        self._task.signals.failed.connect(self._failed)
+        QThreadPool.globalInstance().start(self._task)
+
+    def _apply(self, prompts, fingerprint):
+        self._parsing = False
+        if self._task.backend is not self.store.backend:
+            self._check_pending()
+            return  # Lido de uma coleção que já foi trocada
+        if self.store.pending_writes():
+            # Gravações feitas durante a leitura: a cópia lida as desfaria; relê depois delas
+            self._pending = False
+            self._debounce.start()
+            return
+        changed = self.store.apply_external(prompts)
+        self.store.backend.accept_snapshot(fingerprint)
+        if changed:
+            self.changes_applied.emit(changed)
+        self._check_pending()
+
+    def _failed(self, message):
+        self._parsing = False
+        self.reload_failed.emit(message)
+        self._check_pending()
+
+    def _check_pending(self):
+        if self._pending:
+            self._pending = False
+            self._debounce.start()
@@ -1,24 +1,185 @@
 import os
 import json
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QProgressBar, QApplication
-from PyQt6.QtGui import QFont
-from PyQt6.QtCore import Qt, QTimer
-import sys
+from prompt_store import PromptStore
+from journal import JournalBackend, PromptConflictError, write_snapshot
+from fuzzy_index import TrigramIndex
+from templates import compile_template
+from history import HistoryStore
+from prompt_collections import CollectionRegistry
+from library_io import ImportPlan, read_prompts, write_prompts
+from usage_stats import UsageStats
+from write_queue import WriteQueue
+from instrumentation import logger, span
 
 # Constants
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-PROMPTS_FILE = os.path.join(SCRIPT_DIR, "prompts.json")
+# PROMPTS_DIR aponta para outra biblioteca (ex.: as geradas pelos benchmarks)
+DATA_DIR = os.environ.get("PROMPTS_DIR", SCRIPT_DIR)
+# Arquivos da coleção padrão; as demais coleções derivam os seus de outra base
+# (ver prompt_collections)
+PROMPTS_BASE = os.path.join(DATA_DIR, "prompts")
+PROMPTS_FILE = PROMPTS_BASE + ".json"
+PROMPTS_DB_FILE = PROMPTS_BASE + ".db"
+PROMPTS_CHUNKS_DIR = PROMPTS_BASE + ".store"
+PROMPTS_HISTORY_DIR = PROMPTS_BASE + ".history"
+PROMPTS_USAGE_FILE = PROMPTS_BASE + ".usage.json"
+
+# Backend de armazenamento: "journal" (prompts.json + journal), "sqlite" ou
+# "chunks" (trechos deduplicados e compactados)
+STORAGE_BACKEND = os.environ.get("PROMPTS_BACKEND", "journal")
+# Prompts indexados por vez ao construir o índice de busca entre eventos (~10 ms)
+SEARCH_INDEX_BATCH = 100
+
+_store = None
+_collections = None
+_search_index = None
+_history = None
+_history_writer = None
 
 
 def initialize_prompts_file():
-    """Initialize the prompts.json file if it doesn't exist."""
-    if not os.path.exists(PROMPTS_FILE):
-        print(f"Arquivo {PROMPTS_FILE} não encontrado. Criando um novo...")
-        initial_data = {"prompts": []}
-        with open(PROMPTS_FILE, "w") as file:
-            json.dump(initial_data, file, indent=4)
+    """Initialize the prompts.json file (of the active collection) if it doesn't exist."""
+    path = get_store().path
+    if not os.path.exists(path):
+        logger.info("Arquivo %s não encontrado. Criando um novo...", path)
+        write_snapshot(path, [])
     else:
-        print(f"Arquivo {PROMPTS_FILE} já existe.")
+        logger.debug("Arquivo %s já existe.", path)
+    get_store().invalidate()
+
+def open_backend(kind=None, base=None):
+    """
+    Create the storage backend selected by ``kind`` (or STORAGE_BACKEND) for
+    the library at ``base`` (default: PROMPTS_BASE), e.g. ``<base>.json``.
+    """
+    kind = kind or STORAGE_BACKEND
+    base = base or PROMPTS_BASE
+    json_path = base + ".json"
+    if kind == "sqlite":
+        from sqlite_backend import SQLiteBackend, migrate_json_to_sqlite
+
+        # Primeira execução com SQLite: migra a biblioteca existente
+        if not os.path.exists(base + ".db") and os.path.exists(json_path):
+            migrate_json_to_sqlite(json_path, base + ".db")
+        return SQLiteBackend(base + ".db")
+    if kind == "chunks":
+        from chunk_store import ChunkBackend, migrate_json_to_chunks
+
+        if not os.path.exists(base + ".store") and os.path.exists(json_path):
+            migrate_json_to_chunks(json_path, base + ".store")
+        return ChunkBackend(base + ".store")
+    if kind == "journal":
+        return JournalBackend(json_path)
+    raise ValueError(f"Backend de armazenamento desconhecido: {kind}")
+
+
+def get_store():
+    """Return the resident PromptStore shared by the whole application (active collection)."""
+    global _store
+    if _store is None:
+        base = get_collections().base_path(get_collections().active)
+        _store = PromptStore(base + ".json", open_backend(base=base), UsageStats(base + ".usage.json"))
+    return _store
+
+
+def get_collections():
+    """Return the CollectionRegistry of DATA_DIR (only the small manifest is read)."""
+    global _collections
+    if _collections is None:
+        _collections = CollectionRegistry(DATA_DIR, PROMPTS_BASE)
+    return _collections
+
+
+def list_collections():
+    return get_collections().names()
+
+
+def active_collection():
+    return get_collections().active
+
+
+def create_collection(name):
+    """Create an empty collection (its own shard); the active one does not change."""
+    base = get_collections().create(name)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    write_snapshot(base + ".json", [])
+    logger.info("Coleção '%s' criada.", name.strip())
+    return name.strip()
+
+
+def switch_collection(name, remember=True):
+    """
+    Make ``name`` the active collection: its shard is opened and loaded, the
+    previous one is flushed and closed. ``remember`` stores the choice in the
+    manifest (the CLI uses a collection for one command without it).
+    """
+    global _history
+    registry = get_collections()
+    if name not in registry:
+        raise ValueError(f"Coleção '{name}' não encontrada.")
+    with span("coleção.trocar"):
+        close_history()
+        _history = None
+        registry.set_active(name, remember)
+        if _store is not None:
+            base = registry.base_path(name)
+            _store.switch(base + ".json", open_backend(base=base), UsageStats(base + ".usage.json"))
+
+
+def move_prompt(name, target, copy=False):
+    """
+    Move (or copy) prompt ``name`` from the active collection to ``target``.
+
+    Only the two shards involved are written: the prompt is appended to the
+    target's storage (read just to check the name is free) and deleted from
+    the active one; its revision history goes along.
+    """
+    registry = get_collections()
+    if target not in registry or target == registry.active:
+        raise ValueError(f"Coleção de destino inválida: '{target}'.")
+    store = get_store()
+    prompt = store.get(name)
+    if prompt is None:
+        raise ValueError(f"Prompt '{name}' não encontrado.")
+
+    base = registry.base_path(target)
+    with span("coleção.mover"):
+        backend = open_backend(base=base)
+        try:
+            entries = backend.load_index() if hasattr(backend, "load_index") else backend.load()
+            if any(entry["name"] == name for entry in entries):
+                raise ValueError(f"Já existe um prompt '{name}' na coleção '{target}'.")
+            backend.record_upsert(prompt.to_dict())
+        finally:
+            backend.close()
+
+        if _history_writer is not None:
+            _history_writer.flush()
+        get_history().transfer(name, HistoryStore(base + ".history"), copy)
+        if not copy:
+            store.delete(name)
+    logger.info("Prompt '%s' %s para a coleção '%s'.", name, "copiado" if copy else "movido", target)
+
+
+def record_use(name):
+    """Count one use (copy) of ``name`` for the usage-based orderings; kept in memory."""
+    get_store().touch(name)
+
+
+def flush_usage():
+    """Write the use counters still only in memory (called periodically and on exit)."""
+    get_store().usage.flush()
+
+
+def pinned_prompts():
+    """Names of the most used prompts (pinned at the top of the main selector), best first."""
+    return get_store().usage.pinned()
+
+
+def reload_prompts():
+    """Discard the cached prompts and read prompts.json again."""
+    get_store().reload()
+
 
 def save_prompt_to_file(name, content, color="#444444", original_name=None):
     """
@@ -32,184 +193,219 @@ def save_prompt_to_file(name, content, color="#444444", original_name=None):
     if not name or not content:
         raise ValueError("O nome e o conteúdo do prompt não podem estar vazios.")
 
-    data = load_json_data()
-    updated = False
+    store = get_store()
+    existing = store.get(original_name or name)
+    previous = existing.content if existing is not None else None
+    store.upsert(name, content, color, original_name)
+    if content != previous or (original_name and original_name != name):
+        # Revisão gravada em segundo plano; o conteúdo anterior vira a revisão 1
+        # de um prompt que ainda não tinha histórico
+        _history_queue().submit(
+            ("upsert", {"name": name, "content": content, "previous": previous}, original_name)
+        )
+    logger.info("Prompt '%s' salvo com sucesso!", name)
+
+
+def get_history():
+    """Return the HistoryStore of the active collection (nothing is read until a history is asked for)."""
+    global _history
+    if _history is None:
+        registry = get_collections()
+        _history = HistoryStore(registry.base_path(registry.active) + ".history")
+    return _history
+
 
-    for prompt in data["prompts"]:
-        # Atualiza se encontrou o nome original ou o nome atual
-        if prompt["name"] == (original_name or name):
-            prompt["name"] = name
-            prompt["content"] = content
-            prompt["color"] = color
-            updated = True
-            break
+def _history_queue():
+    global _history_writer
+    if _history_writer is None:
+        _history_writer = WriteQueue(
+            get_history(), on_error=lambda message: logger.warning("Falha ao gravar o histórico: %s", message)
+        )
+    return _history_writer
+
+
+def prompt_history(name):
+    """Revisions of prompt ``name``, oldest first (see ``history.Revision``)."""
+    if _history_writer is not None:
+        _history_writer.flush()
+    return get_history().revisions(name)
+
+
+def prompt_revision(name, rev):
+    """Content of revision ``rev`` of prompt ``name``."""
+    if _history_writer is not None:
+        _history_writer.flush()
+    return get_history().content_at(name, rev)
 
-    if not updated:
-        # Caso novo, adiciona com a cor
-        data["prompts"].append({
-            "name": name,
-            "content": content,
-            "color": color
-        })
 
-    save_json_data(data)
-    print(f"Prompt '{name}' salvo com sucesso!")
+def restore_revision(name, rev):
+    """Save revision ``rev`` as the current content (recorded as a new revision)."""
+    prompt = get_store().get(name)
+    if prompt is None:
+        raise ValueError(f"Prompt '{name}' não encontrado.")
+    save_prompt_to_file(name, prompt_revision(name, rev), prompt.color, name)
 
 
+def close_history():
+    """Write the revisions still queued (called on exit)."""
+    global _history_writer
+    if _history_writer is not None:
+        writer, _history_writer = _history_writer, None
+        writer.close()
+
+
+def import_prompts(path, fmt=None, policy="skip"):
+    """
+    Import a library file or folder into the active collection (see
+    ``library_io`` for the formats). Records are read one at a time, checked
+    against a content-hash index of the library (``policy`` decides name
+    conflicts: ``skip``, ``overwrite`` or ``rename``) and saved in a single
+    batched write. Returns the ``ImportPlan`` (``results``, ``summary()``).
+    """
+    store = get_store()
+    with span("importar"):
+        plan = ImportPlan(store.all(), policy)
+        for record in read_prompts(path, fmt):
+            plan.add(record)
+        # Conteúdo anterior dos substituídos, para o histórico
+        previous = {data["name"]: store.content(data["name"]) for data in plan.prompts if data["name"] in store}
+        if plan.prompts:
+            store.upsert_many(plan.prompts)
+        if previous:
+            _history_queue().submit_many([
+                ("upsert", {"name": name, "content": store.content(name), "previous": content}, None)
+                for name, content in previous.items()
+            ])
+    logger.info("Importação de %s: %s.", path, plan.summary())
+    return plan
+
+
+def export_prompts(path, fmt=None):
+    """Write the active collection to ``path`` (file or Markdown folder). Returns how many."""
+    with span("exportar"):
+        written = write_prompts(get_store().all(), path, fmt)
+    logger.info("%d prompts exportados para %s.", written, path)
+    return written
+
+
+def list_prompt_index():
+    """Names and colours only; backends with a separate index skip the bodies."""
+    backend = get_store().backend
+    if hasattr(backend, "load_index"):
+        return backend.load_index()
+    return [{"name": prompt.name, "color": prompt.color} for prompt in get_store().all()]
 
 
 def load_prompts():
-    """Load prompts from the prompts.json file and garantee default fields."""
-    data = load_json_data()
-    prompts = data.get("prompts", [])
-    
-    for prompt in prompts:
-        if "color" not in prompt:
-            prompt["color"] = "#444444"  # Valor padrão
+    """Return the ``Prompt`` records (see ``prompt_record``) from the in-memory store."""
+    return get_store().all()
+
 
-    return prompts
+def get_prompt(name):
+    """Return the prompt named ``name`` or None, without touching the disk."""
+    return get_store().get(name)
 
 
+def search_prompts(query, limit=50):
+    """Return names of prompts whose name or content match ``query``."""
+    return get_store().search(query, limit)
+
+
+def get_search_index(include_content=False):
+    """
+    Return the trigram index used by the type-to-filter boxes.
+
+    Built once from the store and then kept current by store notifications.
+    Asking for ``include_content`` upgrades it (one rebuild) to also index
+    words of the prompt bodies.
+    """
+    if _search_index is None or (include_content and not _search_index.include_content):
+        _new_search_index(include_content)
+    return _search_index
+
+
+def warm_search_index(batch=SEARCH_INDEX_BATCH):
+    """
+    Index the next ``batch`` prompts of the name index. The interface calls
+    this between events after the window shows, so the first keystroke does
+    not pay for the whole library. Returns True once the index is complete.
+    """
+    if _search_index is None:
+        _new_search_index(False, deferred=True)
+    return _search_index.build_step(batch)
+
+
+def _new_search_index(include_content, deferred=False):
+    global _search_index
+    store = get_store()
+    if _search_index is None:
+        store.subscribe(_sync_search_index)
+    _search_index = TrigramIndex(include_content)
+    _search_index.rebuild(store.all(), deferred)
+
+
+def _sync_search_index(event, name, prompt=None, old_name=None):
+    if _search_index is None:
+        return
+    if event == "reload":
+        _search_index.rebuild(get_store().all())
+    else:
+        _search_index.store_listener(event, name, prompt, old_name)
+
+
+def fuzzy_search(query, include_content=False, limit=200):
+    """
+    Rank prompt names by fuzzy similarity to ``query``.
+
+    With ``include_content`` and a backend that has its own full-text index
+    (SQLite FTS5), name matches come first followed by the backend's content
+    matches; otherwise content words are scored by the trigram index.
+    """
+    store = get_store()
+    with span("busca.fuzzy"):
+        if include_content and hasattr(store.backend, "search"):
+            names = get_search_index().search(query, limit, include_content=False)
+            seen = set(names)
+            names += [name for name in store.search(query, limit) if name not in seen]
+            return names[:limit]
+        return get_search_index(include_content).search(query, limit, include_content)
+
+
+def get_template(name):
+    """Return the compiled template of prompt ``name`` (see ``templates``) or None."""
+    prompt = get_store().get(name)
+    if prompt is None:
+        return None
+    # Compilar um prompt real leva microssegundos: não vale manter um cache em sincronia com a biblioteca
+    return compile_template(prompt.content)
+
+
+def compose_prompt(content, user_text, values=None):
+    """Combine a prompt with the user's text (and template fields), exactly like the copy button."""
+    return compile_template(content).render(user_text, values)
+
 
 def delete_prompt(name):
     """Delete a prompt by name from the prompts.json file."""
-    data = load_json_data()
-    original_length = len(data["prompts"])
-    data["prompts"] = [prompt for prompt in data.get("prompts", []) if prompt["name"] != name]
-
-    if len(data["prompts"]) < original_length:
-        save_json_data(data)
-        print(f"Prompt '{name}' excluído com sucesso!")
+    if get_store().delete(name):
+        logger.info("Prompt '%s' excluído com sucesso!", name)
     else:
-        print(f"Prompt '{name}' não encontrado.")
+        logger.warning("Prompt '%s' não encontrado.", name)
 
 
 def load_json_data():
     """Load data from the prompts.json file."""
     try:
-        with open(PROMPTS_FILE, "r") as file:
+        with open(get_store().path, "r") as file:
             return json.load(file)
     except (FileNotFoundError, json.JSONDecodeError):
-        print("Erro ao carregar prompts. Retornando dados padrão.")
+        logger.warning("Erro ao carregar prompts. Retornando dados padrão.", exc_info=True)
         return {"prompts": []}
 
 
 def save_json_data(data):
-    """Save data to the prompts.json file."""
-    with open(PROMPTS_FILE, "w") as file:
-        json.dump(data, file, indent=4)
-
-
-def custom_messagebox(content, message_type="info", parent_window=None):
-    """
-    Display a custom MessageBox with colored border and text.
-
-    :param content: Message content.
-    :param message_type: "success", "error", "warning", or "info".
-    :param parent_window: Parent window for positioning.
-    """
-    # Check if QApplication exists
-    app_created = QApplication.instance() is not None
-    if not app_created:
-        app = QApplication(sys.argv)
-
-    # Styles and emojis for message types
-    styles = {
-        "success": {"color": "#4CAF50", "emoji": "✅", "border_color": "#4CAF50", "title": "Sucesso"},
-        "error": {"color": "#F44336", "emoji": "❌", "border_color": "#F44336", "title": "Erro"},
-        "warning": {"color": "#FFC107", "emoji": "⚠️", "border_color": "#FFC107", "title": "Alerta"},
-        "info": {"color": "#2196F3", "emoji": "ℹ️", "border_color": "#2196F3", "title": "Informação"},
-    }
-
-    style = styles.get(message_type, styles["info"])
-
-    # MessageBox UI
-    dialog = QDialog()
-    dialog.setWindowFlags(Qt.WindowType.FramelessWindowHint | Qt.WindowType.Dialog)
-    dialog.setFixedSize(300, 140)
-    dialog.setStyleSheet(f"""
-        QDialog {{
-            background-color: rgba(30, 30, 30, 0.9);
-            border: 3px solid {style['border_color']};
-            border-radius: 5px;
-        }}
-    """)
-
-    # Position Dialog
-    if parent_window:
-        parent_geometry = parent_window.geometry()
-        dialog.move(
-            parent_geometry.x() + (parent_geometry.width() - dialog.width()) // 2,
-            parent_geometry.y() + (parent_geometry.height() - dialog.height()) // 2
-        )
-
-    # Layout
-    layout = QVBoxLayout()
-    layout.setContentsMargins(10, 5, 10, 5)
-    layout.setSpacing(5)
-
-    # Title Label
-    title_label = QLabel(f"{style['emoji']} {style['title']}")
-    title_label.setFont(QFont("Arial", 14, QFont.Weight.Bold))
-    title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    title_label.setStyleSheet(f"color: {style['color']};")
-    layout.addWidget(title_label)
-
-    # Content Label
-    content_label = QLabel(content)
-    content_label.setFont(QFont("Arial", 12, QFont.Weight.Bold))
-    content_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-    content_label.setWordWrap(True)
-    content_label.setStyleSheet(f"color: {style['color']};")
-    layout.addWidget(content_label)
-
-    # Progress Bar
-    progress_bar = QProgressBar()
-    progress_bar.setRange(0, 100)
-    progress_bar.setValue(0)
-    progress_bar.setTextVisible(False)
-    progress_bar.setStyleSheet(f"""
-        QProgressBar {{
-            border: none;
-            height: 6px;
-            background-color: rgba(50, 50, 50, 0.7);
-            border-radius: 6px;
-        }}
-        QProgressBar::chunk {{
-            background-color: {style['color']};
-            border-radius: 6px;
-        }}
-    """)
-    layout.addWidget(progress_bar)
-
-    dialog.setLayout(layout)
-
-    # Auto-close Timer
-    timer = QTimer()
-    timer.setInterval(15)
-    progress_value = [0]
-
-    def update_progress():
-        if progress_value[0] >= 100:
-            timer.stop()
-            dialog.accept()
-        else:
-            progress_value[0] += 1
-            progress_bar.setValue(progress_value[0])
-
-    timer.timeout.connect(update_progress)
-    timer.start()
-
-    # Close on Click
-    def close_on_click(event):
-        timer.stop()
-        dialog.accept()
-
-    dialog.mousePressEvent = close_on_click
-
-    # Display MessageBox
-    dialog.exec()
-
-    # Cleanup
-    if not app_created:
-        app.exit()
+    """Save data to the prompts.json file (atomically, via journal snapshot)."""
+    store = get_store()
+    store.flush()  # Gravações pendentes não podem cair depois do novo snapshot
+    store.backend.write_all(data.get("prompts", []))
+    store.invalidate()
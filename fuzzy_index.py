@@ -0,0 +1,249 @@
+import re
+import heapq
+import unicodedata
+from collections import Counter, OrderedDict
+from operator import itemgetter
+
+# Fração mínima dos trigramas da consulta que um nome precisa conter
+MIN_SCORE = 0.5
+# Peso dos trigramas encontrados apenas no conteúdo (bem menor que no nome)
+CONTENT_WEIGHT = 0.3
+# Texto corrido compartilha muitos trigramas ("ent", " de"): exige mais acertos
+CONTENT_MIN_SCORE = 0.8
+# Quantas consultas anteriores (prefixos digitados) manter para reaproveitar contagens
+PREFIX_CACHE_SIZE = 8
+
+
+def normalize(text):
+    """Lowercase, strip accents and collapse whitespace (``Láudo`` -> ``laudo``)."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def trigrams(text, pad_end=True):
+    """
+    Return the set of trigrams of an already normalized string, word-padded.
+
+    Queries use ``pad_end=False``: the last word is usually still being typed,
+    so ``"oiti"`` must not require the ``"ti "`` trigram.
+    """
+    padded = f"  {text} " if pad_end else f"  {text}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Incremental trigram index for type-to-filter search over prompt names.
+
+    Each prompt contributes the trigrams of its normalized name (and,
+    optionally, of the distinct words in its content). Searching only visits
+    the posting lists of the query's trigrams, so the cost per keystroke is
+    proportional to the matches, not to the library size. ``add``/``remove``
+    keep the index current after a save or delete without a rebuild. A
+    deferred ``rebuild`` is carried out by ``build_step`` in slices (or by
+    the next search).
+    """
+
+    def __init__(self, include_content=False):
+        self.include_content = include_content
+        self._postings = {}          # trigrama -> set(nomes)
+        self._content_postings = {}  # trigrama -> set(nomes), só se include_content
+        # nome -> nome normalizado; os trigramas do nome são recalculados a partir
+        # dele na remoção, evitando um set por prompt (menos objetos para o GC)
+        self._normalized = {}
+        self._content_trigrams = {}  # nome -> trigramas do conteúdo, só se include_content
+        self._prefix_cache = OrderedDict()  # (consulta, conteúdo?) -> (trigramas, contagens)
+        self._pending = []  # Prompts de um rebuild adiado ainda não indexados
+        self._dropped = set()  # ... e os que foram excluídos antes da vez deles
+
+    def __len__(self):
+        return len(self._normalized)
+
+    def __contains__(self, name):
+        return name in self._normalized
+
+    # ------------------------------------------------------------------ #
+    # Manutenção incremental
+    # ------------------------------------------------------------------ #
+    def add(self, name, content=None):
+        """Index (or re-index) one prompt."""
+        if name in self._normalized:
+            self.remove(name)
+        self._prefix_cache.clear()
+
+        normalized = normalize(name)
+        name_grams = trigrams(normalized)
+        content_grams = set()
+        if self.include_content and content:
+            for word in set(normalize(content).split()):
+                content_grams |= trigrams(word)
+            content_grams -= name_grams
+
+        for gram in name_grams:
+            self._postings.setdefault(gram, set()).add(name)
+        for gram in content_grams:
+            self._content_postings.setdefault(gram, set()).add(name)
+
+        self._normalized[name] = normalized
+        if content_grams:
+            self._content_trigrams[name] = frozenset(content_grams)
+
+    def remove(self, name):
+        normalized = self._normalized.pop(name, None)
+        if normalized is None:
+            return
+        self._prefix_cache.clear()
+        content_grams = self._content_trigrams.pop(name, ())
+        for postings, doc_grams in ((self._postings, trigrams(normalized)),
+                                    (self._content_postings, content_grams)):
+            for gram in doc_grams:
+                names = postings.get(gram)
+                if names is not None:
+                    names.discard(name)
+                    if not names:
+                        del postings[gram]
+
+    def rename(self, old_name, name, content=None):
+        self.remove(old_name)
+        self.add(name, content)
+
+    def clear(self):
+        self._postings.clear()
+        self._content_postings.clear()
+        self._normalized.clear()
+        self._content_trigrams.clear()
+        self._prefix_cache.clear()
+        self._pending = []
+        self._dropped.clear()
+
+    def rebuild(self, prompts, deferred=False):
+        """Index ``prompts`` from scratch; ``deferred`` leaves the work to ``build_step``."""
+        self.clear()
+        self._pending = list(prompts)
+        if not deferred:
+            self.build_step()
+
+    def build_step(self, count=None):
+        """
+        Index up to ``count`` (all when None) of the prompts left by a deferred
+        ``rebuild``. Returns True when none is left.
+        """
+        pending = self._pending
+        for _ in range(len(pending) if count is None else min(count, len(pending))):
+            prompt = pending.pop()  # A ordem não importa para o índice
+            if prompt not in self._dropped:
+                self.add(prompt.name, self._content_of(prompt))
+        if not pending:
+            self._dropped.clear()
+        return not pending
+
+    def store_listener(self, event, name, prompt=None, old_name=None):
+        """Callback for ``PromptStore.subscribe`` that keeps the index in sync."""
+        if event == "reload":
+            return  # O dono do índice chama rebuild() com a nova biblioteca
+        if event == "delete":
+            self.remove(name)
+            if self._pending:
+                self._dropped.add(prompt)
+        elif event in ("insert", "update"):
+            if old_name and old_name != name:
+                self.remove(old_name)
+            self.add(name, self._content_of(prompt))
+
+    def _content_of(self, prompt):
+        # Só pede o conteúdo quando ele é indexado (pode ser lido sob demanda do disco)
+        if not self.include_content or prompt is None:
+            return None
+        return prompt.content
+
+    # ------------------------------------------------------------------ #
+    # Busca
+    # ------------------------------------------------------------------ #
+    def _hit_counts(self, needle, query_grams, use_content):
+        """
+        Count, per prompt, how many of ``query_grams`` it contains in its name
+        and (separately) in its content.
+
+        While the user types, each query extends the previous one and only adds
+        trigrams, so counts are derived from the cached state of the longest
+        cached prefix plus the postings of the new trigrams only.
+        """
+        base_grams, base = frozenset(), None
+        cache_key = (needle, use_content)
+        for cached_key in reversed(self._prefix_cache):
+            cached_needle, cached_content = cached_key
+            grams, counts = self._prefix_cache[cached_key]
+            if cached_content != use_content:
+                continue
+            if needle.startswith(cached_needle) and grams <= query_grams:
+                base_grams, base = grams, counts
+                break
+
+        # Counter.update() conta em C: bem mais rápido que um laço Python
+        name_hits = Counter(base[0]) if base else Counter()
+        content_hits = Counter(base[1]) if base else Counter()
+        for gram in query_grams - base_grams:
+            name_hits.update(self._postings.get(gram, ()))
+            if use_content:
+                content_hits.update(self._content_postings.get(gram, ()))
+
+        self._prefix_cache[cache_key] = (frozenset(query_grams), (name_hits, content_hits))
+        self._prefix_cache.move_to_end(cache_key)
+        while len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+            self._prefix_cache.popitem(last=False)
+        return name_hits, content_hits
+
+    def search(self, query, limit=None, include_content=None):
+        """
+        Return prompt names ranked by fuzzy similarity to ``query``.
+
+        Score = fraction of the query trigrams present in the prompt (content
+        trigrams count ``CONTENT_WEIGHT``), plus a bonus when the query is a
+        substring (or prefix) of the name. ``include_content`` (default: the
+        index setting) lets an index built with content answer name-only queries.
+        """
+        if include_content is None:
+            include_content = self.include_content
+        if self._pending:
+            self.build_step()
+        needle = normalize(query)
+        if not needle:
+            return []
+
+        # Consultas de 1-2 caracteres geram só trigramas de início de palavra
+        # ("  t", " tr"), que funcionam como busca por prefixo das palavras
+        query_grams = trigrams(needle, pad_end=False)
+        name_hits, content_hits = self._hit_counts(needle, query_grams, include_content)
+
+        total = len(query_grams)
+        threshold = MIN_SCORE * total
+        normalized = self._normalized
+
+        def rank(item):
+            name, hits = item
+            score = hits / total
+            position = normalized[name].find(needle)
+            if position == 0:
+                score += 1.0
+            elif position > 0:
+                score += 0.5
+            return (score, -len(name))
+
+        candidates = [item for item in name_hits.items() if item[1] >= threshold]
+        if content_hits:
+            # Acertos só no conteúdo entram, mas com peso menor no ranking
+            candidates = dict(candidates)
+            for name, hits in content_hits.items():
+                own = name_hits.get(name, 0)
+                if own + hits >= CONTENT_MIN_SCORE * total:
+                    candidates[name] = own + hits * CONTENT_WEIGHT
+            candidates = list(candidates.items())
+        if limit and len(candidates) > limit:
+            # Pré-corte só pelos acertos (barato) antes do ranking completo; quem
+            # contém a consulta como substring já tem (quase) todos os trigramas
+            candidates = heapq.nlargest(limit * 2, candidates, key=itemgetter(1))
+            ranked = heapq.nlargest(limit, candidates, key=rank)
+        else:
+            ranked = sorted(candidates, key=rank, reverse=True)
+        return [name for name, _ in ranked]
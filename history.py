@@ -0,0 +1,337 @@
+"""
+Revision history of every prompt, kept in ``prompts.history/``.
+
+Each prompt has its own append-only log (one line per revision, file
+named after a hash of the prompt name). A revision is either a keyframe
+(the whole content) or a delta: the operations that turn the previous
+revision into this one, over pieces of text cut at line and sentence ends
+so editing a word of a long paragraph stores one sentence, not the
+paragraph. A keyframe is written every ``KEYFRAME_INTERVAL`` revisions (or
+when the delta would not be smaller), so rebuilding any revision replays
+fewer than ``KEYFRAME_INTERVAL`` deltas.
+
+Nothing is read at startup: a log is opened when its history is shown or
+when its prompt is saved. ``HistoryStore`` has the write interface of a
+storage backend, so saves reach it through a ``WriteQueue`` off the UI
+thread.
+
+    python history.py report [diretório]    # tamanho dos históricos
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from difflib import SequenceMatcher
+
+from instrumentation import logger, span, count
+
+KEYFRAME_INTERVAL = 32  # Revisões entre conteúdos completos
+LATEST_CACHE_SIZE = 16  # Últimas versões mantidas para calcular o próximo delta
+
+_PIECE = re.compile(r".*?(?:[.!?;:](?=\s)|\n|$)", re.S)
+
+Revision = namedtuple("Revision", "rev ts name keyframe size")  # size: caracteres do conteúdo
+
+
+def split_pieces(text):
+    """Cut ``text`` at line and sentence ends (``"".join`` of the pieces gives it back)."""
+    return [piece for piece in _PIECE.findall(text) if piece]
+
+
+def make_delta(old, new):
+    """
+    Operations turning ``old`` into ``new``: ``n`` copies n pieces, ``-n``
+    skips n pieces of ``old`` and a list of strings inserts them.
+    """
+    a, b = split_pieces(old), split_pieces(new)
+    delta = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            delta.append(i2 - i1)
+            continue
+        if i2 > i1:
+            delta.append(i1 - i2)
+        if j2 > j1:
+            delta.append(b[j1:j2])
+    return delta
+
+
+def apply_delta(old, delta):
+    return "".join(_apply_pieces(split_pieces(old), delta))
+
+
+def _apply_pieces(pieces, delta):
+    # Peças copiadas e inseridas são exatamente as peças do novo texto, então
+    # uma cadeia de deltas é aplicada sem recortar o texto a cada passo
+    out, position = [], 0
+    for op in delta:
+        if isinstance(op, list):
+            out.extend(op)
+        elif op >= 0:
+            out.extend(pieces[position:position + op])
+            position += op
+        else:
+            position -= op
+    return out
+
+
+def _encode(body):
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+
+
+class HistoryStore:
+    """
+    Per-prompt revision logs under ``directory``.
+
+    Each line is ``rev<TAB>ts<TAB>size<TAB>K|D<TAB>json``, where the JSON is
+    the content (``K``, keyframe) or the delta (``D``). Listing revisions
+    only splits the headers; rebuilding one decodes just its keyframe and
+    the deltas actually replayed.
+    """
+
+    def __init__(self, directory, keyframe_interval=KEYFRAME_INTERVAL):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.RLock()
+        self._latest = OrderedDict()  # nome -> (revisão, conteúdo, deltas desde o keyframe)
+
+    def path_for(self, name):
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=12).hexdigest()
+        return os.path.join(self.directory, f"{digest}.log")
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def _lines(self, name):
+        """Raw lines of the log of ``name`` (headers are split only where needed)."""
+        try:
+            file = open(self.path_for(name), "r", encoding="utf-8", newline="\n")
+        except FileNotFoundError:
+            return []
+        with file:
+            count("arquivo.leituras")
+            # Só "\n" separa revisões: splitlines() também cortaria em U+2028,
+            # U+2029 e \x85, que o JSON grava sem escapar
+            lines = file.read().split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        return lines
+
+    def _parse(self, name, line):
+        fields = line.split("\t", 4)
+        if len(fields) == 5 and fields[0].isdigit():
+            return int(fields[0]), float(fields[1]), int(fields[2]), fields[3] == "K", fields[4]
+        # Linha incompleta (queda durante a gravação): ignorada
+        logger.warning("Revisão ilegível ignorada no histórico de '%s'.", name)
+        return None
+
+    def revisions(self, name):
+        """Metadata of every revision of ``name``, oldest first (no content is rebuilt)."""
+        with self._lock, span("histórico.listar"):
+            parsed = (self._parse(name, line) for line in self._lines(name))
+            return [Revision(item[0], item[1], name, item[3], item[2]) for item in parsed if item]
+
+    def content_at(self, name, rev):
+        """
+        Rebuild revision ``rev`` from its keyframe and the deltas after it.
+        Raises KeyError if there is no such revision and ValueError if it
+        depends on a line that cannot be decoded.
+        """
+        with self._lock, span("histórico.reconstruir"):
+            return self._rebuild(name, self._lines(name), rev)[1]
+
+    def _rebuild(self, name, lines, rev=None):
+        """
+        Return ``(rev, content, deltas since keyframe)`` for ``rev`` (default:
+        the last). Revision n is normally line n, so only the lines from its
+        keyframe on are parsed; a log with skipped lines falls back to a scan.
+        """
+        def holds(line):
+            return line.startswith(f"{rev}\t") and line.count("\t") >= 4  # Linha completa
+
+        if rev is None:
+            index = len(lines) - 1
+        elif 0 < rev <= len(lines) and holds(lines[rev - 1]):
+            index = rev - 1
+        else:
+            # Linhas incompletas deslocam a numeração; a revisão gravada depois delas vale
+            index = next((i for i in range(len(lines) - 1, -1, -1) if holds(lines[i])), -1)
+
+        chain = []  # Da revisão pedida de volta até o keyframe
+        while index >= 0:
+            item = self._parse(name, lines[index])
+            index -= 1
+            if item is None:
+                continue
+            chain.append(item)
+            if item[3]:
+                break
+        if not chain or not chain[-1][3] or (rev is not None and chain[0][0] != rev):
+            raise KeyError(rev)
+
+        try:
+            pieces = split_pieces(json.loads(chain[-1][4]))
+            for item in reversed(chain[:-1]):
+                pieces = _apply_pieces(pieces, json.loads(item[4]))
+        except (ValueError, TypeError):
+            logger.warning("Revisão ilegível no histórico de '%s'.", name)
+            raise ValueError(f"A revisão {chain[0][0]} de '{name}' está danificada no histórico.") from None
+        return chain[0][0], "".join(pieces), len(chain) - 1
+
+    def _newest(self, name, lines):
+        """
+        ``_rebuild`` of the last revision. Past damaged lines, the newest
+        revision that still rebuilds stands in, numbered as the last one and
+        with the next revision forced to be a keyframe (None: no revision).
+        """
+        try:
+            return self._rebuild(name, lines)
+        except (KeyError, ValueError):
+            pass
+        revs = [item[0] for item in (self._parse(name, line) for line in lines) if item]
+        if not revs:
+            return None
+        content = None  # Nada legível: a próxima revisão é gravada inteira
+        for end in range(len(lines) - 1, 0, -1):
+            try:
+                content = self._rebuild(name, lines[:end])[1]
+                break
+            except (KeyError, ValueError):
+                continue
+        return max(revs), content, self.keyframe_interval
+
+    def latest(self, name):
+        """``(rev, content, deltas since keyframe)`` of the newest revision, or None."""
+        with self._lock:
+            latest = self._latest.get(name)
+            if latest is None:
+                latest = self._newest(name, self._lines(name))
+                if latest is None:
+                    return None
+                self._remember(name, latest)
+            else:
+                self._latest.move_to_end(name)
+            return latest
+
+    def _remember(self, name, latest):
+        self._latest[name] = latest
+        self._latest.move_to_end(name)
+        if len(self._latest) > LATEST_CACHE_SIZE:
+            self._latest.popitem(last=False)
+        return latest
+
+    # ------------------------------------------------------------------ #
+    # Escrita
+    # ------------------------------------------------------------------ #
+    def record(self, name, content, previous=None, renamed_from=None, ts=None):
+        """
+        Append a revision of ``name`` (nothing if the content did not change).
+
+        ``previous`` is the content before the save: it becomes the first
+        revision of a prompt that has no history yet, so the first edit is
+        also recoverable. Returns the new revision number or None.
+        """
+        with self._lock:
+            if renamed_from and renamed_from != name:
+                self._rename(renamed_from, name)
+            ts = ts if ts is not None else time.time()
+            latest = self.latest(name)
+            if latest is None and previous is not None and previous != content:
+                latest = self._append(name, None, previous, ts)
+            if latest is not None and latest[1] == content:
+                return None
+            return self._append(name, latest, content, ts)[0]
+
+    def _append(self, name, latest, content, ts):
+        rev = latest[0] + 1 if latest else 1
+        kind, body, since_key = "K", _encode(content), 0
+        if latest is not None and latest[2] + 1 < self.keyframe_interval:
+            delta = _encode(make_delta(latest[1], content))
+            if len(delta) < len(body):
+                kind, body, since_key = "D", delta, latest[2] + 1
+
+        os.makedirs(self.directory, exist_ok=True)
+        count("arquivo.gravacoes")
+        with open(self.path_for(name), "ab+") as file:
+            # Uma queda anterior pode ter deixado uma linha pela metade:
+            # a revisão começa em uma linha nova para não ser misturada a ela
+            if file.tell() > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+            file.write(f"{rev}\t{ts:.3f}\t{len(content)}\t{kind}\t{body}\n".encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+        return self._remember(name, (rev, content, since_key))
+
+    def _rename(self, old_name, new_name):
+        old_path, new_path = self.path_for(old_name), self.path_for(new_name)
+        if os.path.exists(new_path):
+            # O novo nome já foi de um prompt excluído: o histórico dele é arquivado
+            # à parte, não misturado ao do prompt renomeado
+            archive = self._archive_path(new_path)
+            os.replace(new_path, archive)
+            logger.info("Histórico anterior de '%s' arquivado em %s.", new_name, os.path.basename(archive))
+        self._latest.pop(new_name, None)
+        if os.path.exists(old_path):
+            os.replace(old_path, new_path)
+            latest = self._latest.pop(old_name, None)
+            if latest is not None:
+                self._remember(new_name, latest)
+
+    @staticmethod
+    def _archive_path(path):
+        stem, number = path[:-len(".log")], 1
+        while os.path.exists(f"{stem}.arquivado-{number}.log"):
+            number += 1
+        return f"{stem}.arquivado-{number}.log"
+
+    def transfer(self, name, other, copy=False):
+        """Move (or copy) the log of ``name`` to ``other`` (another collection), unless it has one."""
+        with self._lock:
+            source, target = self.path_for(name), other.path_for(name)
+            if not os.path.exists(source) or os.path.exists(target):
+                return
+            os.makedirs(other.directory, exist_ok=True)
+            if copy:
+                shutil.copyfile(source, target)
+            else:
+                os.replace(source, target)
+                self._latest.pop(name, None)
+
+    # Interface de backend, para gravar pela WriteQueue
+    def record_upsert(self, prompt, original_name=None):
+        self.record(prompt["name"], prompt["content"], prompt.get("previous"), original_name)
+
+    def record_delete(self, name):
+        pass  # O histórico é mantido: recriar o prompt continua a numeração
+
+    def close(self):
+        pass
+
+
+def history_report(directory):
+    """Size of the logs in ``directory`` compared with the contents they can rebuild."""
+    files = [entry for entry in os.listdir(directory) if entry.endswith(".log")]
+    stored = sum(os.path.getsize(os.path.join(directory, entry)) for entry in files)
+    revisions = full = 0
+    for entry in files:
+        with open(os.path.join(directory, entry), "r", encoding="utf-8") as file:
+            for line in file:
+                revisions += 1
+                full += int(line.split("\t", 3)[2])
+    print(f"{len(files)} históricos, {revisions} revisões: {stored} B gravados para "
+          f"{full} caracteres de conteúdo ({stored / max(full, 1):.1%})")
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command != "report":
+        raise SystemExit(__doc__)
+    history_report(sys.argv[2] if len(sys.argv) > 2 else os.path.join(script_dir, "prompts.history"))
@@ -0,0 +1,139 @@
+from datetime import datetime
+from difflib import unified_diff
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPlainTextEdit,
+    QPushButton, QComboBox, QLabel, QSplitter, QMessageBox
+)
+from PyQt6.QtGui import QFontDatabase
+from PyQt6.QtCore import Qt
+
+from functions import get_prompt, prompt_history, prompt_revision
+from instrumentation import action
+
+COMPARE_PREVIOUS = "Comparar com a revisão anterior"
+COMPARE_CURRENT = "Comparar com o conteúdo atual"
+
+
+def diff_text(old, new, old_label, new_label):
+    """Unified diff of two contents, line by line (empty when they are equal)."""
+    lines = unified_diff(old.splitlines(), new.splitlines(), old_label, new_label, lineterm="")
+    return "\n".join(lines)
+
+
+class HistoryDialog(QDialog):
+    """
+    Revisions of one prompt: pick a revision, see its diff against the
+    previous one (or the current content) and choose it for restoring
+    (``chosen_rev``). The log is read when the dialog opens; each revision
+    is rebuilt only when selected.
+    """
+
+    def __init__(self, name, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.chosen_rev = None  # Revisão a restaurar; quem abriu o diálogo grava
+        self.setWindowTitle(f"Histórico de '{name}'")
+        self.resize(700, 500)
+
+        layout = QVBoxLayout(self)
+        self.revision_list = QListWidget()
+        self.compare_selector = QComboBox()
+        self.compare_selector.addItems([COMPARE_PREVIOUS, COMPARE_CURRENT])
+        self.diff_view = QPlainTextEdit()
+        self.diff_view.setReadOnly(True)
+        self.diff_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.diff_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.revision_list)
+        splitter.addWidget(self.diff_view)
+        splitter.setSizes([200, 500])
+        layout.addWidget(self.compare_selector)
+        layout.addWidget(splitter)
+
+        self.info_label = QLabel(" ")
+        layout.addWidget(self.info_label)
+
+        button_layout = QHBoxLayout()
+        self.restore_button = QPushButton("Restaurar esta revisão")
+        self.close_button = QPushButton("Fechar")
+        button_layout.addWidget(self.restore_button)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+
+        self.revision_list.currentRowChanged.connect(self.show_revision)
+        self.compare_selector.currentIndexChanged.connect(lambda _: self.show_revision(self.revision_list.currentRow()))
+        self.restore_button.clicked.connect(self.restore_action)
+        self.close_button.clicked.connect(self.accept)
+
+        self.load_revisions()
+
+    def load_revisions(self):
+        with action("histórico"):
+            self.revisions = prompt_history(self.name)
+            self.revision_list.clear()
+            # Mais recente primeiro
+            for revision in reversed(self.revisions):
+                when = datetime.fromtimestamp(revision.ts).strftime("%d/%m/%Y %H:%M")
+                item = QListWidgetItem(f"#{revision.rev}  {when}  ({revision.size} caracteres)")
+                item.setData(Qt.ItemDataRole.UserRole, revision.rev)
+                self.revision_list.addItem(item)
+
+            if not self.revisions:
+                self.diff_view.setPlainText("Nenhuma revisão gravada ainda. O histórico começa no próximo salvamento.")
+                self.restore_button.setEnabled(False)
+                return
+            self.revision_list.setCurrentRow(0)
+
+    def selected_rev(self):
+        item = self.revision_list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item is not None else None
+
+    def show_revision(self, row):
+        rev = self.selected_rev()
+        if rev is None:
+            return
+        with action("histórico.diff"):
+            try:
+                content = prompt_revision(self.name, rev)
+            except (KeyError, ValueError) as e:
+                # Linha danificada no histórico: as outras revisões continuam acessíveis
+                self.diff_view.setPlainText(str(e) if isinstance(e, ValueError) else f"Revisão {rev} não encontrada.")
+                self.info_label.setText(f"Revisão {rev}: ilegível")
+                self.restore_button.setEnabled(False)
+                return
+            self.restore_button.setEnabled(True)
+            if self.compare_selector.currentText() == COMPARE_CURRENT:
+                prompt = get_prompt(self.name)
+                current = prompt.content if prompt is not None else ""
+                text = diff_text(content, current, f"revisão {rev}", "atual")
+            else:
+                previous = self._readable(rev - 1) if rev > self.revisions[0].rev else None
+                if previous is None:
+                    text = content  # Primeira revisão (ou anterior ilegível): o conteúdo inteiro
+                else:
+                    text = diff_text(previous, content, f"revisão {rev - 1}", f"revisão {rev}")
+            self.diff_view.setPlainText(text or "Sem diferenças.")
+            self.info_label.setText(f"Revisão {rev}: {len(content)} caracteres")
+
+    def _readable(self, rev):
+        """Content of ``rev``, or None when it is missing or damaged."""
+        try:
+            return prompt_revision(self.name, rev)
+        except (KeyError, ValueError):
+            return None
+
+    def restore_action(self):
+        rev = self.selected_rev()
+        if rev is None:
+            return
+        reply = QMessageBox.question(
+            self,
+            "Confirmação",
+            f"Restaurar a revisão {rev} de '{self.name}'? O conteúdo atual continua no histórico.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+        )
+        if reply == QMessageBox.StandardButton.Yes:
+            self.chosen_rev = rev
+            self.accept()
@@ -0,0 +1,75 @@
+import json
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtNetwork import QLocalServer, QAbstractSocket
+
+import single_instance
+from instrumentation import logger, span
+
+
+class InstanceServer(QObject):
+    """
+    Resident side of the single-instance mode (see ``single_instance``).
+
+    Listens on a ``QLocalServer`` restricted to the current user and answers
+    each request line with ``handler(request)``, which runs on the UI thread
+    and returns ``(ok, message)``.
+    """
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self._buffers = {}  # conexão -> bytes recebidos até o fim da linha
+        self._server = QLocalServer(self)
+        self._server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self._server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """Start listening. Returns False when another instance already is."""
+        address = single_instance.server_address()
+        if self._server.listen(address):
+            return True
+        if self._server.serverError() != QAbstractSocket.SocketError.AddressInUseError:
+            logger.warning("Modo de instância única desativado: %s", self._server.errorString())
+            return False
+        if single_instance.send_request({"cmd": "ping"}) is not None:
+            return False
+        # Socket deixado por uma instância que terminou sem removê-lo (queda)
+        QLocalServer.removeServer(address)
+        return self._server.listen(address)
+
+    def close(self):
+        self._server.close()
+
+    def _accept(self):
+        while self._server.hasPendingConnections():
+            connection = self._server.nextPendingConnection()
+            self._buffers[connection] = b""
+            connection.readyRead.connect(lambda connection=connection: self._read(connection))
+            connection.disconnected.connect(lambda connection=connection: self._drop(connection))
+
+    def _drop(self, connection):
+        self._buffers.pop(connection, None)
+        connection.deleteLater()
+
+    def _read(self, connection):
+        if connection not in self._buffers:
+            return
+        data = self._buffers[connection] + bytes(connection.readAll())
+        line, newline, _ = data.partition(b"\n")
+        if not newline:
+            self._buffers[connection] = data  # Textos grandes chegam em vários pedaços
+            return
+        del self._buffers[connection]
+
+        try:
+            request = json.loads(line)
+            with span("instância.pedido"):
+                ok, message = self.handler(request)
+        except Exception as e:
+            logger.exception("Falha ao atender o pedido de outra instância.")
+            ok, message = False, f"Erro ao atender o pedido: {e}"
+        reply = json.dumps({"ok": ok, "message": message}, ensure_ascii=False) + "\n"
+        connection.write(reply.encode("utf-8"))
+        connection.flush()
+        connection.disconnectFromServer()
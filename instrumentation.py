@@ -0,0 +1,186 @@
+"""
+Lightweight instrumentation: timing spans, counters and a JSON-lines log.
+
+Spans and counters are always aggregated in memory (a couple of
+``perf_counter`` calls and a dict update each); individual span records are
+only logged at DEBUG level. ``action(name)`` wraps one user action and also
+records how much every counter (e.g. ``arquivo.leituras``) moved during it.
+``report()`` renders the aggregate table printed by ``--profile``.
+
+Logging is configured by ``configure_logging`` from ``PROMPTS_LOG_LEVEL``
+(DEBUG, INFO, WARNING...) and ``PROMPTS_LOG_FILE`` (default: stderr).
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger("prompt_manager")
+
+PROFILE_FLAG = "--profile"
+PROFILE_FILE = "prompt_manager.prof"
+
+_lock = threading.Lock()
+_spans = {}            # nome -> [contagem, total (s), máximo (s)]
+_counters = Counter()
+_action_counters = {}  # ação -> Counter com o quanto cada contador andou
+
+# Atributos padrão de LogRecord; o resto (via ``extra``) vai para o JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(default_level="INFO"):
+    """Send the application log, as JSON lines, to PROMPTS_LOG_FILE or stderr."""
+    level = os.environ.get("PROMPTS_LOG_LEVEL", default_level).upper()
+    path = os.environ.get("PROMPTS_LOG_FILE")
+    handler = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonLinesFormatter())
+
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+# ---------------------------------------------------------------------- #
+# Spans e contadores
+# ---------------------------------------------------------------------- #
+def _record_span(name, elapsed):
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            _spans[name] = [1, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+
+
+@contextmanager
+def span(name, **fields):
+    """Time the enclosed block under ``name`` (extra ``fields`` go to the DEBUG log)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _record_span(name, elapsed)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("span", extra={"span": name, "ms": round(elapsed * 1000, 3), **fields})
+
+
+def timed(name):
+    """Decorator form of ``span``."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+@contextmanager
+def action(name):
+    """A user action: a span plus how much each counter moved while it ran."""
+    with _lock:
+        before = dict(_counters)
+    with span(f"ação.{name}"):
+        yield
+    with _lock:
+        delta = {key: value - before.get(key, 0) for key, value in _counters.items()
+                 if value != before.get(key, 0)}
+        _action_counters.setdefault(name, Counter()).update(delta)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("ação", extra={"action": name, "counters": delta})
+
+
+def snapshot():
+    """Copy of the aggregated spans, counters and per-action counters."""
+    with _lock:
+        return {
+            "spans": {name: list(stats) for name, stats in _spans.items()},
+            "counters": dict(_counters),
+            "actions": {name: dict(counter) for name, counter in _action_counters.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _action_counters.clear()
+
+
+def report():
+    """Human-readable table of spans (by total time), counters and per-action counters."""
+    data = snapshot()
+    lines = ["== Spans (por tempo total) ==",
+             f"  {'total ms':>10} {'média ms':>10} {'máx ms':>10} {'n':>7}  nome"]
+    for name, (calls, total, longest) in sorted(data["spans"].items(), key=lambda item: -item[1][1]):
+        lines.append(f"  {total * 1000:10.2f} {total * 1000 / calls:10.3f} {longest * 1000:10.2f} {calls:7d}  {name}")
+    if data["counters"]:
+        lines.append("== Contadores ==")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"  {value:10d}  {name}")
+    if data["actions"]:
+        lines.append("== Contadores por ação (total) ==")
+        calls = {name[len("ação."):]: stats[0] for name, stats in data["spans"].items() if name.startswith("ação.")}
+        for name, counter in sorted(data["actions"].items()):
+            per_action = ", ".join(f"{key}={value / max(1, calls.get(name, 1)):.2f}/ação"
+                                   for key, value in sorted(counter.items()))
+            lines.append(f"  {name} ({calls.get(name, 0)}x): {per_action or '-'}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------- #
+# --profile
+# ---------------------------------------------------------------------- #
+def start_profiler():
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def finish_profiler(profiler, path=PROFILE_FILE, top=25, stream=None):
+    """Stop ``profiler``, save it to ``path`` and print the span report plus the top functions."""
+    import pstats
+
+    profiler.disable()
+    stream = stream or sys.stderr
+    profiler.dump_stats(path)
+    stream.write(report() + "\n")
+    stream.write(f"== cProfile (top {top} por tempo acumulado; completo em {path}) ==\n")
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
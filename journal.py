@@ -0,0 +1,329 @@
+import os
+import json
+import hashlib
+import threading
+
+from instrumentation import logger, span, count
+
+DEFAULT_COLOR = "#444444"
+
+# Tamanho (em bytes) a partir do qual o journal é compactado em um novo snapshot
+COMPACT_THRESHOLD = 512 * 1024
+
+
+class PromptConflictError(RuntimeError):
+    """prompts.json was changed by someone else since it was last loaded."""
+
+
+def file_fingerprint(path, known=None):
+    """
+    Return ``(mtime_ns, size, sha1)`` of ``path`` (None if it doesn't exist).
+
+    When ``known`` has the same mtime and size the file is not re-hashed.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if known is not None and known[:2] == (stat.st_mtime_ns, stat.st_size):
+        return known
+    count("arquivo.leituras")
+    with open(path, "rb") as file:
+        digest = hashlib.sha1(file.read()).hexdigest()
+    return (stat.st_mtime_ns, stat.st_size, digest)
+
+
+def apply_record(prompts, by_name, record):
+    """
+    Apply one journal record to an ordered prompt list and its name index.
+
+    Records are idempotent so replaying a journal over a snapshot that already
+    contains some of its operations (crash between snapshot and truncate)
+    yields the same library.
+    """
+    op = record.get("op")
+
+    if op == "delete":
+        prompt = by_name.pop(record["name"], None)
+        if prompt is not None:
+            prompts.remove(prompt)
+        return
+
+    if op not in ("upsert", "rename"):
+        return  # Registro desconhecido: ignora em vez de perder o restante
+
+    name = record.get("new_name", record["name"])
+    prompt = by_name.get(record["name"]) or by_name.get(name)
+    if prompt is None:
+        prompt = {"name": name}
+        prompts.append(prompt)
+    else:
+        by_name.pop(prompt["name"], None)
+
+    prompt["name"] = name
+    prompt["content"] = record["content"]
+    prompt["color"] = record.get("color") or DEFAULT_COLOR
+    by_name[name] = prompt
+
+
+def write_snapshot(path, prompts, compact=False):
+    """
+    Write ``{"prompts": [...]}`` atomically (temp file + fsync + rename).
+
+    ``compact`` drops the indentation and writes UTF-8 instead of ``\\u`` escapes.
+    """
+    count("arquivo.gravacoes")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8" if compact else None) as file:
+        if compact:
+            json.dump({"prompts": prompts}, file, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump({"prompts": prompts}, file, indent=4)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+
+class JournalBackend:
+    """
+    Snapshot + append-only operations journal.
+
+    ``prompts.json`` stays the snapshot (same format as always) and every save
+    or delete only appends one JSON line to ``prompts.json.journal``. At startup
+    the journal is replayed over the snapshot. Once the journal grows past
+    ``compact_threshold`` bytes it is folded into a fresh snapshot on a
+    background thread.
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_threshold=COMPACT_THRESHOLD, compact_json=False):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or snapshot_path + ".journal"
+        self.compact_threshold = compact_threshold
+        self.compact_json = compact_json  # Snapshot sem indentação (índices internos)
+        self._lock = threading.Lock()
+        self._compactor = None
+        self._known_snapshot = None  # (mtime_ns, tamanho, sha1) da última versão lida/gravada
+        self._compacting = False     # Snapshot sendo regravado pela própria compactação
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def load(self):
+        """Return the library (snapshot with the journal replayed on top)."""
+        with self._lock, span("journal.carregar"):
+            prompts, fingerprint = self._replay(self._journal_size())
+            self._known_snapshot = fingerprint
+            return prompts
+
+    def load_external(self):
+        """
+        Like ``load`` but without adopting the snapshot as the known version;
+        returns ``(prompts, fingerprint)`` so a watcher can parse off the UI
+        thread and call ``accept_snapshot(fingerprint)`` once it is applied.
+        """
+        with self._lock:
+            return self._replay(self._journal_size())
+
+    def accept_snapshot(self, fingerprint):
+        self._known_snapshot = fingerprint
+
+    def has_external_change(self):
+        """True if the snapshot on disk differs from the last one loaded or written."""
+        if self._compacting:
+            # O snapshot novo é nosso; o observador confere de novo após a gravação
+            return False
+        current = file_fingerprint(self.snapshot_path, self._known_snapshot)
+        if current is None or self._known_snapshot is None:
+            return current != self._known_snapshot
+        if current[2] == self._known_snapshot[2]:
+            # Só o mtime mudou (ex.: sincronização tocou o arquivo): mesmo conteúdo
+            self._known_snapshot = current
+            return False
+        return current != self._known_snapshot
+
+    def check_conflict(self):
+        """Raise PromptConflictError instead of writing over a newer snapshot."""
+        if self.has_external_change():
+            raise PromptConflictError(
+                "O arquivo de prompts foi alterado externamente. "
+                "Aguarde a atualização da lista antes de salvar."
+            )
+
+    def _replay(self, journal_limit):
+        prompts, fingerprint = self._read_snapshot()
+        by_name = {}
+        for prompt in prompts:
+            prompt.setdefault("color", DEFAULT_COLOR)
+            by_name[prompt["name"]] = prompt
+
+        for record in self._read_journal(journal_limit):
+            apply_record(prompts, by_name, record)
+        return prompts, fingerprint
+
+    def _read_snapshot(self):
+        count("arquivo.leituras")
+        try:
+            with open(self.snapshot_path, "rb") as file:
+                stat = os.fstat(file.fileno())
+                data = file.read()
+        except FileNotFoundError:
+            logger.warning("Erro ao carregar prompts: %s não existe. Retornando dados padrão.", self.snapshot_path)
+            return [], None
+
+        fingerprint = (stat.st_mtime_ns, stat.st_size, hashlib.sha1(data).hexdigest())
+        try:
+            return json.loads(data).get("prompts", []), fingerprint
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning("Erro ao carregar prompts. Retornando dados padrão.", exc_info=True)
+            return [], fingerprint
+
+    def _read_journal(self, limit):
+        try:
+            count("arquivo.leituras")
+            with open(self.journal_path, "rb") as file:
+                data = file.read(limit)
+        except FileNotFoundError:
+            return
+
+        for line in data.splitlines():
+            try:
+                yield json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                # Linha truncada por uma queda no meio da escrita
+                continue
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    # ------------------------------------------------------------------ #
+    # Escrita
+    # ------------------------------------------------------------------ #
+    def record_upsert(self, prompt, original_name=None):
+        self._append([self._upsert_record(prompt, original_name)])
+
+    def record_delete(self, name):
+        self._append([{"op": "delete", "name": name}])
+
+    def record_batch(self, ops):
+        """Append several operations with a single write and fsync."""
+        records = [
+            self._upsert_record(op[1], op[2]) if op[0] == "upsert" else {"op": "delete", "name": op[1]}
+            for op in ops
+        ]
+        if records:
+            self._append(records)
+
+    @staticmethod
+    def _upsert_record(prompt, original_name):
+        record = {"op": "upsert", "name": prompt["name"]}
+        if original_name and original_name != prompt["name"]:
+            record = {"op": "rename", "name": original_name, "new_name": prompt["name"]}
+        record["content"] = prompt["content"]
+        record["color"] = prompt.get("color", DEFAULT_COLOR)
+        return record
+
+    def _append(self, records):
+        count("arquivo.gravacoes")
+        with self._lock:
+            with open(self.journal_path, "ab+") as file:
+                # Uma queda anterior pode ter deixado uma linha pela metade:
+                # começa o registro em uma linha nova para não corrompê-lo
+                if file.tell() > 0:
+                    file.seek(-1, os.SEEK_END)
+                    if file.read(1) != b"\n":
+                        file.write(b"\n")
+                # Linha a linha pelo buffer do arquivo: um lote grande (importação)
+                # não vira uma única string na memória; continua um só fsync
+                for record in records:
+                    file.write((json.dumps(record) + "\n").encode("utf-8"))
+                file.flush()
+                os.fsync(file.fileno())
+            size = self._journal_size()
+
+        if size >= self.compact_threshold:
+            self.compact(wait=False)
+
+    def write_all(self, prompts):
+        """Replace the whole library at once (new snapshot, empty journal)."""
+        self._wait_compactor()
+        with self._lock:
+            write_snapshot(self.snapshot_path, prompts, self.compact_json)
+            self._known_snapshot = file_fingerprint(self.snapshot_path)
+            self._truncate_journal(self._journal_size())
+
+    # ------------------------------------------------------------------ #
+    # Compactação
+    # ------------------------------------------------------------------ #
+    def compact(self, wait=True):
+        """Fold the journal into a new snapshot, in the background unless ``wait``."""
+        if self._compactor is not None and self._compactor.is_alive():
+            if wait:
+                self._compactor.join()
+            return
+
+        if wait:
+            self._compact()
+            return
+
+        self._compactor = threading.Thread(target=self._compact, name="journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        with span("journal.compactar"):
+            self._compact_once()
+
+    def _compact_once(self):
+        with self._lock:
+            offset = self._journal_size()
+        if offset == 0:
+            return
+
+        # Reaplica apenas o que já estava no journal; novas linhas continuam sendo
+        # anexadas enquanto o snapshot é gravado. Alterações externas já presentes
+        # no snapshot são preservadas (ele é relido aqui).
+        external_change = self.has_external_change()
+        prompts, _ = self._replay(offset)
+        self._compacting = True
+        try:
+            write_snapshot(self.snapshot_path, prompts, self.compact_json)
+
+            with self._lock:
+                # Se havia mudança externa ainda não aplicada em memória, não a
+                # "aceita" aqui: o watcher ainda precisa enxergá-la
+                if not external_change:
+                    self._known_snapshot = file_fingerprint(self.snapshot_path)
+                self._truncate_journal(offset)
+        finally:
+            self._compacting = False
+
+    def _truncate_journal(self, offset):
+        """Drop the first ``offset`` bytes of the journal, keeping any newer records."""
+        try:
+            with open(self.journal_path, "rb") as file:
+                file.seek(offset)
+                remainder = file.read()
+        except FileNotFoundError:
+            return
+
+        if not remainder:
+            os.remove(self.journal_path)
+            return
+
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(remainder)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+    def _wait_compactor(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def close(self):
+        """Finish any running compaction and fold what is left of the journal."""
+        self._wait_compactor()
+        self._compact()
@@ -0,0 +1,341 @@
+"""
+Streaming import and export of prompt libraries.
+
+Formats (detected from the path unless given):
+
+* ``json``: ``{"prompts": [...]}`` (the ``prompts.json`` format) or a bare list;
+* ``jsonl``: one ``{"name", "content", "color"}`` object per line;
+* ``csv``: columns ``name``, ``content`` and optional ``color``;
+* ``md``: a folder with one Markdown file per prompt; an optional front
+  matter block (``name:`` / ``color:`` between ``---`` lines) comes before
+  the content, and the file name is used when there is no ``name:``.
+
+Readers are generators: the input is parsed record by record (JSON through
+``raw_decode`` over a sliding buffer), never loaded whole. ``ImportPlan``
+resolves every incoming record against a content-hash index of the library
+(``skip``, ``overwrite`` or ``rename`` on a name conflict; identical records
+are recognised and left alone) and collects the result for one batched
+write.
+"""
+import os
+import re
+import csv
+import json
+import hashlib
+from collections import Counter
+
+from journal import DEFAULT_COLOR
+from prompt_collections import slugify
+from instrumentation import logger, count
+
+FORMATS = ("json", "jsonl", "csv", "md")
+POLICIES = ("skip", "overwrite", "rename")
+READ_CHUNK = 1 << 16  # Caracteres lidos por vez pelo leitor de JSON
+
+_FRONT_MATTER = re.compile(r"\A---\n(.*?)\n---\n?", re.S)
+_RENAMED = "{name} ({number})"
+
+
+def detect_format(path):
+    if os.path.isdir(path):
+        return "md"
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension in ("json", "csv"):
+        return extension
+    if extension in ("md", "markdown", ""):
+        return "md"  # Pasta ainda não criada (exportação)
+    raise ValueError(f"Formato não reconhecido para '{path}': use --format ({', '.join(FORMATS)}).")
+
+
+def content_digest(content):
+    """Digest of ``content`` without surrounding whitespace (saves and imports strip it)."""
+    return hashlib.blake2b(content.strip().encode("utf-8"), digest_size=16).digest()
+
+
+# ---------------------------------------------------------------------- #
+# Leitura
+# ---------------------------------------------------------------------- #
+def read_prompts(path, fmt=None):
+    """Iterate over the records of ``path`` as ``{"name", "content", "color"}`` dicts."""
+    fmt = fmt or detect_format(path)
+    readers = {"json": iter_json, "jsonl": iter_jsonl, "csv": iter_csv, "md": iter_markdown}
+    if fmt not in readers:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    return readers[fmt](path)
+
+
+def iter_json(path, chunk_chars=READ_CHUNK):
+    """
+    Records of a JSON library, decoded one element at a time from a buffer
+    that only ever holds the element being parsed plus one chunk.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8-sig") as file:
+        count("arquivo.leituras")
+        buffer, position, eof = "", 0, False
+
+        def fill(at_least=0):
+            nonlocal buffer, position, eof
+            data = file.read(max(chunk_chars, at_least))
+            buffer, position = buffer[position:] + data, 0
+            eof = not data
+
+        def skip_space():
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer) or eof:
+                    return
+                fill()
+
+        def decode():
+            nonlocal position
+            while True:
+                try:
+                    value, position = decoder.raw_decode(buffer, position)
+                    return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    # Valor cortado no fim do bloco: dobra o que falta ler e tenta de novo
+                    fill(len(buffer) - position)
+
+        def expect(char):
+            nonlocal position
+            skip_space()
+            if buffer[position:position + 1] != char:
+                raise ValueError(f"'{path}' não é uma biblioteca de prompts válida.")
+            position += 1
+
+        # Início da lista: a própria raiz ou o valor da chave "prompts" do objeto
+        # raiz, achada decodificando as chaves (o texto "prompts" pode estar num valor)
+        skip_space()
+        if buffer[position:position + 1] == "{":
+            position += 1
+            while True:
+                skip_space()
+                if buffer[position:position + 1] in ("}", ""):
+                    raise ValueError(f"'{path}' não tem a lista \"prompts\".")
+                if buffer[position:position + 1] != '"':
+                    raise ValueError(f"'{path}' não é uma biblioteca de prompts válida.")
+                key = decode()
+                expect(":")
+                if key == "prompts":
+                    break
+                skip_space()
+                decode()  # Outras chaves (metadados) são descartadas
+                skip_space()
+                if buffer[position:position + 1] == ",":
+                    position += 1
+        expect("[")
+
+        while True:
+            skip_space()
+            if buffer[position:position + 1] == ",":
+                position += 1
+                skip_space()
+            if buffer[position:position + 1] in ("]", ""):
+                return
+            yield decode()
+
+
+def iter_jsonl(path):
+    with open(path, "r", encoding="utf-8-sig") as file:
+        count("arquivo.leituras")
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Linha %d de %s ignorada: JSON inválido.", number, path)
+
+
+def iter_csv(path):
+    csv.field_size_limit(1 << 30)  # Conteúdos longos em uma única célula
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        count("arquivo.leituras")
+        yield from csv.DictReader(file)
+
+
+def iter_markdown(directory):
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if not entry.is_file() or not entry.name.lower().endswith((".md", ".markdown")):
+            continue
+        with open(entry.path, "r", encoding="utf-8-sig") as file:
+            count("arquivo.leituras")
+            text = file.read()
+        record = {"name": os.path.splitext(entry.name)[0]}
+        match = _FRONT_MATTER.match(text)
+        if match:
+            for line in match.group(1).splitlines():
+                key, sep, value = line.partition(":")
+                if sep and key.strip() in ("name", "color"):
+                    record[key.strip()] = value.strip()
+            text = text[match.end():]
+        record["content"] = text
+        yield record
+
+
+# ---------------------------------------------------------------------- #
+# Escrita
+# ---------------------------------------------------------------------- #
+def write_prompts(prompts, path, fmt=None):
+    """Write ``prompts`` (records or dicts) to ``path`` one at a time. Returns how many."""
+    fmt = fmt or detect_format(path)
+    writers = {"json": _write_json, "jsonl": _write_jsonl, "csv": _write_csv, "md": _write_markdown}
+    if fmt not in writers:
+        raise ValueError(f"Formato desconhecido: {fmt}")
+    count("arquivo.gravacoes")
+    return writers[fmt]((_as_dict(prompt) for prompt in prompts), path)
+
+
+def _as_dict(prompt):
+    return prompt if isinstance(prompt, dict) else prompt.to_dict()
+
+
+def _write_json(prompts, path):
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{\n    "prompts": [')
+        for prompt in prompts:
+            file.write(",\n        " if written else "\n        ")
+            file.write(json.dumps(prompt, ensure_ascii=False))
+            written += 1
+        file.write("\n    ]\n}\n")
+    return written
+
+
+def _write_jsonl(prompts, path):
+    written = 0
+    with open(path, "w", encoding="utf-8") as file:
+        for prompt in prompts:
+            file.write(json.dumps(prompt, ensure_ascii=False) + "\n")
+            written += 1
+    return written
+
+
+def _write_csv(prompts, path):
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=("name", "content", "color"), extrasaction="ignore")
+        writer.writeheader()
+        for prompt in prompts:
+            writer.writerow(prompt)
+            written += 1
+    return written
+
+
+def _write_markdown(prompts, directory):
+    os.makedirs(directory, exist_ok=True)
+    used = set()
+    written = 0
+    for prompt in prompts:
+        # Nome de arquivo seguro e único; o nome verdadeiro vai no cabeçalho
+        stem = base = slugify(prompt["name"])
+        number = 2
+        while stem in used:
+            stem, number = f"{base}-{number}", number + 1
+        used.add(stem)
+        with open(os.path.join(directory, stem + ".md"), "w", encoding="utf-8") as file:
+            file.write(f"---\nname: {prompt['name']}\ncolor: {prompt.get('color', DEFAULT_COLOR)}\n---\n")
+            file.write(prompt["content"])
+        written += 1
+    return written
+
+
+# ---------------------------------------------------------------------- #
+# Resolução de conflitos
+# ---------------------------------------------------------------------- #
+class ImportPlan:
+    """
+    Decides what happens to each incoming record.
+
+    Built from the current library as a hash index (name -> content digest
+    and digest -> names). ``add(record)`` classifies a record as ``novo``,
+    ``substituído``, ``renomeado``, ``igual`` (same name and content, or an
+    earlier renamed import of it), ``ignorado`` or ``inválido``; accepted
+    records are kept, in order, in ``prompts`` and the index is updated so
+    later records (duplicates inside the input) see them.
+    """
+
+    def __init__(self, prompts, policy="skip"):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de conflito desconhecida: {policy}")
+        self.policy = policy
+        self.by_name = {}  # nome -> digest do conteúdo
+        self.by_digest = {}  # digest -> nomes com esse conteúdo
+        self.generated = {}  # nome original -> nomes criados por _free_name neste plano
+        self.prompts = []
+        self.results = Counter()
+        for prompt in prompts:
+            self._index(prompt.name, content_digest(prompt.content))
+
+    def _index(self, name, digest):
+        self.by_name[name] = digest
+        self.by_digest.setdefault(digest, set()).add(name)
+
+    def add(self, record):
+        if not isinstance(record, dict):
+            self.results["inválido"] += 1
+            return "inválido"
+        name = str(record.get("name") or "").strip()
+        content = str(record.get("content") or "").strip()
+        if not name or not content:
+            self.results["inválido"] += 1
+            return "inválido"
+        color = str(record.get("color") or "").strip() or DEFAULT_COLOR
+        digest = content_digest(content)
+
+        known = self.by_name.get(name)
+        if known is None:
+            outcome = "novo"
+        elif known == digest or self._imported_before(name, digest):
+            outcome = "igual"
+        elif self.policy == "skip":
+            outcome = "ignorado"
+        elif self.policy == "overwrite":
+            outcome = "substituído"
+            self.by_digest[known].discard(name)
+        else:
+            outcome = "renomeado"
+            name = self._free_name(name)
+
+        self.results[outcome] += 1
+        if outcome in ("novo", "substituído", "renomeado"):
+            self._index(name, digest)
+            self.prompts.append({"name": name, "content": content, "color": color})
+        return outcome
+
+    def _imported_before(self, name, digest):
+        # Com "rename", reimportar o mesmo arquivo não cria "nome (2)", "nome (3)"...
+        if self.policy != "rename":
+            return False
+        same_content = self.by_digest.get(digest, ())
+        if any(other in same_content for other in self.generated.get(name, ())):
+            return True
+        # Importações anteriores: só nomes exatamente no formato de _free_name
+        # ("nome (2)", "nome (3)"...), não qualquer "nome (...)" criado pelo usuário
+        renamed = re.compile(re.escape(name) + r" \(([1-9]\d*)\)")
+        for other in same_content:
+            match = renamed.fullmatch(other)
+            if match and int(match.group(1)) >= 2:
+                return True
+        return False
+
+    def _free_name(self, name):
+        number = 2
+        while _RENAMED.format(name=name, number=number) in self.by_name:
+            number += 1
+        free = _RENAMED.format(name=name, number=number)
+        self.generated.setdefault(name, []).append(free)
+        return free
+
+    def summary(self):
+        labels = {"novo": "novos", "substituído": "substituídos", "renomeado": "renomeados",
+                  "igual": "iguais", "ignorado": "ignorados (nome em uso)", "inválido": "inválidos"}
+        parts = [f"{self.results[key]} {label}" for key, label in labels.items() if self.results[key]]
+        return ", ".join(parts) or "nada a importar"
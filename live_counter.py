@@ -0,0 +1,137 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from text_stats import TextStats, count_lines, count_text, count_words
+from instrumentation import span
+
+PARAGRAPH_SEPARATOR = "\u2029"  # Entre blocos em QTextDocument.toRawText()
+
+# Alterações maiores que isso (colar, abrir arquivo) são recontadas em segundo plano
+INCREMENTAL_LIMIT = 20_000
+RECOUNT_DEBOUNCE_MS = 250
+
+
+class _CountSignals(QObject):
+    finished = pyqtSignal(int, object)  # (revisão, palavras por linha ou TextStats)
+
+
+class _CountTask(QRunnable):
+    """Counts a snapshot of the text on a pool thread."""
+
+    def __init__(self, revision, text, per_line):
+        super().__init__()
+        self.revision = revision
+        self.text = text
+        self.per_line = per_line
+        self.signals = _CountSignals()
+
+    def run(self):
+        with span("contador.recontar", chars=len(self.text)):
+            if self.per_line:
+                result = count_lines(self.text, PARAGRAPH_SEPARATOR)
+            else:
+                result = count_text(self.text)
+        self.signals.finished.emit(self.revision, result)
+
+
+class DocumentCounter(QObject):
+    """
+    Live character/word count of a ``QTextDocument``.
+
+    Keeps the word count of every block (paragraph) and, on each
+    ``contentsChange``, recounts only the blocks the edit touched; the
+    character count comes from the document in O(1). Large edits (a paste,
+    a loaded file) mark the counts stale instead and a full recount runs on
+    a pool thread after a short debounce. ``use_text(text)`` counts a Python
+    string instead of the document (a large transcript kept outside the
+    editor); ``use_text(None)`` goes back to the document.
+    """
+
+    changed = pyqtSignal(object)  # TextStats
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self._words = None     # Palavras por bloco; None enquanto a recontagem não chega
+        self._total = 0
+        self._text = None      # Texto contado no lugar do documento (use_text)
+        self._text_words = 0
+        self._revision = 0
+        self._task = None
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(RECOUNT_DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._recount)
+
+        document.contentsChange.connect(self._on_change)
+        if document.isEmpty():
+            self._words = [0] * document.blockCount()
+        else:
+            self._debounce.start()
+
+    def stats(self):
+        if self._text is not None:
+            return TextStats(len(self._text), self._text_words)
+        return TextStats(self.document.characterCount() - 1, self._total)
+
+    def pending(self):
+        """True while the word count waits for a background recount."""
+        return self._debounce.isActive() or self._task is not None
+
+    def use_text(self, text):
+        if text is None and self._text is None:
+            return
+        self._text = text
+        self._text_words = 0
+        self._mark_stale()
+
+    def _on_change(self, position, removed, added):
+        if self._text is not None:
+            return  # O documento só mostra uma prévia do texto contado
+        self._revision += 1
+        if self._words is None or removed + added > INCREMENTAL_LIMIT:
+            self._mark_stale()
+            return
+
+        document = self.document
+        end = min(position + added, document.characterCount() - 1)
+        first = document.findBlock(position).blockNumber()
+        last = document.findBlock(end).blockNumber()
+        # Blocos antigos substituídos pelos blocos first..last do documento atual
+        replaced = (last - first + 1) - (document.blockCount() - len(self._words))
+        new = [count_words(document.findBlockByNumber(number).text()) for number in range(first, last + 1)]
+        self._total += sum(new) - sum(self._words[first:first + replaced])
+        self._words[first:first + replaced] = new
+        self.changed.emit(self.stats())
+
+    def _mark_stale(self):
+        self._revision += 1
+        if self._text is None:
+            self._words = None
+        self._debounce.start()
+        self.changed.emit(self.stats())
+
+    def _recount(self):
+        if self._text is not None:
+            task = _CountTask(self._revision, self._text, per_line=False)
+        else:
+            # toRawText: um separador por bloco (toPlainText também quebra em U+2028)
+            task = _CountTask(self._revision, self.document.toRawText(), per_line=True)
+        self._task = task
+        task.setAutoDelete(False)  # O sinal ainda pode chegar depois do run()
+        task.signals.finished.connect(lambda revision, result: self._recounted(task, revision, result))
+        QThreadPool.globalInstance().start(task)
+
+    def _recounted(self, task, revision, result):
+        if task is not self._task:
+            return
+        self._task = None
+        if revision != self._revision:
+            self._debounce.start()  # O texto mudou durante a contagem
+            return
+        if isinstance(result, TextStats):
+            self._text_words = result.words
+        else:
+            self._words = result
+            self._total = sum(result)
+        self.changed.emit(self.stats())
@@ -1,38 +1,86 @@
+import sys
+
+import single_instance
+import startup_report
+
+# Já existe uma janela residente: entrega o pedido a ela e sai antes de carregar o PyQt6
+if __name__ == "__main__" and startup_report.REPORT_FLAG not in sys.argv and not startup_report.is_child():
+    single_instance.hand_over()
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout,
     QLineEdit, QPushButton, QComboBox, QTextEdit, QFrame,
-    QHBoxLayout, QMessageBox, QLabel, QProgressBar
+    QHBoxLayout, QMessageBox, QLabel, QProgressBar, QCheckBox, QFormLayout, QFileDialog,
+    QInputDialog, QMenu, QSystemTrayIcon
 )
-from PyQt6.QtGui import QClipboard, QIcon, QStandardItemModel, QStandardItem, QColor
+from PyQt6.QtGui import QClipboard, QIcon
 from PyQt6.QtCore import Qt, QTimer, QSize  # já deve ter a maioria, só adicione o QSize se faltar
 
-import sys
 from functions import (
-    initialize_prompts_file, load_prompts, save_prompt_to_file,
-    delete_prompt
+    initialize_prompts_file, save_prompt_to_file,
+    delete_prompt, get_prompt, get_store, fuzzy_search,
+    PromptConflictError, get_template, close_history, restore_revision,
+    list_collections, active_collection, create_collection, switch_collection, move_prompt,
+    record_use, flush_usage, pinned_prompts, warm_search_index
 )
 import os
-from PyQt6.QtCore import QTimer
-from PyQt6.QtWidgets import QColorDialog  
-import qtawesome as qta
+from PyQt6.QtCore import QTimer, QEvent
 from PyQt6.QtWidgets import QGraphicsOpacityEffect
 from PyQt6.QtCore import QPropertyAnimation
+from prompt_model import PromptListModel, PromptFilterProxyModel, PLACEHOLDER_TEXT
+from file_watcher import PromptsFileWatcher
+from sorting import ORDERINGS, BASE_COLOR, color_distance_key, use_system_collation
+from status_notifier import StatusNotifier
+from dialogs import custom_messagebox
+from background_writer import BackgroundWriter
+from transcript_input import TranscriptEdit, TranscriptLoader
+from text_stats import combine, count_text, token_limit
+import instrumentation
+from instrumentation import action, span, logger
 
 # FEITO: organizar por alfanumerico e alfabetico
 # FEITO: salvar inteligente, ou seja atualizar prompt ao inves de crair novo
 # FEITO: sistmea de cores de prompt
 
+NEW_COLLECTION_TEXT = "Nova coleção..."
+USAGE_FLUSH_INTERVAL_MS = 60_000
+# Largura dos seletores de prompt em caracteres: sem ela o Qt mede todas as linhas ao exibir
+SELECTOR_MIN_CHARS = 40
+
+
 class PromptManagerApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Prompt Manager")
         self.resize(650, 550)
-        self._pulse_timer = QTimer()
-        self._pulse_value = 255
-        self._pulse_direction = -15
         self._original_prompt_name = None
+        self._after_first_paint = []  # Tarefas adiadas para depois da 1ª pintura
+
+        # Modelo único sobre o PromptStore, compartilhado pelos dois seletores
+        self.prompt_model = PromptListModel(get_store(), self)
+
+        # Gravações em segundo plano; a confirmação chega quando estão no disco
+        self._pending_messages = {}  # nome -> mensagem a exibir após a gravação
+        self.writer = BackgroundWriter(get_store(), self)
+        self.writer.written.connect(self.prompts_written)
+        self.writer.failed.connect(self.prompts_write_failed)
 
+        # Contadores de uso ficam em memória; a cada minuto vão para o disco, se mudaram
+        self.usage_timer = QTimer(self)
+        self.usage_timer.setInterval(USAGE_FLUSH_INTERVAL_MS)
+        self.usage_timer.timeout.connect(flush_usage)
+        self.usage_timer.start()
 
+        # Acompanha alterações feitas por outras pessoas no prompts.json
+        self.file_watcher = None
+        if hasattr(get_store().backend, "load_external"):
+            self.file_watcher = PromptsFileWatcher(get_store(), get_store().path, self)
+            self.file_watcher.changes_applied.connect(self.external_changes_applied)
+            self.file_watcher.reload_failed.connect(self.external_reload_failed)
+
+
+        # Seletores de coleção (um em cada aba, sempre mostrando a mesma coleção ativa)
+        self.collection_selectors = []
 
         # Initialize Tabs
         self.tabs = QTabWidget()
@@ -41,9 +89,10 @@ class PromptManagerApp(QMainWindow):
         self.tabs.addTab(self.main_tab, "Prompts")
         self.tabs.addTab(self.settings_tab, "Configurações")
 
-        # Initialize Tabs Layouts
+        # Initialize Tabs Layouts (a aba de configurações é montada no primeiro acesso)
         self.init_main_tab()
-        self.init_settings_tab()
+        self._settings_ready = False
+        self.tabs.currentChanged.connect(self._ensure_settings_tab)
 
         # Set Central Widget
         self.setCentralWidget(self.tabs)
@@ -54,32 +103,95 @@ class PromptManagerApp(QMainWindow):
     def init_main_tab(self):
         main_layout = QVBoxLayout()
 
-        # User Input Text Box
-        self.text_box = QTextEdit()
+        # User Input Text Box (texto simples; arquivos podem ser arrastados para ela)
+        self.text_box = TranscriptEdit()
         self.text_box.setObjectName("mainTextBox")
 
-        self.text_box.setPlaceholderText("Digite seu texto aqui...")
+        self.text_box.setPlaceholderText("Digite seu texto aqui ou arraste um arquivo de texto...")
+        self.text_box.file_dropped.connect(self.open_transcript)
+        self.text_box.counter.changed.connect(self.update_size_label)
         main_layout.addWidget(self.text_box)
 
+        # Transcrições lidas de arquivo em segundo plano
+        self.transcript_loader = TranscriptLoader(self)
+        self.transcript_loader.progress.connect(self.transcript_progress)
+        self.transcript_loader.loaded.connect(self.transcript_loaded)
+        self.transcript_loader.failed.connect(self.transcript_failed)
+        transcript_layout = QHBoxLayout()
+        self.open_file_button = QPushButton("Abrir arquivo...")
+        self.open_file_button.clicked.connect(self.choose_transcript_file)
+        self.transcript_label = QLabel("")
+        self.transcript_label.setStyleSheet("color: gray;")
+        self._transcript_info = ""
+        self.discard_transcript_button = QPushButton("Descartar")
+        self.discard_transcript_button.clicked.connect(self.clear_text_box_action)
+        self.discard_transcript_button.hide()
+        transcript_layout.addWidget(self.open_file_button)
+        transcript_layout.addWidget(self.transcript_label, 1)
+        transcript_layout.addWidget(self.discard_transcript_button)
+        main_layout.addLayout(transcript_layout)
+
         # Status Message (altura fixa e sempre visível)
         self.status_label = QLabel(" ")
         self.status_label.setStyleSheet("color: lightgray; font-style: italic;")
         self.status_label.setFixedHeight(20)  # Altura fixa para não causar deslocamento
         main_layout.addWidget(self.status_label)
-
+        # Um único temporizador anima as labels de status, só enquanto há mensagem
+        self.status_notifier = StatusNotifier([self.status_label], self)
+
+
+        # Filtro por digitação (busca aproximada no nome e, opcionalmente, no conteúdo)
+        filter_layout = QHBoxLayout()
+        self.filter_entry = QLineEdit()
+        self.filter_entry.setPlaceholderText("Filtrar prompts...")
+        self.filter_entry.setClearButtonEnabled(True)
+        self.filter_entry.textChanged.connect(self.load_main_tab_selector)
+        self.filter_entry.returnPressed.connect(self.copy_to_clipboard_action)
+        self.filter_content_checkbox = QCheckBox("Buscar no conteúdo")
+        self.filter_content_checkbox.toggled.connect(self.load_main_tab_selector)
+        self.order_selector = self.create_order_selector("color", self.main_proxy_ordering_changed)
+        filter_layout.addWidget(self.create_collection_selector())
+        filter_layout.addWidget(self.filter_entry)
+        filter_layout.addWidget(self.filter_content_checkbox)
+        filter_layout.addWidget(self.order_selector)
+        main_layout.addLayout(filter_layout)
 
         # Prompt Selector
         self.selector = QComboBox()
-        self.selector.addItem("Selecione um prompt")
+        # Os prompts mais usados ficam fixados no topo, em negrito, qualquer que seja a ordenação
+        self.main_proxy = PromptFilterProxyModel(self.prompt_model, sort_key=self.ordering_key("color"),
+                                                 pinned=pinned_prompts)
+        self.selector.setModel(self.main_proxy)
         self.selector.setMaxVisibleItems(15)  # Valor ajustável, o padrão é 10
+        self.size_selector_by_length(self.selector)
+        self.selector.currentIndexChanged.connect(self.update_template_form)
         main_layout.addWidget(self.selector)
 
+        # Campos do modelo ({{campo}} no conteúdo do prompt selecionado)
+        self.template_form = QWidget()
+        self.template_form_layout = QFormLayout(self.template_form)
+        self.template_form_layout.setContentsMargins(0, 0, 0, 0)
+        self.template_form.hide()
+        self._template_inputs = {}  # campo -> QLineEdit
+        self._template_values = {}  # campo -> valor digitado (mantido ao trocar de prompt)
+        main_layout.addWidget(self.template_form)
+
+        # Tamanho estimado da composição (prompt + campos + texto do usuário)
+        self.size_label = QLabel(" ")
+        self.size_label.setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.size_label.setStyleSheet("color: gray;")
+        self._size_over = False
+        main_layout.addWidget(self.size_label)
+
         # Copy Button
         # Copy Button (com ícone e estilo bonito)
         self.copy_button = QPushButton("  Copiar para área de transferência")  # Espaço antes para o ícone
         self.copy_button.setObjectName("copyButton")
-        self.copy_button.setIcon(qta.icon("fa5s.copy", color="blue"))
         self.copy_button.setIconSize(QSize(16, 16))
+        # qtawesome (e as fontes de ícones) só depois da primeira pintura da janela
+        self._after_first_paint.append(self._load_icons)
+        # Índice da busca por digitação em etapas curtas, entre os eventos da janela
+        self._after_first_paint.append(self._warm_search_index)
         self.copy_button.clicked.connect(self.copy_to_clipboard_action)
         self.copy_button.setStyleSheet("""
             QPushButton {
@@ -113,30 +225,136 @@ class PromptManagerApp(QMainWindow):
         # Load Prompts
         self.load_main_tab_selector()
 
-    def sort_prompts_by_color_similarity(self, prompts, base_color="#444444"):
-        """Ordena os prompts pela similaridade de cor em relação à base."""
-        def hex_to_rgb(hex_color):
-            hex_color = hex_color.lstrip('#')
-            return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    def event(self, event):
+        # getattr: o Qt já envia eventos durante o super().__init__()
+        if getattr(self, "_after_first_paint", None) and event.type() == QEvent.Type.Paint:
+            tasks, self._after_first_paint = self._after_first_paint, []
+            for task in tasks:
+                QTimer.singleShot(0, task)
+        return super().event(event)
 
-        def color_distance(c1, c2):
-            # Distância Euclidiana no espaço RGB
-            return sum((a - b) ** 2 for a, b in zip(c1, c2)) ** 0.5
+    def _load_icons(self):
+        import qtawesome as qta
 
-        base_rgb = hex_to_rgb(base_color)
+        self.copy_button.setIcon(qta.icon("fa5s.copy", color="blue"))
 
-        sorted_prompts = sorted(
-            prompts,
-            key=lambda prompt: color_distance(hex_to_rgb(prompt.get("color", "#444444")), base_rgb)
+    def _warm_search_index(self):
+        if not warm_search_index():
+            QTimer.singleShot(0, self._warm_search_index)
+
+    def _ensure_settings_tab(self, index=None):
+        """Build the settings tab contents the first time they are needed."""
+        if not self._settings_ready and (index is None or self.tabs.widget(index) is self.settings_tab):
+            self._settings_ready = True
+            self.init_settings_tab()
+
+    def sort_prompts_by_color_similarity(self, prompts, base_color="#444444"):
+        """Ordena os prompts pela similaridade de cor em relação à base."""
+        if base_color == BASE_COLOR:
+            # Base padrão: usa as chaves já memorizadas no store
+            return sorted(prompts, key=self.ordering_key("color"))
+        return sorted(prompts, key=lambda prompt: color_distance_key(prompt, base_color))
+
+    def ordering_key(self, ordering):
+        """Sort key function for ``ordering`` (None keeps the file order)."""
+        if ordering == "file":
+            return None
+        return get_store().key_function(ordering)
+
+    @staticmethod
+    def size_selector_by_length(selector):
+        """Size a prompt selector by a fixed length, not by measuring every row of the library."""
+        selector.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+        selector.setMinimumContentsLength(SELECTOR_MIN_CHARS)
+        selector.view().setUniformItemSizes(True)  # Lista aberta: altura de uma linha vale para todas
+
+    def create_order_selector(self, current, on_change):
+        """Combo box listing the available orderings (``sorting.ORDERINGS``)."""
+        order_selector = QComboBox()
+        for ordering, label in ORDERINGS.items():
+            order_selector.addItem(label, ordering)
+        order_selector.setCurrentIndex(order_selector.findData(current))
+        order_selector.currentIndexChanged.connect(on_change)
+        return order_selector
+
+    def create_collection_selector(self):
+        """Combo box switching the active collection; the last item creates a new one."""
+        collection_selector = QComboBox()
+        collection_selector.setToolTip("Coleção de prompts")
+        self.collection_selectors.append(collection_selector)
+        self.fill_collection_selector(collection_selector)
+        # activated: só escolhas do usuário (preencher a lista não troca de coleção)
+        collection_selector.activated.connect(
+            lambda index, selector=collection_selector: self.collection_chosen(selector, index)
         )
+        return collection_selector
+
+    def fill_collection_selector(self, collection_selector):
+        collection_selector.clear()
+        for name in list_collections():
+            collection_selector.addItem(name, name)
+        collection_selector.addItem(NEW_COLLECTION_TEXT, None)
+        collection_selector.setCurrentIndex(collection_selector.findData(active_collection()))
+
+    def update_collection_selectors(self):
+        for collection_selector in self.collection_selectors:
+            self.fill_collection_selector(collection_selector)
+
+    def collection_chosen(self, collection_selector, index):
+        name = collection_selector.itemData(index)
+        if name is None:
+            name, ok = QInputDialog.getText(self, "Nova coleção", "Nome da nova coleção:")
+            if not ok or not name.strip():
+                self.update_collection_selectors()
+                return
+            try:
+                name = create_collection(name)
+            except ValueError as e:
+                self.update_collection_selectors()
+                self.show_status(str(e), tipo="error")
+                return
+        self.open_collection(name)
+
+    def open_collection(self, name):
+        """Switch both tabs to collection ``name`` (only its shard is read)."""
+        if name == active_collection():
+            self.update_collection_selectors()
+            return
+        with action("coleção"):
+            try:
+                switch_collection(name)
+            except Exception as e:
+                self.update_collection_selectors()
+                self.show_status(f"Erro ao abrir a coleção: {str(e)}", tipo="error")
+                return
+            if self.file_watcher is not None:
+                self.file_watcher.watch(get_store().path)
+            self.update_collection_selectors()
+            self.update_all_selectors()
+            self.selector.setCurrentIndex(0)
+            if self._settings_ready:
+                self.prompt_selector.setCurrentIndex(0)
+                self.load_prompt_action()
+        self.show_status(f"Coleção '{name}' aberta ({len(get_store())} prompts).", tipo="info")
 
-        return sorted_prompts
+    def main_proxy_ordering_changed(self):
+        self.main_proxy.set_sort_key(self.ordering_key(self.order_selector.currentData()))
 
-    def load_main_tab_selector(self):
-        """Load prompts into the selector on the main tab, with colored items."""
-        prompts = self.sort_prompts_by_color_similarity(load_prompts())
+    def settings_proxy_ordering_changed(self):
+        self.settings_proxy.set_sort_key(self.ordering_key(self.prompt_order_selector.currentData()))
 
-        self.populate_prompt_combobox(self.selector, prompts)
+    def load_main_tab_selector(self):
+        """Apply the main tab filter (or the colour ordering) to its selector."""
+        with action("filtrar"):
+            query = self.filter_entry.text()
+            if query.strip():
+                # Com filtro: ordem por relevância e o melhor resultado já selecionado
+                self.main_proxy.set_ranked_names(fuzzy_search(query, self.filter_content_checkbox.isChecked()))
+                self.selector.setCurrentIndex(1 if self.main_proxy.rowCount() > 1 else 0)
+                return
+
+            self.main_proxy.set_ranked_names(None)
+            self.selector.setCurrentIndex(0)
 
     def animar_botao_ao_clicar(self, botao: QPushButton):
         efeito = QGraphicsOpacityEffect(botao)
@@ -154,51 +372,130 @@ class PromptManagerApp(QMainWindow):
 
     def copy_to_clipboard_action(self):
         """Combine selected prompt with user text and copy to clipboard."""
-        # Obter o texto do usuário
-        self.animar_botao_ao_clicar(self.copy_button)
-
-        user_text = self.text_box.toPlainText().strip()
-
-        # Obter o prompt selecionado
-        selected_prompt_name = self.selector.currentText()
-        if selected_prompt_name == "Selecione um prompt":
-            self.show_status("Selecione um prompt válido!", tipo="warning")
-
-
-            return
-
-        # Carregar o conteúdo do prompt selecionado
-        prompts = load_prompts()
-        selected_prompt_content = next(
-            (prompt["content"] for prompt in prompts if prompt["name"] == selected_prompt_name),
-            None
-        )
-
-        if not selected_prompt_content:
-            self.show_status("O prompt selecionado não foi encontrado.", tipo="error")
-            return
-
-
-        # Combinar o prompt com o texto do usuário, ou usar apenas o prompt
-        if user_text:
-            final_text = f'{selected_prompt_content} "{user_text}"'
-            message = "O texto foi copiado para a área de transferência!"
-        else:
-            final_text = selected_prompt_content
-            message = "Apenas o conteúdo do prompt foi copiado para a área de transferência!"
-
-        # Copiar para a área de transferência
-        QApplication.clipboard().setText(final_text)
-        self.show_status(message, tipo="success")
-
+        with action("copiar"):
+            # Obter o texto do usuário
+            self.animar_botao_ao_clicar(self.copy_button)
+
+            # Transcrições grandes vêm direto da string carregada (sem toPlainText)
+            user_text = self.text_box.user_text()
+
+            # Obter o prompt selecionado
+            selected_prompt_name = self.selector.currentText()
+            if selected_prompt_name == PLACEHOLDER_TEXT:
+                self.show_status("Selecione um prompt válido!", tipo="warning")
+
+
+                return
+
+            # Modelo compilado do prompt selecionado (sem reler o arquivo)
+            template = get_template(selected_prompt_name)
+
+            if template is None:
+                self.show_status("O prompt selecionado não foi encontrado.", tipo="error")
+                return
+
+            values = self.template_values()
+            missing = template.missing(values)
+            if missing:
+                self.show_status(f"Preencha {'o campo' if len(missing) == 1 else 'os campos'}: {', '.join(missing)}",
+                                 tipo="warning")
+                self._template_inputs[missing[0]].setFocus()
+                return
+
+            # Combinar o prompt com o texto do usuário (e os campos), ou usar apenas o prompt
+            with span("compor"):
+                final_text = template.render(user_text, values)
+            if user_text:
+                message = "O texto foi copiado para a área de transferência!"
+            else:
+                message = "Apenas o conteúdo do prompt foi copiado para a área de transferência!"
+
+            # Copiar para a área de transferência
+            with span("área de transferência"):
+                QApplication.clipboard().setText(final_text)
+            # Só na memória; as estatísticas vão para o disco em lote (usage_stats)
+            record_use(selected_prompt_name)
+
+            tokens, limit = self.composition_stats().tokens, token_limit()
+            if tokens > limit:
+                self.show_status(f"Copiado, mas ~{format_count(tokens)} tokens passam do limite de "
+                                 f"{format_count(limit)}.", tipo="warning")
+                return
+            self.show_status(message, tipo="success")
+
+
+    def update_template_form(self):
+        """Show one input per placeholder of the prompt selected in the main tab."""
+        name = self.selector.currentText()
+        template = get_template(name) if name != PLACEHOLDER_TEXT else None
+        fields = template.fields if template is not None else ()
+
+        while self.template_form_layout.rowCount():
+            self.template_form_layout.removeRow(0)
+        self._template_inputs = {}
+        for field in fields:
+            entry = QLineEdit(self._template_values.get(field.name, ""))
+            entry.setPlaceholderText(field.default or "obrigatório")
+            entry.textChanged.connect(lambda text, field_name=field.name: self.template_field_changed(field_name, text))
+            entry.returnPressed.connect(self.copy_to_clipboard_action)
+            self.template_form_layout.addRow(f"{field.name}:", entry)
+            self._template_inputs[field.name] = entry
+        self.template_form.setVisible(bool(fields))
+        self.update_size_label()
+
+    def template_field_changed(self, name, text):
+        self._template_values[name] = text
+        self.update_size_label()
+
+    def template_values(self):
+        return {name: entry.text().strip() for name, entry in self._template_inputs.items()}
+
+    def composition_stats(self):
+        """Estimated size of what the copy button would produce now."""
+        parts = [self.text_box.counter.stats()]
+        name = self.selector.currentText()
+        prompt_stats = get_store().text_stats(name) if name != PLACEHOLDER_TEXT else None
+        if prompt_stats is not None:
+            parts.append(prompt_stats)
+            parts += [count_text(value) for value in self.template_values().values() if value]
+        return combine(*parts)
+
+    def update_size_label(self, *_):
+        """Live character/word/token counter; red above the token limit."""
+        stats, limit = self.composition_stats(), token_limit()
+        text = (f"{format_count(stats.chars)} caracteres · {format_count(stats.words)} palavras · "
+                f"~{format_count(stats.tokens)} tokens")
+        if self.text_box.counter.pending():
+            text += " (contando...)"
+        over = stats.tokens > limit
+        if over:
+            text += f" — acima do limite de {format_count(limit)}"
+        self.size_label.setText(text)
+        if over != self._size_over:
+            self._size_over = over
+            self.size_label.setStyleSheet("color: #FF5C5C; font-weight: bold;" if over else "color: gray;")
 
     def init_settings_tab(self):
         settings_layout = QVBoxLayout()
 
+        # Filtro por digitação do seletor de configurações
+        self.prompt_filter_entry = QLineEdit()
+        self.prompt_filter_entry.setPlaceholderText("Filtrar prompts...")
+        self.prompt_filter_entry.setClearButtonEnabled(True)
+        self.prompt_filter_entry.textChanged.connect(self.load_prompt_selector)
+        self.prompt_order_selector = self.create_order_selector("file", self.settings_proxy_ordering_changed)
+        settings_filter_layout = QHBoxLayout()
+        settings_filter_layout.addWidget(self.create_collection_selector())
+        settings_filter_layout.addWidget(self.prompt_filter_entry)
+        settings_filter_layout.addWidget(self.prompt_order_selector)
+        settings_layout.addLayout(settings_filter_layout)
+
         # Prompt Selector
         self.prompt_selector = QComboBox()
-        self.prompt_selector.addItem("Selecione um prompt")
+        self.settings_proxy = PromptFilterProxyModel(self.prompt_model)
+        self.prompt_selector.setModel(self.settings_proxy)
         self.prompt_selector.setMaxVisibleItems(15)  
+        self.size_selector_by_length(self.prompt_selector)
         settings_layout.addWidget(self.prompt_selector)
 
         # Divider
@@ -223,6 +520,7 @@ class PromptManagerApp(QMainWindow):
         self.config_status_label.setFixedHeight(20)  # Mantém o espaço reservado
         self.config_status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         settings_layout.addWidget(self.config_status_label)
+        self.status_notifier.add_label(self.config_status_label)
 
         # Prompt Content Text Box
         self.prompt_text_box = QTextEdit()
@@ -241,8 +539,16 @@ class PromptManagerApp(QMainWindow):
         button_layout = QHBoxLayout()
         self.save_button = QPushButton("Salvar")
         self.delete_button = QPushButton("Excluir")
+        self.history_button = QPushButton("Histórico...")
+        # Mover/copiar para outra coleção (menu montado ao abrir, com as coleções atuais)
+        self.move_button = QPushButton("Mover/Copiar")
+        self.move_menu = QMenu(self.move_button)
+        self.move_menu.aboutToShow.connect(self.fill_move_menu)
+        self.move_button.setMenu(self.move_menu)
         button_layout.addWidget(self.save_button)
         button_layout.addWidget(self.delete_button)
+        button_layout.addWidget(self.history_button)
+        button_layout.addWidget(self.move_button)
         settings_layout.addLayout(button_layout)
 
         # Set Layout
@@ -251,201 +557,325 @@ class PromptManagerApp(QMainWindow):
         # Connect Events
         self.save_button.clicked.connect(self.save_prompt_action)
         self.delete_button.clicked.connect(self.delete_prompt_action)
+        self.history_button.clicked.connect(self.history_action)
         self.prompt_selector.currentIndexChanged.connect(self.load_prompt_action)
 
         # Load Prompts
         self.load_prompt_selector()
 
     def load_prompt_selector(self):
-        """Load prompts into the selector on the settings tab, with colored items."""
-        prompts = load_prompts()
-        self.populate_prompt_combobox(self.prompt_selector, prompts)
+        """Apply the settings tab filter to its selector (file order when empty)."""
+        with action("filtrar"):
+            query = self.prompt_filter_entry.text()
+            self.settings_proxy.set_ranked_names(fuzzy_search(query) if query.strip() else None)
+            self.prompt_selector.setCurrentIndex(0)
 
 
     def load_prompt_action(self):
         """Load selected prompt details into input fields."""
-        selected_name = self.prompt_selector.currentText()
+        with action("carregar"):
+            selected_name = self.prompt_selector.currentText()
 
-        if selected_name == "Selecione um prompt":
-            # Entrando no modo "novo prompt"
-            self.prompt_name_entry.clear()
-            self.prompt_text_box.clear()
-            self.color_button.setStyleSheet("")
-            self.color_button.setText("Escolher Cor")
-            self.selected_color = None
-            self._original_prompt_name = None
-            return
+            if selected_name == PLACEHOLDER_TEXT:
+                # Entrando no modo "novo prompt"
+                self.prompt_name_entry.clear()
+                self.prompt_text_box.clear()
+                self.color_button.setStyleSheet("")
+                self.color_button.setText("Escolher Cor")
+                self.selected_color = None
+                self._original_prompt_name = None
+                return
 
-        prompts = load_prompts()
-        selected_prompt = next(
-            (prompt for prompt in prompts if prompt["name"] == selected_name), None
-        )
+            selected_prompt = get_prompt(selected_name)
 
-        if selected_prompt:
-            self._original_prompt_name = selected_prompt["name"]
-            self.prompt_name_entry.setText(selected_prompt["name"])
-            self.prompt_text_box.setPlainText(selected_prompt["content"])
+            if selected_prompt:
+                self._original_prompt_name = selected_prompt.name
+                self.prompt_name_entry.setText(selected_prompt.name)
+                self.prompt_text_box.setPlainText(selected_prompt.content)
 
-            color = selected_prompt.get("color", "#444444")
-            self.selected_color = color
-            self.color_button.setStyleSheet(f"background-color: {color}; color: black;")
-            self.color_button.setText(color)
+                color = selected_prompt.color
+                self.selected_color = color
+                self.color_button.setStyleSheet(f"background-color: {color}; color: black;")
+                self.color_button.setText(color)
 
 
     def save_prompt_action(self):
         """Save or edit prompt in the JSON file."""
-        name = self.prompt_name_entry.text().strip()
-        content = self.prompt_text_box.toPlainText().strip()
+        with action("salvar"):
+            name = self.prompt_name_entry.text().strip()
+            content = self.prompt_text_box.toPlainText().strip()
 
-        if not name or not content:
-            self.show_status("O nome e o conteúdo do prompt não podem estar vazios.", tipo="error")
-            return
+            if not name or not content:
+                self.show_status("O nome e o conteúdo do prompt não podem estar vazios.", tipo="error")
+                return
 
-        # Captura o nome original do prompt selecionado
-        original_name = self.prompt_selector.currentText()
-        if original_name == "Selecione um prompt":
-            original_name = None  # Trata como novo prompt
+            # Captura o nome original do prompt selecionado
+            original_name = self.prompt_selector.currentText()
+            if original_name == PLACEHOLDER_TEXT:
+                original_name = None  # Trata como novo prompt
 
-        try:
-            save_prompt_to_file(name, content, self.selected_color, original_name)
-            self.show_status(f"Prompt '{name}' salvo com sucesso!", tipo="success")
+            try:
+                save_prompt_to_file(name, content, self.selected_color, original_name)
+                self._pending_messages[name] = f"Prompt '{name}' salvo com sucesso!"
 
-            self.update_all_selectors()
-            self.prompt_selector.setCurrentText(name)  # Atualiza a seleção após salvar
-        except ValueError as e:
-            self.show_status(str(e), tipo="error")
-        except Exception as e:
-            self.show_status(f"Erro inesperado: {str(e)}", tipo="error")
+                self.update_all_selectors()
+                self.prompt_selector.setCurrentText(name)  # Atualiza a seleção após salvar
+            except ValueError as e:
+                self.show_status(str(e), tipo="error")
+            except PromptConflictError as e:
+                self.show_status(str(e), tipo="warning")
+            except Exception as e:
+                self.show_status(f"Erro inesperado: {str(e)}", tipo="error")
 
 
     def delete_prompt_action(self):
         """Delete the selected prompt."""
+        with action("excluir"):
+            selected_name = self.prompt_selector.currentText()
+            if selected_name == PLACEHOLDER_TEXT:
+                self.show_status("Selecione um prompt válido para excluir.", tipo="error")
+                return
+
+            reply = QMessageBox.question(
+                self,
+                "Confirmação",
+                f"Tem certeza de que deseja excluir o prompt '{selected_name}'?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                try:
+                    delete_prompt(selected_name)
+                except PromptConflictError as e:
+                    self.show_status(str(e), tipo="warning")
+                    return
+                self._pending_messages[selected_name] = f"Prompt '{selected_name}' excluído com sucesso!"
+
+                self.update_all_selectors()
+                self.prompt_selector.setCurrentIndex(0)
+                self.prompt_name_entry.clear()
+                self.prompt_text_box.clear()
+
+    def history_action(self):
+        """Show the revisions of the selected prompt and restore the chosen one."""
         selected_name = self.prompt_selector.currentText()
-        if selected_name == "Selecione um prompt":
-            self.show_status("Selecione um prompt válido para excluir.", tipo="error")
+        if selected_name == PLACEHOLDER_TEXT:
+            self.show_status("Selecione um prompt para ver o histórico.", tipo="error")
             return
 
-        reply = QMessageBox.question(
-            self,
-            "Confirmação",
-            f"Tem certeza de que deseja excluir o prompt '{selected_name}'?",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-        )
-        if reply == QMessageBox.StandardButton.Yes:
-            delete_prompt(selected_name)
-            self.show_status(f"Prompt '{selected_name}' excluído com sucesso!", tipo="success")
+        from history_dialog import HistoryDialog  # Só carregado quando alguém abre o histórico
 
+        dialog = HistoryDialog(selected_name, self)
+        dialog.exec()
+        if dialog.chosen_rev is None:
+            return
+        with action("restaurar"):
+            try:
+                restore_revision(selected_name, dialog.chosen_rev)
+            except PromptConflictError as e:
+                self.show_status(str(e), tipo="warning")
+                return
+            except Exception as e:
+                self.show_status(f"Erro inesperado: {str(e)}", tipo="error")
+                return
+            self._pending_messages[selected_name] = f"Revisão {dialog.chosen_rev} de '{selected_name}' restaurada!"
+            self.update_all_selectors()
+            self.prompt_selector.setCurrentText(selected_name)
+            self.load_prompt_action()
+
+    def fill_move_menu(self):
+        self.move_menu.clear()
+        others = [name for name in list_collections() if name != active_collection()]
+        for label, copy in (("Mover para", False), ("Copiar para", True)):
+            submenu = self.move_menu.addMenu(label)
+            for name in others:
+                submenu.addAction(name).triggered.connect(
+                    lambda _, target=name, copy=copy: self.move_prompt_action(target, copy)
+                )
+            if not others:
+                submenu.addAction("Nenhuma outra coleção").setEnabled(False)
+
+    def move_prompt_action(self, target, copy=False):
+        """Move or copy the selected prompt to collection ``target``."""
+        selected_name = self.prompt_selector.currentText()
+        if selected_name == PLACEHOLDER_TEXT:
+            self.show_status("Selecione um prompt para mover ou copiar.", tipo="error")
+            return
+        with action("mover"):
+            try:
+                move_prompt(selected_name, target, copy)
+            except (ValueError, PromptConflictError) as e:
+                self.show_status(str(e), tipo="warning")
+                return
+            except Exception as e:
+                self.show_status(f"Erro inesperado: {str(e)}", tipo="error")
+                return
+            if copy:
+                self.show_status(f"Prompt '{selected_name}' copiado para '{target}'.", tipo="success")
+                return
+            self._pending_messages[selected_name] = f"Prompt '{selected_name}' movido para '{target}'."
             self.update_all_selectors()
+            self.prompt_selector.setCurrentIndex(0)
             self.prompt_name_entry.clear()
             self.prompt_text_box.clear()
 
-    def update_all_selectors(self):
-        """Update both combo boxes (main and settings) with colored prompt items."""
-        prompts = load_prompts()
-        self.populate_prompt_combobox(self.selector, prompts)
-        self.populate_prompt_combobox(self.prompt_selector, prompts)
-
+    def prompts_written(self, names):
+        messages = [self._pending_messages.pop(name) for name in names if name in self._pending_messages]
+        if messages:
+            self.show_status(messages[-1], tipo="success")
 
-    def clear_text_box_action(self):
-        """Limpa o conteúdo da caixa de texto do usuário."""
-        self.text_box.clear()
-        self.show_status("Texto limpo com sucesso.", tipo="info")
+    def prompts_write_failed(self, message):
+        # A biblioteca em memória continua correta; a gravação é tentada de novo
+        self.show_status("Falha ao gravar os prompts. Nova tentativa no próximo salvamento.", tipo="error")
+        custom_messagebox(f"Não foi possível gravar os prompts: {message}", "error", self)
 
-    def populate_prompt_combobox(self, combo_box: QComboBox, prompts: list):
-        model = QStandardItemModel()
-        default_item = QStandardItem("Selecione um prompt")
-        #default_item.setFlags(default_item.flags() & ~Qt.ItemFlag.ItemIsSelectable)  # Não selecionável
-        model.appendRow(default_item)
+    def external_changes_applied(self, count):
+        self.update_all_selectors()
+        self.show_status(f"{count} prompt(s) atualizado(s) a partir do arquivo.", tipo="info")
 
-        for prompt in prompts:
-            name = prompt["name"]
-            color_hex = prompt.get("color", "#444444")
-            bg_color = QColor(color_hex)
+    def external_reload_failed(self, message):
+        # Aviso não modal: a leitura falhou em segundo plano e a UI segue livre
+        custom_messagebox(f"Não foi possível reler {os.path.basename(get_store().path)}: {message}", "error", self)
 
-            # Calcular brilho (luminosidade percebida)
-            brightness = (0.299 * bg_color.red() + 0.587 * bg_color.green() + 0.114 * bg_color.blue())
-
-            # Cor do texto: preto se fundo for claro, branco se fundo for escuro
-            text_color = QColor("#000000") if brightness > 160 else QColor("#FFFFFF")
-
-            item = QStandardItem(name)
-            item.setBackground(bg_color)
-            item.setForeground(text_color)
+    def update_all_selectors(self):
+        """
+        Re-run active filters after an edit. The shared model already received
+        the change as a single inserted/changed/removed row; the template form
+        follows the (possibly edited) selected prompt.
+        """
+        if self.filter_entry.text().strip():
+            self.load_main_tab_selector()
+        self.update_template_form()
+        if self._settings_ready and self.prompt_filter_entry.text().strip():
+            self.load_prompt_selector()
 
-            model.appendRow(item)
 
-        combo_box.setModel(model)
-        combo_box.setCurrentIndex(0)
+    def clear_text_box_action(self):
+        """Limpa o conteúdo da caixa de texto do usuário."""
+        self.text_box.clear_input()
+        self.transcript_label.setText("")
+        self.discard_transcript_button.hide()
+        self.show_status("Texto limpo com sucesso.", tipo="info")
 
+    def choose_transcript_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Abrir transcrição", "", "Arquivos de texto (*.txt *.md *.csv *.srt);;Todos os arquivos (*)"
+        )
+        if path:
+            self.open_transcript(path)
+
+    def open_transcript(self, path):
+        """Read ``path`` into the user text box without blocking the UI."""
+        self._transcript_info = self.transcript_label.text()  # Restaurado se a leitura falhar
+        self.transcript_label.setText(f"Lendo {os.path.basename(path)}...")
+        self.open_file_button.setEnabled(False)
+        self.transcript_loader.load(path)
+
+    def transcript_progress(self, path, done, total):
+        self.transcript_label.setText(f"Lendo {os.path.basename(path)}... {done * 100 // max(total, 1)}%")
+
+    def transcript_loaded(self, path, text):
+        name = os.path.basename(path)
+        self.open_file_button.setEnabled(True)
+        with span("transcrição.exibir", chars=len(text)):
+            self.text_box.set_user_text(text, name)
+        size = f"{os.path.getsize(path) / 1e6:.1f}".replace(".", ",")
+        if self.text_box.is_large():
+            self.transcript_label.setText(f"{name} ({size} MB): prévia somente leitura")
+            self.discard_transcript_button.show()
+        else:
+            self.transcript_label.setText(f"{name} ({size} MB)")
+            self.discard_transcript_button.hide()
+        self.show_status(f"Arquivo '{name}' carregado.", tipo="success")
+
+    def transcript_failed(self, path, message):
+        self.open_file_button.setEnabled(True)
+        self.transcript_label.setText(self._transcript_info)
+        self.show_status(f"Não foi possível ler '{os.path.basename(path)}': {message}", tipo="error")
+
+    # ------------------------------------------------------------------ #
+    # Instância única (pedidos de outros lançamentos) e bandeja do sistema
+    # ------------------------------------------------------------------ #
+    def handle_instance_request(self, request):
+        """Serve a request of a later launch (see ``single_instance``). Returns ``(ok, message)``."""
+        command = request.get("cmd")
+        if command == "ping":
+            return True, "ok"
+        if command == "show":
+            self.bring_to_front()
+            return True, "Janela exibida."
+        if command not in ("select", "copy"):
+            return False, f"Pedido desconhecido: {command}"
+
+        name = request.get("name") or ""
+        template = get_template(name)
+        if template is None:
+            return False, f"Prompt '{name}' não encontrado."
+
+        if command == "select":
+            self.filter_entry.clear()
+            self.tabs.setCurrentWidget(self.main_tab)
+            self.selector.setCurrentIndex(max(self.selector.findText(name), 0))
+            self.bring_to_front()
+            return True, f"Prompt '{name}' selecionado."
+
+        with action("copiar (outra instância)"):
+            values = request.get("values") or {}
+            missing = template.missing(values)
+            if missing:
+                return False, f"Campos obrigatórios sem valor: {', '.join(missing)}."
+            with span("compor"):
+                final_text = template.render(request.get("text") or "", values)
+            with span("área de transferência"):
+                QApplication.clipboard().setText(final_text)
+            record_use(name)
+        self.show_status(f"'{name}' copiado a pedido de outra janela.", tipo="success")
+        return True, f"Prompt '{name}' copiado ({format_count(len(final_text))} caracteres)."
+
+    def bring_to_front(self):
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def enable_tray(self):
+        """Keep the application in the system tray: closing the window only hides it."""
+        if not QSystemTrayIcon.isSystemTrayAvailable():
+            logger.warning("Bandeja do sistema indisponível; a janela fecha normalmente.")
+            return False
+        self.tray_icon = QSystemTrayIcon(self.windowIcon(), self)
+        self.tray_icon.setToolTip("Prompt Manager")
+        menu = QMenu(self)
+        menu.addAction("Mostrar", self.bring_to_front)
+        menu.addAction("Sair", QApplication.instance().quit)
+        self.tray_icon.setContextMenu(menu)
+        self.tray_icon.activated.connect(self.tray_activated)
+        self.tray_icon.show()
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+        return True
+
+    def tray_activated(self, reason):
+        if reason != QSystemTrayIcon.ActivationReason.Trigger:
+            return
+        if self.isVisible():
+            self.hide()
+        else:
+            self.bring_to_front()
 
+    def closeEvent(self, event):
+        if getattr(self, "tray_icon", None) is not None:
+            event.ignore()
+            self.hide()
+            return
+        super().closeEvent(event)
 
     def show_status(self, message: str, tipo: str = "info", duration_ms: int = 2000):
-        # Mapeia cores por tipo de mensagem
-        cores = {
-            "success": "#90EE90",  # verde claro
-            "warning": "#FFD700",  # amarelo ouro
-            "error":   "#FF7F7F",  # vermelho claro
-            "info":    "#D3D3D3",  # cinza claro padrão
-        }
-
-        self._current_text_color = cores.get(tipo, cores["info"])
-
-        # Aplica estilo inicial (opacidade máxima)
-        self._apply_status_styles(255)
-
-        # Define o conteúdo nas duas labels (se existirem)
-        self.status_label.setText(message)
-        if hasattr(self, "config_status_label"):
-            self.config_status_label.setText(message)
-
-        # Inicia temporizador da animação
-        self._progress = 0
-        self._timer = QTimer()
-        self._timer.timeout.connect(self._update_status_progress)
-        self._timer.start(duration_ms // 100)
-
-        # Efeito de pulsação
-        self._pulse_value = 255
-        self._pulse_direction = -15
-        self._pulse_timer = QTimer()
-        self._pulse_timer.timeout.connect(self._pulse_effect)
-        self._pulse_timer.start(30)
-
-    def _apply_status_styles(self, alpha: int):
-        style = f"""
-            color: rgba({self._hex_to_rgb(self._current_text_color)}, {alpha});
-            font-style: italic;
-            font-weight: bold;
-            font-size: 16px;
-            qproperty-alignment: 'AlignCenter';
-        """
-        self.status_label.setStyleSheet(style)
-        if hasattr(self, "config_status_label"):
-            self.config_status_label.setStyleSheet(style)
-
-    def _pulse_effect(self):
-        self._pulse_value += self._pulse_direction
-        if self._pulse_value <= 100 or self._pulse_value >= 255:
-            self._pulse_direction *= -1
-            self._pulse_value += self._pulse_direction
-
-        self._apply_status_styles(self._pulse_value)
-
-    def _update_status_progress(self):
-        self._progress += 1
-        if self._progress >= 100:
-            self.status_label.setText(" ")
-            if hasattr(self, "config_status_label"):
-                self.config_status_label.setText(" ")
-            self._timer.stop()
-            self._pulse_timer.stop()
-
-    def _hex_to_rgb(self, hex_color: str) -> str:
-        hex_color = hex_color.lstrip('#')
-        return ', '.join(str(int(hex_color[i:i+2], 16)) for i in (0, 2, 4))
+        self.status_notifier.show(message, tipo, duration_ms)
 
 
     def choose_color(self):
+        from PyQt6.QtWidgets import QColorDialog
+
         color = QColorDialog.getColor()
         if color.isValid():
             self.selected_color = color.name()  # Salva como string HEX, ex: "#FF5733"
@@ -453,9 +883,28 @@ class PromptManagerApp(QMainWindow):
             self.color_button.setText(self.selected_color)
 
 
+def format_count(value):
+    """``1234567`` -> ``"1.234.567"``"""
+    return f"{value:,}".replace(",", ".")
+
+
 def main():
+    # --startup-report: relança o app medindo importações e tempo até a 1ª pintura
+    if startup_report.REPORT_FLAG in sys.argv:
+        sys.exit(startup_report.run_report(os.path.abspath(__file__)))
+    startup_report.mark("importações concluídas")
+    instrumentation.configure_logging()
+
+    # --profile: cProfile + relatório de spans/contadores ao sair
+    profiler = None
+    if instrumentation.PROFILE_FLAG in sys.argv:
+        sys.argv.remove(instrumentation.PROFILE_FLAG)
+        profiler = instrumentation.start_profiler()
+
     initialize_prompts_file()
+    use_system_collation()
     app = QApplication(sys.argv)
+    startup_report.mark("QApplication criada")
 
     # Set Application Style
     app.setStyleSheet("""
@@ -481,14 +930,14 @@ def main():
             color: #FFFFFF;
             border: 1px solid #444444;
         }
-        QTextEdit, QLineEdit {
+        QTextEdit, QPlainTextEdit, QLineEdit {
             background-color: #282828;
             color: #FFFFFF;
             border: 1px solid #444444;
             border-radius: 4px;
             padding: 4px;
         }
-        QTextEdit:focus, QLineEdit:focus {
+        QTextEdit:focus, QPlainTextEdit:focus, QLineEdit:focus {
             border: 1px solid #888888;
             outline: none;
         }
@@ -509,7 +958,7 @@ def main():
             background-color: #555555;
             color: #FFFFFF;
         }
-        QTextEdit#mainTextBox {
+        #mainTextBox {
             background-color: white;
             color: black;
         }
@@ -525,11 +974,40 @@ def main():
 
     """)
 
+    # Grava o que ainda estiver na fila (e os contadores de uso) e compacta o journal ao sair
+    app.aboutToQuit.connect(get_store().close)
+    app.aboutToQuit.connect(close_history)
+    if profiler is not None:
+        app.aboutToQuit.connect(lambda: instrumentation.finish_profiler(profiler))
+
     window = PromptManagerApp()
-    window.show()
+    startup_report.mark("janela montada")
+    if startup_report.is_child():
+        startup_report.install_first_paint_probe(window)
+
+    # Instância única: os próximos lançamentos entregam seus pedidos a esta janela
+    if single_instance.enabled() and not startup_report.is_child():
+        from instance_server import InstanceServer
+
+        server = InstanceServer(window.handle_instance_request, app)
+        if server.listen():
+            app.aboutToQuit.connect(server.close)
+    tray = single_instance.TRAY_FLAG in sys.argv and window.enable_tray()
+
+    # O pedido deste lançamento (--select/--copy) é atendido aqui mesmo
+    request = single_instance.launch_request()
+    if not tray or request["cmd"] == "select":
+        window.show()
+    if request["cmd"] != "show":
+        QTimer.singleShot(0, lambda: report_launch_request(window, request))
     sys.exit(app.exec())
 
 
+def report_launch_request(window, request):
+    ok, message = window.handle_instance_request(request)
+    window.show_status(message, tipo="success" if ok else "error")
+
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,111 @@
+"""
+Named prompt collections, each stored in its own shard.
+
+The default collection is the library that always existed (``prompts.json``
+and friends in the data directory); every other collection gets a base path
+under ``prompts.collections/`` from which the backend files are derived
+exactly like the default ones (``<base>.json`` + journal, ``<base>.db``,
+``<base>.store/``, ``<base>.history/``). The list of collections and the
+active one are kept in the small ``prompts.collections/collections.json``
+manifest, so switching or listing collections never opens a shard.
+"""
+import os
+import re
+import json
+import threading
+import unicodedata
+
+from instrumentation import logger, count
+
+DEFAULT_COLLECTION = "Geral"
+MANIFEST_NAME = "collections.json"
+
+
+def slugify(name):
+    """File-system friendly form of a collection name (``"Vara Cível"`` -> ``"vara-civel"``)."""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-") or "colecao"
+
+
+class CollectionRegistry:
+    """
+    Manifest of the collections in ``data_dir``: names in creation order,
+    their shard base paths and the active collection.
+    """
+
+    def __init__(self, data_dir, default_base):
+        self.directory = os.path.join(data_dir, "prompts.collections")
+        self.manifest_path = os.path.join(self.directory, MANIFEST_NAME)
+        self.default_base = default_base
+        self._lock = threading.Lock()
+        self._slugs = {DEFAULT_COLLECTION: None}  # nome -> slug (None: biblioteca padrão)
+        self.active = DEFAULT_COLLECTION
+        self._saved_active = DEFAULT_COLLECTION  # Ativa gravada no manifesto
+        self._read()
+
+    def _read(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                count("arquivo.leituras")
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning("Manifesto de coleções ilegível; usando só a coleção padrão.", exc_info=True)
+            return
+        for entry in data.get("collections", []):
+            self._slugs.setdefault(entry["name"], entry.get("slug"))
+        if data.get("active") in self._slugs:
+            self.active = self._saved_active = data["active"]
+
+    def _write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        data = {
+            "active": self._saved_active,
+            "collections": [{"name": name, "slug": slug} for name, slug in self._slugs.items() if slug],
+        }
+        count("arquivo.gravacoes")
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def names(self):
+        return list(self._slugs)
+
+    def __contains__(self, name):
+        return name in self._slugs
+
+    def base_path(self, name):
+        """Base path of the shard of collection ``name`` (backend files are derived from it)."""
+        slug = self._slugs[name]
+        return self.default_base if slug is None else os.path.join(self.directory, slug)
+
+    def create(self, name):
+        """Register a new, empty collection and return its base path."""
+        name = name.strip()
+        if not name:
+            raise ValueError("O nome da coleção não pode estar vazio.")
+        with self._lock:
+            if name in self._slugs:
+                raise ValueError(f"A coleção '{name}' já existe.")
+            taken = set(self._slugs.values())
+            slug = base = slugify(name)
+            number = 2
+            while slug in taken or os.path.exists(os.path.join(self.directory, slug + ".json")):
+                slug, number = f"{base}-{number}", number + 1
+            self._slugs[name] = slug
+            self._write()
+        return self.base_path(name)
+
+    def set_active(self, name, remember=True):
+        """Make ``name`` the active collection; ``remember`` writes it to the manifest."""
+        if name not in self._slugs:
+            raise KeyError(name)
+        with self._lock:
+            self.active = name
+            if remember and name != self._saved_active:
+                self._saved_active = name
+                self._write()
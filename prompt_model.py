@@ -0,0 +1,427 @@
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QAbstractProxyModel, QModelIndex
+from PyQt6.QtGui import QColor, QFont
+
+from instrumentation import span
+
+PLACEHOLDER_TEXT = "Selecione um prompt"
+NameRole = Qt.ItemDataRole.UserRole + 1
+
+
+class PromptListModel(QAbstractListModel):
+    """
+    List model over the resident PromptStore, shared by both selectors.
+
+    Row 0 is the "Selecione um prompt" placeholder; the other rows mirror the
+    store in file order. Name and colours are served lazily from ``data()``
+    (QColors are built once per distinct colour), and store notifications are
+    turned into ``rowsInserted`` / ``dataChanged`` / ``rowsRemoved`` so one
+    edit costs one row of model work.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._rows = {}  # prompt -> linha (os registros comparam por identidade)
+        self._sequence = {}  # prompt -> posição de chegada (a ordem do arquivo, estável)
+        self._counter = count()
+        with span("modelo.popular"):
+            self._populate()
+        self._colors = {}  # hex -> (fundo, texto)
+        store.subscribe(self.on_store_event)
+
+    # ------------------------------------------------------------------ #
+    # Interface do modelo
+    # ------------------------------------------------------------------ #
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._prompts) + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.prompt_data(self.prompt_at(index.row()), role)
+
+    def prompt_data(self, prompt, role):
+        """``data()`` of the row holding ``prompt`` (None: the placeholder)."""
+        if prompt is None:
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+                return PLACEHOLDER_TEXT
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole, NameRole):
+            return prompt.name
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self._color_pair(prompt)[0]
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._color_pair(prompt)[1]
+        return None
+
+    def prompt_at(self, row):
+        """Return the ``Prompt`` at a source row (None for the placeholder)."""
+        if row <= 0 or row > len(self._prompts):
+            return None
+        return self._prompts[row - 1]
+
+    def prompts(self):
+        """The prompts of rows 1..N, in file order (the list itself; do not modify)."""
+        return self._prompts
+
+    def row_of(self, prompt):
+        """Source row of ``prompt`` in O(1) (-1 if it is not in the model)."""
+        return self._rows.get(prompt, -1)
+
+    def sequence(self, prompt):
+        """File-order key of ``prompt``: increases with every insertion, never renumbered."""
+        return self._sequence[prompt]
+
+    def prompt_named(self, name):
+        """The ``Prompt`` called ``name`` if it is in the model, else None."""
+        prompt = self._store.get(name)
+        return prompt if prompt in self._rows else None
+
+    def _color_pair(self, prompt):
+        pair = self._colors.get(prompt.color)
+        if pair is None:
+            # RGB e brilho já vêm calculados do registro (uma vez por cor distinta)
+            bg_color = QColor(*prompt.rgb)
+
+            # Cor do texto: preto se fundo for claro, branco se fundo for escuro
+            text_color = QColor("#000000") if prompt.brightness > 160 else QColor("#FFFFFF")
+            pair = self._colors[prompt.color] = (bg_color, text_color)
+        return pair
+
+    # ------------------------------------------------------------------ #
+    # Sincronização com o PromptStore
+    # ------------------------------------------------------------------ #
+    def _populate(self):
+        self._prompts = self._store.all()
+        self._rows = dict(zip(self._prompts, range(1, len(self._prompts) + 1)))
+        self._sequence = dict(zip(self._prompts, self._counter))
+
+    def on_store_event(self, event, name, prompt=None, old_name=None):
+        if event == "reload":
+            with span("modelo.popular"):
+                self.beginResetModel()
+                self._populate()
+                self.endResetModel()
+        elif event == "insert":
+            row = len(self._prompts) + 1
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._prompts.append(prompt)
+            self._rows[prompt] = row
+            self._sequence[prompt] = next(self._counter)
+            self.endInsertRows()
+        elif event in ("update", "touch"):
+            # O registro é o mesmo do store (já atualizado); só avisa as views
+            row = self.row_of(prompt)
+            if row < 0:
+                return
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+        elif event == "delete":
+            row = self.row_of(prompt)
+            if row < 0:
+                return
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._prompts[row - 1]
+            del self._rows[prompt], self._sequence[prompt]
+            # Só as linhas depois da excluída mudam de número
+            self._rows.update(zip(self._prompts[row - 1:], range(row, len(self._prompts) + 1)))
+            self.endRemoveRows()
+
+
+
+
+class _SortedRows:
+    """
+    Prompts in ascending order of a precomputed key, plus the key of each
+    one: positions are found with ``bisect`` instead of comparisons. Keys
+    must be unique (the file order breaks ties) and given already sorted.
+    """
+
+    def __init__(self, prompts=(), keys=()):
+        self.prompts = list(prompts)
+        self.keys = list(keys)
+        self.key_of = dict(zip(self.prompts, self.keys))
+
+    def __len__(self):
+        return len(self.prompts)
+
+    def position(self, prompt):
+        key = self.key_of.get(prompt)
+        return -1 if key is None else bisect_left(self.keys, key)
+
+    def insertion_point(self, key):
+        return bisect_right(self.keys, key)
+
+    def insert(self, prompt, key):
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.prompts.insert(position, prompt)
+        self.key_of[prompt] = key
+        return position
+
+    def remove(self, prompt):
+        position = self.position(prompt)
+        if position >= 0:
+            del self.keys[position], self.prompts[position], self.key_of[prompt]
+        return position
+
+
+class PromptFilterProxyModel(QAbstractProxyModel):
+    """
+    Per-selector view over ``PromptListModel``: optional ordering key and an
+    optional fuzzy-filter result (ranked names) without touching the source.
+
+    The placeholder row always stays first, followed (without a filter) by
+    the prompts named by ``pinned()`` (a callable returning the names), shown
+    in bold. The order is computed once with ``sorted()`` over the cached
+    keys and kept as a row mapping; source inserts, edits and removals move
+    one row with ``bisect``. A filter only maps its ranked subset, and
+    clearing it goes back to the full order, which is always up to date.
+    """
+
+    def __init__(self, source, sort_key=None, parent=None, pinned=None):
+        super().__init__(parent)
+        self._sort_key = sort_key
+        self._pinned = pinned
+        self._bold = None
+        self._rank = None  # nome -> posição no resultado do filtro
+        self._ranked = None  # _SortedRows do filtro (chave: a posição)
+        self._full = self._visible = _SortedRows()  # Ordem completa; _visible é ela ou o filtro
+        self.setSourceModel(source)
+        source.rowsInserted.connect(self._source_rows_inserted)
+        source.rowsAboutToBeRemoved.connect(self._source_rows_removed)
+        source.dataChanged.connect(self._source_data_changed)
+        source.modelAboutToBeReset.connect(self.beginResetModel)
+        source.modelReset.connect(self._source_reset)
+        self._full = self._visible = self._sorted_rows()
+
+    # ------------------------------------------------------------------ #
+    # Filtro e ordenação
+    # ------------------------------------------------------------------ #
+    def set_ranked_names(self, names):
+        """Show only ``names`` in the given order; ``None`` clears the filter."""
+        rank = None if names is None else {name: position for position, name in enumerate(names)}
+        if rank == self._rank:
+            return
+        with span("proxy.filtrar"):
+            self._rank = rank
+            self._relayout(self._apply_rank)
+
+    def set_sort_key(self, sort_key):
+        self._sort_key = sort_key
+        with span("proxy.ordenar"):
+            if self._rank is None:
+                self._relayout(self._resort)
+            else:
+                self._full = self._sorted_rows()  # Invisível até o filtro ser limpo
+
+    def _resort(self):
+        self._full = self._visible = self._sorted_rows()
+
+    def _apply_rank(self):
+        if self._rank is None:
+            self._ranked = None
+            self._visible = self._full
+            return
+        source = self.sourceModel()
+        prompts, keys = [], []
+        for name, position in self._rank.items():
+            prompt = source.prompt_named(name)
+            if prompt is not None:
+                prompts.append(prompt)
+                keys.append(position)
+        self._ranked = self._visible = _SortedRows(prompts, keys)
+
+    def _key_function(self):
+        """Key of one prompt for the current ordering; ties keep the file order."""
+        sequence, sort_key = self.sourceModel().sequence, self._sort_key
+        if self._pinned is None:
+            if sort_key is None:
+                return sequence
+            return lambda prompt: (sort_key(prompt), sequence(prompt))
+        pinned = self._pinned()
+        if sort_key is None:
+            return lambda prompt: (prompt.name not in pinned, sequence(prompt))
+        return lambda prompt: (prompt.name not in pinned, sort_key(prompt), sequence(prompt))
+
+    def _sorted_rows(self):
+        # Uma ordenação estável só pela chave em cache (a ordem do arquivo desempata);
+        # as chaves compostas, usadas pelo bisect, são montadas depois, sem comparações
+        source = self.sourceModel()
+        prompts = source.prompts()
+        columns = [list(map(source.sequence, prompts))]
+        order = range(len(prompts))
+        if self._sort_key is not None:
+            sort_keys = list(map(self._sort_key, prompts))
+            order = sorted(order, key=sort_keys.__getitem__)
+            columns.insert(0, sort_keys)
+        if self._pinned is not None:
+            pinned = self._pinned()
+            unpinned = [prompt.name not in pinned for prompt in prompts]
+            # Os fixados (poucos) sobem para o topo, na mesma ordem relativa
+            order = [i for i in order if not unpinned[i]] + [i for i in order if unpinned[i]]
+            columns.insert(0, unpinned)
+        keys = list(zip(*columns)) if len(columns) > 1 else columns[0]
+        return _SortedRows([prompts[i] for i in order], [keys[i] for i in order])
+
+    def _relayout(self, change):
+        # Mantém o item atual dos combos (índices persistentes) através da troca
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        prompts = [self.prompt_at(index.row()) for index in persistent]
+        change()
+        self.changePersistentIndexList(persistent, [self._index_of(prompt) for prompt in prompts])
+        self.layoutChanged.emit()
+
+    # ------------------------------------------------------------------ #
+    # Alterações da origem (uma linha por vez)
+    # ------------------------------------------------------------------ #
+    def _source_rows_inserted(self, parent, first, last):
+        source = self.sourceModel()
+        key = self._key_function()
+        for row in range(first, last + 1):
+            prompt = source.prompt_at(row)
+            if prompt is not None:
+                self._insert(self._full, prompt, key(prompt))
+                if self._ranked is not None and prompt.name in self._rank:
+                    self._insert(self._ranked, prompt, self._rank[prompt.name])
+
+    def _source_rows_removed(self, parent, first, last):
+        source = self.sourceModel()
+        for row in range(first, last + 1):
+            prompt = source.prompt_at(row)
+            if prompt is not None:
+                self._remove(self._full, prompt)
+                if self._ranked is not None:
+                    self._remove(self._ranked, prompt)
+
+    def _source_data_changed(self, top_left, bottom_right):
+        source = self.sourceModel()
+        key = self._key_function()
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            prompt = source.prompt_at(row)
+            if prompt is None:
+                continue
+            self._move(self._full, prompt, key(prompt))
+            if self._ranked is not None:
+                position = self._rank.get(prompt.name)  # Renomeado: pode sair ou entrar no filtro
+                if position is None:
+                    self._remove(self._ranked, prompt)
+                elif prompt not in self._ranked.key_of:
+                    self._insert(self._ranked, prompt, position)
+                else:
+                    self._move(self._ranked, prompt, position)
+
+    def _source_reset(self):
+        self._full = self._visible = self._sorted_rows()
+        if self._rank is not None:
+            self._apply_rank()
+        self.endResetModel()
+
+    def _insert(self, rows, prompt, key):
+        if rows is not self._visible:
+            rows.insert(prompt, key)
+            return
+        row = rows.insertion_point(key) + 1
+        self.beginInsertRows(QModelIndex(), row, row)
+        rows.insert(prompt, key)
+        self.endInsertRows()
+
+    def _remove(self, rows, prompt):
+        position = rows.position(prompt)
+        if position < 0:
+            return
+        if rows is not self._visible:
+            rows.remove(prompt)
+            return
+        self.beginRemoveRows(QModelIndex(), position + 1, position + 1)
+        rows.remove(prompt)
+        self.endRemoveRows()
+
+    def _move(self, rows, prompt, key):
+        old = rows.position(prompt)
+        if old < 0:
+            return
+        if rows.key_of[prompt] != key:
+            new = rows.insertion_point(key)
+            if new > old:
+                new -= 1  # Posição depois de retirar a linha do lugar antigo
+            if new != old and rows is self._visible:
+                # Destino do Qt: a linha antes da qual entra, contada antes da retirada
+                self.beginMoveRows(QModelIndex(), old + 1, old + 1, QModelIndex(),
+                                   new + 1 if new < old else new + 2)
+                rows.remove(prompt)
+                rows.insert(prompt, key)
+                self.endMoveRows()
+            else:
+                rows.remove(prompt)
+                rows.insert(prompt, key)
+            old = new
+        if rows is self._visible:
+            index = self.index(old + 1, 0)
+            self.dataChanged.emit(index, index)
+
+    # ------------------------------------------------------------------ #
+    # Interface do modelo
+    # ------------------------------------------------------------------ #
+    def prompt_at(self, row):
+        """Return the ``Prompt`` shown at proxy ``row`` (None for the placeholder)."""
+        if row <= 0 or row > len(self._visible):
+            return None
+        return self._visible.prompts[row - 1]
+
+    def _index_of(self, prompt):
+        if prompt is None:
+            return self.index(0, 0)
+        position = self._visible.position(prompt)
+        return self.index(position + 1, 0) if position >= 0 else QModelIndex()
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row <= len(self._visible):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, child=None):
+        if child is None:
+            return super().parent()  # QObject.parent()
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._visible) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        source = self.sourceModel()
+        prompt = self.prompt_at(proxy_index.row())
+        return source.index(0 if prompt is None else source.row_of(prompt), 0)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        return self._index_of(self.sourceModel().prompt_at(source_index.row()))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        # Direto do registro da linha, sem mapToSource: o combo mede todas as linhas ao abrir
+        if not index.isValid():
+            return None
+        prompt = self.prompt_at(index.row())
+        if role == Qt.ItemDataRole.FontRole and self._pinned is not None and self._rank is None:
+            if prompt is not None and prompt.name in self._pinned():
+                if self._bold is None:
+                    self._bold = QFont()
+                    self._bold.setBold(True)
+                return self._bold
+            return None
+        return self.sourceModel().prompt_data(prompt, role)
@@ -0,0 +1,101 @@
+import sys
+
+from journal import DEFAULT_COLOR
+
+
+class PromptColor:
+    """
+    One distinct prompt colour, shared by every prompt that uses it.
+
+    Holds the normalised hex string plus the RGB triple and perceived
+    brightness, computed once, so sorting and the selectors never re-parse
+    colour strings.
+    """
+
+    __slots__ = ("hex", "rgb", "brightness")
+
+    def __init__(self, hex_color):
+        digits = hex_color.lstrip("#")
+        try:
+            rgb = tuple(int(digits[i:i + 2], 16) for i in (0, 2, 4))
+        except ValueError:
+            rgb, hex_color = (0x44, 0x44, 0x44), DEFAULT_COLOR
+        self.hex = sys.intern(hex_color)
+        self.rgb = rgb
+        # Brilho (luminosidade percebida)
+        self.brightness = 0.299 * rgb[0] + 0.587 * rgb[1] + 0.114 * rgb[2]
+
+
+_colors = {}  # hex -> PromptColor (tabela de cores internadas)
+
+
+def prompt_color(hex_color):
+    """Return the shared ``PromptColor`` for ``hex_color`` (DEFAULT_COLOR if empty)."""
+    hex_color = hex_color or DEFAULT_COLOR
+    color = _colors.get(hex_color)
+    if color is None:
+        color = _colors[hex_color] = PromptColor(hex_color)
+    return color
+
+
+class Prompt:
+    """
+    One prompt of the library.
+
+    ``content`` is either held in memory or, for records created by
+    ``Prompt.lazy``, read on demand from a storage backend (``read_body``)
+    and not kept afterwards. Records compare by identity.
+    """
+
+    __slots__ = ("name", "_color", "_content", "_body")
+
+    def __init__(self, name, content="", color=DEFAULT_COLOR):
+        self.name = name
+        self._color = prompt_color(color)
+        self._content = content
+        self._body = None  # (origem, ids) quando o conteúdo fica no disco
+
+    @classmethod
+    def lazy(cls, name, color, body_ids, body_source):
+        """A record whose body is fetched with ``body_source.read_body(body_ids)``."""
+        prompt = cls(name, None, color)
+        prompt._body = (body_source, body_ids)
+        return prompt
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["name"], data["content"], data.get("color"))
+
+    def to_dict(self):
+        return {"name": self.name, "content": self.content, "color": self.color}
+
+    @property
+    def content(self):
+        if self._content is None and self._body is not None:
+            source, body_ids = self._body
+            return source.read_body(body_ids)
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._body = None
+
+    @property
+    def color(self):
+        return self._color.hex
+
+    @color.setter
+    def color(self, value):
+        self._color = prompt_color(value)
+
+    @property
+    def rgb(self):
+        return self._color.rgb
+
+    @property
+    def brightness(self):
+        return self._color.brightness
+
+    def __repr__(self):
+        return f"Prompt({self.name!r}, color={self.color!r})"
@@ -0,0 +1,410 @@
+import threading
+
+from journal import JournalBackend, DEFAULT_COLOR
+from prompt_record import Prompt
+from sorting import KEY_FUNCTIONS
+from text_stats import count_text
+from write_queue import apply_ops
+from usage_stats import UsageStats
+from instrumentation import span
+
+
+class PromptStore:
+    """
+    Resident, indexed copy of the prompt library, as ``Prompt`` records.
+
+    The file is read once (on first access or after ``invalidate()``) and every
+    lookup afterwards is served from memory through a name -> prompt index.
+    Writes update the in-memory state and are persisted immediately
+    (write-through) through the storage backend, which by default appends one
+    record to the operations journal instead of rewriting the whole file.
+    With a ``WriteQueue`` installed (``use_writer``) persistence happens on a
+    background thread instead, in order and coalesced.
+    """
+
+    def __init__(self, path, backend=None, usage=None):
+        self.path = path
+        self.backend = backend or JournalBackend(path)
+        self._prompts = []      # Ordem do arquivo (usada pelo seletor de configurações)
+        self._by_name = {}      # Índice nome -> prompt
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._listeners = []
+        # ordenação -> {nome: chave}, calculadas uma vez; os dicionários internos nunca são trocados
+        self._sort_keys = {ordering: {} for ordering in KEY_FUNCTIONS}
+        self.usage = usage or UsageStats()  # Usos por prompt (ordenações "mru" e "frecency")
+        self._text_stats = {}  # nome -> TextStats do conteúdo, até o prompt mudar
+        self.writer = None     # WriteQueue opcional: grava em segundo plano
+
+    # ------------------------------------------------------------------ #
+    # Carregamento / invalidação
+    # ------------------------------------------------------------------ #
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.reload()
+
+    def reload(self):
+        """Re-read the file from disk, replacing the in-memory state."""
+        self.flush()
+        with self._lock, span("store.recarregar"):
+            # Backends com índice de posições carregam só nome/cor; o conteúdo vem sob demanda
+            lazy = getattr(self.backend, "load_lazy", None)
+            if lazy is not None:
+                prompts = lazy()
+            else:
+                prompts = [Prompt.from_dict(data) for data in self.backend.load()]
+            self._prompts = prompts
+            self._by_name = {prompt.name: prompt for prompt in prompts}
+            self._forget_sort_keys()
+            self._text_stats = {}
+            self._loaded = True
+        self._notify("reload", None)
+
+    def switch(self, path, backend, usage=None):
+        """
+        Serve another library (a collection shard) from now on.
+
+        Pending writes reach the old backend first, which is then closed; the
+        new one is read and listeners get a ``"reload"``, just as after
+        ``reload()``. ``usage`` holds the use counters of the new library.
+        """
+        self.flush()
+        with self._lock:
+            old_backend, old_usage = self.backend, self.usage
+            self.path = path
+            self.backend = backend
+            if self.writer is not None:
+                self.writer.backend = backend
+            self.usage = usage or UsageStats()
+        old_backend.close()
+        old_usage.close()
+        self.reload()
+
+    def invalidate(self):
+        """Drop the in-memory state; the next access reloads from disk."""
+        with self._lock:
+            self._prompts = []
+            self._by_name = {}
+            self._loaded = False
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def all(self):
+        """Return the prompts in file order (a new list, shared records)."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._prompts)
+
+    def names(self):
+        with self._lock:
+            self._ensure_loaded()
+            return [prompt.name for prompt in self._prompts]
+
+    def get(self, name):
+        """Return the ``Prompt`` for ``name`` or None, in O(1)."""
+        with self._lock:
+            self._ensure_loaded()
+            return self._by_name.get(name)
+
+    def content(self, name):
+        prompt = self.get(name)
+        return prompt.content if prompt else None
+
+    def search(self, query, limit=50):
+        """
+        Return names of prompts matching ``query``.
+
+        Delegates to the backend when it has its own index (SQLite FTS5);
+        otherwise does a case-insensitive scan of the in-memory prompts.
+        """
+        if hasattr(self.backend, "search"):
+            return self.backend.search(query, limit)
+
+        terms = query.lower().split()
+        if not terms:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            matches = []
+            for prompt in self._prompts:
+                haystack = f"{prompt.name}\n{prompt.content}".lower()
+                if all(term in haystack for term in terms):
+                    matches.append(prompt.name)
+                    if len(matches) >= limit:
+                        break
+            return matches
+
+    def sort_key(self, prompt, ordering):
+        """
+        Return the cached sort key of ``prompt`` for ``ordering`` (see
+        ``sorting.ORDERINGS``). Keys derived from name/colour are computed once
+        and dropped only when that prompt is saved, renamed or deleted.
+        """
+        if ordering == "mru":
+            return -self.usage.last_used(prompt.name)
+        if ordering == "frecency":
+            # Pontuações comparáveis a qualquer momento; sem uso, vale a ordem por cor
+            return (-self.usage.score(prompt.name), self.sort_key(prompt, "color"))
+
+        keys = self._sort_keys[ordering]
+        key = keys.get(prompt.name)
+        if key is None:
+            key = keys[prompt.name] = KEY_FUNCTIONS[ordering](prompt)
+        return key
+
+    def key_function(self, ordering):
+        """
+        ``sort_key(prompt, ordering)`` as a one-argument function for
+        ``sorted()``: cached keys are read with a single dict lookup.
+        """
+        if ordering == "mru":
+            return lambda prompt: -self.usage.last_used(prompt.name)
+        if ordering == "frecency":
+            color = self.key_function("color")
+            return lambda prompt: (-self.usage.score(prompt.name), color(prompt))
+
+        keys, compute = self._sort_keys[ordering], KEY_FUNCTIONS[ordering]
+
+        def key(prompt):
+            value = keys.get(prompt.name)
+            if value is None:
+                value = keys[prompt.name] = compute(prompt)
+            return value
+        return key
+
+    def _forget_sort_keys(self, name=None):
+        """Drop the cached keys of ``name`` (of every prompt when None)."""
+        for keys in self._sort_keys.values():
+            if name is None:
+                keys.clear()
+            else:
+                keys.pop(name, None)
+
+    def text_stats(self, name):
+        """
+        Characters, words and estimated tokens of the content of ``name``
+        (``text_stats.TextStats``), counted once until the prompt changes.
+        """
+        with self._lock:
+            stats = self._text_stats.get(name)
+            if stats is None:
+                prompt = self.get(name)
+                if prompt is None:
+                    return None
+                stats = self._text_stats[name] = count_text(prompt.content)
+            return stats
+
+    def touch(self, name):
+        """
+        Record that ``name`` was just used (copied). Listeners get a
+        ``"touch"`` for it and for a prompt it pushed out of the pinned top.
+        """
+        prompt = self.get(name)
+        if prompt is None:
+            return
+        unpinned = self.usage.record(name)
+        self._notify("touch", name, prompt)
+        self._notify_touched(unpinned)
+
+    def _notify_touched(self, names):
+        for name in names:
+            prompt = self.get(name)
+            if prompt is not None:
+                self._notify("touch", name, prompt)
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._prompts)
+
+    # ------------------------------------------------------------------ #
+    # Escrita (write-through)
+    # ------------------------------------------------------------------ #
+    def upsert(self, name, content, color=None, original_name=None):
+        """
+        Create or update a prompt and persist the library.
+
+        :param original_name: Nome anterior, quando o prompt está sendo renomeado
+        :return: O ``Prompt`` salvo
+        """
+        color = color or DEFAULT_COLOR
+        with self._lock, span("store.salvar"):
+            self._ensure_loaded()
+            self._check_conflict()
+            if original_name and original_name != name and name in self._by_name:
+                # Antes de qualquer mudança: renomear sobre outro prompt deixaria dois registros
+                raise ValueError(f"Já existe um prompt chamado '{name}'.")
+            prompt = self._by_name.get(original_name or name)
+            old_name = prompt.name if prompt is not None else None
+
+            if prompt is not None:
+                # Renomeando: remove a chave antiga do índice
+                if old_name != name:
+                    self._by_name.pop(old_name, None)
+                prompt.name = name
+                prompt.content = content
+                prompt.color = color
+            else:
+                prompt = Prompt(name, content, color)
+                self._prompts.append(prompt)
+
+            self._by_name[name] = prompt
+            self._forget_sort_keys(name)
+            self._text_stats.pop(name, None)
+            if old_name and old_name != name:
+                self._forget_sort_keys(old_name)
+                self._text_stats.pop(old_name, None)
+                self.usage.rename(old_name, name)
+            # Cópia: o registro em memória pode mudar antes da gravação em segundo plano
+            self._persist(("upsert", prompt.to_dict(), original_name))
+
+        self._notify("update" if old_name else "insert", name, prompt, old_name)
+        return prompt
+
+    def upsert_many(self, prompts):
+        """
+        Create or update many prompts (``{"name", "content", "color"}`` dicts,
+        no renames) with one batched write and a single ``"reload"``
+        notification instead of one per prompt. Returns how many were saved.
+        """
+        ops = []
+        with self._lock, span("store.salvar_lote"):
+            self._ensure_loaded()
+            self._check_conflict()
+            for data in prompts:
+                name, color = data["name"], data.get("color") or DEFAULT_COLOR
+                prompt = self._by_name.get(name)
+                if prompt is None:
+                    prompt = self._by_name[name] = Prompt(name, data["content"], color)
+                    self._prompts.append(prompt)
+                else:
+                    prompt.content = data["content"]
+                    prompt.color = color
+                self._forget_sort_keys(name)
+                self._text_stats.pop(name, None)
+                ops.append(("upsert", prompt.to_dict(), None))
+            if ops:
+                if self.writer is not None:
+                    self.writer.submit_many(ops)
+                else:
+                    apply_ops(self.backend, ops)
+
+        if ops:
+            self._notify("reload", None)
+        return len(ops)
+
+    def delete(self, name):
+        """Remove a prompt by name. Returns True if something was deleted."""
+        with self._lock, span("store.excluir"):
+            self._ensure_loaded()
+            if name not in self._by_name:
+                return False
+            self._check_conflict()
+            prompt = self._by_name.pop(name)
+            self._prompts.remove(prompt)
+            self._forget_sort_keys(name)
+            self._text_stats.pop(name, None)
+            promoted = self.usage.forget(name)
+            self._persist(("delete", name))
+
+        self._notify("delete", name, prompt)
+        self._notify_touched(promoted)
+        return True
+
+    def _persist(self, op):
+        if self.writer is not None:
+            self.writer.submit(op)
+        else:
+            apply_ops(self.backend, [op])
+
+    def use_writer(self, writer):
+        """Route writes through ``writer`` (a ``WriteQueue``) instead of writing inline."""
+        self.writer = writer
+
+    def pending_writes(self):
+        return self.writer.pending() if self.writer is not None else 0
+
+    def flush(self, timeout=None):
+        """Wait until every accepted write is on disk. Returns False on failure/timeout."""
+        if self.writer is None:
+            return True
+        return self.writer.flush(timeout)
+
+    def _check_conflict(self):
+        # Backends baseados em arquivo recusam gravar sobre uma versão mais nova
+        check = getattr(self.backend, "check_conflict", None)
+        if check is not None:
+            check()
+
+    def apply_external(self, prompts):
+        """
+        Bring the in-memory library in line with ``prompts`` (already on disk,
+        e.g. edited by someone else) by diffing per prompt. Existing records
+        are updated in place and only the prompts that changed are notified.
+        Returns the number of changed prompts.
+        """
+        changes = []
+        with self._lock, span("store.aplicar_externo"):
+            self._ensure_loaded()
+            incoming = {prompt["name"]: prompt for prompt in prompts}
+
+            for name, prompt in list(self._by_name.items()):
+                if name not in incoming:
+                    del self._by_name[name]
+                    self._prompts.remove(prompt)
+                    self._forget_sort_keys(name)
+                    self._text_stats.pop(name, None)
+                    changes.append(("delete", name, prompt))
+
+            for name, new in incoming.items():
+                color = new.get("color") or DEFAULT_COLOR
+                prompt = self._by_name.get(name)
+                if prompt is None:
+                    prompt = Prompt(name, new["content"], color)
+                    self._prompts.append(prompt)
+                    self._by_name[name] = prompt
+                    changes.append(("insert", name, prompt))
+                elif prompt.content != new["content"] or prompt.color != color:
+                    prompt.content = new["content"]
+                    prompt.color = color
+                    self._forget_sort_keys(name)
+                    self._text_stats.pop(name, None)
+                    changes.append(("update", name, prompt))
+
+        for event, name, prompt in changes:
+            self._notify(event, name, prompt)
+        return len(changes)
+
+    # ------------------------------------------------------------------ #
+    # Notificações
+    # ------------------------------------------------------------------ #
+    def subscribe(self, listener):
+        """
+        Register ``listener(event, name, prompt=None, old_name=None)``.
+
+        ``event`` is ``"insert"``, ``"update"`` (``old_name`` is set on a
+        rename), ``"delete"``, ``"touch"`` (the prompt was used; only usage
+        based orderings change) or ``"reload"`` (``name`` is None; the whole
+        library may have changed).
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, name, prompt=None, old_name=None):
+        for listener in list(self._listeners):
+            listener(event, name, prompt, old_name)
+
+    def close(self):
+        """Flush pending storage work (queued writes, journal compaction, use counters) before exit."""
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            writer.close()
+        self.backend.close()
+        self.usage.close()
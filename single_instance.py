@@ -0,0 +1,141 @@
+"""
+Single-instance mode: the client side, without Qt.
+
+The first ``main.py`` stays resident and listens on a local socket
+(``instance_server``, a ``QLocalServer``): a Unix socket in the runtime
+directory, or a named pipe on Windows, one per user and library. Later
+launches (``main.py`` before importing PyQt6, or ``cli.py copy`` /
+``cli.py open``) send their request there and exit at once, so recalling a
+prompt costs one interpreter start and a round trip instead of loading
+PyQt6 and the library again.
+
+Protocol: one JSON object per line each way. Requests are
+``{"cmd": "show"}``, ``{"cmd": "select", "name": ...}``,
+``{"cmd": "copy", "name": ..., "text": ..., "values": {...}}`` and
+``{"cmd": "ping"}``; the reply is ``{"ok": bool, "message": str}``.
+
+    python main.py                      # abre (ou traz para frente) a janela
+    python main.py --select NOME        # ... com o prompt selecionado
+    echo texto | python main.py --copy NOME
+    python main.py --tray               # residente na bandeja do sistema
+    python main.py --new-instance       # ignora a instância residente
+"""
+import os
+import sys
+import json
+import socket
+import hashlib
+
+SELECT_FLAG = "--select"
+COPY_FLAG = "--copy"
+TRAY_FLAG = "--tray"
+NEW_INSTANCE_FLAG = "--new-instance"
+CONNECT_TIMEOUT = 0.5  # Segundos para alcançar a instância residente
+REPLY_TIMEOUT = 10.0  # Segundos para a resposta (a janela pode estar ocupada)
+
+_launch = None
+
+
+def enabled(argv=None):
+    """Single-instance mode is on unless ``PROMPTS_SINGLE_INSTANCE=0`` or ``--new-instance``."""
+    argv = sys.argv if argv is None else argv
+    return os.environ.get("PROMPTS_SINGLE_INSTANCE", "1") != "0" and NEW_INSTANCE_FLAG not in argv
+
+
+def server_name():
+    """Name of the local server: one per user and per library (``PROMPTS_DIR``)."""
+    data_dir = os.path.abspath(os.environ.get("PROMPTS_DIR", os.path.dirname(os.path.abspath(__file__))))
+    user = os.environ.get("USER") or os.environ.get("USERNAME") or ""
+    digest = hashlib.blake2b(f"{user}:{data_dir}".encode("utf-8"), digest_size=6).hexdigest()
+    return f"prompt-manager-{digest}"
+
+
+def server_address():
+    """What ``QLocalServer.listen`` receives and the client connects to."""
+    if os.name == "nt":
+        return r"\\.\pipe" + "\\" + server_name()
+    # Sem tempfile (caro de importar aqui); mesma pasta temporária que o Qt usaria
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(runtime_dir, server_name() + ".sock")
+
+
+def send_request(request, connect_timeout=CONNECT_TIMEOUT, reply_timeout=REPLY_TIMEOUT):
+    """
+    Deliver ``request`` to the resident instance and return its reply.
+
+    Returns None when no instance is listening (nothing was delivered); a
+    reply that does not arrive is reported as a failed reply instead, so
+    the caller does not start a second instance over a busy one.
+    """
+    data = (json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8")
+    address = server_address()
+    if os.name == "nt":
+        try:
+            pipe = open(address, "r+b", buffering=0)
+        except OSError:
+            return None
+        with pipe:
+            pipe.write(data)
+            return _parse_reply(pipe.readline())
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(connect_timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            return None  # Sem arquivo ou sem ninguém escutando (resto de uma queda)
+        sock.settimeout(reply_timeout)
+        try:
+            sock.sendall(data)
+            with sock.makefile("rb") as stream:
+                return _parse_reply(stream.readline())
+        except OSError as e:
+            return {"ok": False, "message": f"A instância aberta não respondeu: {e}"}
+
+
+def _parse_reply(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {"ok": False, "message": "A instância aberta não respondeu."}
+
+
+def launch_request(argv=None):
+    """
+    The request of this launch, taken (once) from the command line:
+    ``--select NOME``, ``--copy NOME`` (text from stdin) or just showing the
+    window. The flags and their values are removed from ``argv``.
+    """
+    global _launch
+    if _launch is None:
+        argv = sys.argv if argv is None else argv
+        request = {"cmd": "show"}
+        for flag, command in ((SELECT_FLAG, "select"), (COPY_FLAG, "copy")):
+            if flag in argv:
+                at = argv.index(flag)
+                if at + 1 >= len(argv):
+                    raise SystemExit(f"{flag} precisa do nome do prompt.")
+                request = {"cmd": command, "name": argv[at + 1]}
+                del argv[at:at + 2]
+        if request["cmd"] == "copy":
+            interactive = sys.stdin is None or sys.stdin.isatty()
+            request["text"] = "" if interactive else sys.stdin.read()
+        _launch = request
+    return _launch
+
+
+def hand_over(argv=None):
+    """
+    In a later launch: give this launch's request to the resident instance,
+    print its reply and exit. Returns only when there is no resident
+    instance, and this launch goes on to become it.
+    """
+    if not enabled(argv):
+        return
+    reply = send_request(launch_request(argv))
+    if reply is None:
+        return
+    stream = sys.stdout if reply.get("ok") else sys.stderr
+    if stream is not None:  # pythonw: sem console
+        stream.write(reply.get("message", "") + "\n")
+    sys.exit(0 if reply.get("ok") else 1)
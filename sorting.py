@@ -0,0 +1,114 @@
+import re
+import math
+import locale
+import unicodedata
+from functools import lru_cache
+
+from journal import DEFAULT_COLOR
+
+BASE_COLOR = "#444444"
+
+# Ordenações oferecidas nos seletores: chave -> rótulo
+ORDERINGS = {
+    "color": "Cor (semelhança)",
+    "lab": "Cor (grupos perceptuais)",
+    "alpha": "Alfabética",
+    "mru": "Usados recentemente",
+    "frecency": "Mais usados (frequência e recência)",
+    "file": "Ordem do arquivo",
+}
+
+# Abaixo desse croma (CIELAB) a cor é tratada como neutra (cinzas, preto, branco)
+NEUTRAL_CHROMA = 12.0
+# Largura (em graus de matiz) de cada grupo de cores na ordenação perceptual
+HUE_GROUP_DEGREES = 30
+
+
+@lru_cache(maxsize=1024)
+def hex_to_rgb(hex_color):
+    """``"#FF5733"`` -> ``(255, 87, 51)``; parsed once per distinct colour."""
+    hex_color = hex_color.lstrip('#')
+    try:
+        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    except ValueError:
+        return hex_to_rgb(DEFAULT_COLOR)
+
+
+@lru_cache(maxsize=1024)
+def hex_to_lab(hex_color):
+    """Convert an sRGB hex colour to CIELAB (D65)."""
+    def linear(channel):
+        channel /= 255
+        return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+    r, g, b = (linear(channel) for channel in hex_to_rgb(hex_color))
+    x = (0.4124 * r + 0.3576 * g + 0.1805 * b) / 0.95047
+    y = (0.2126 * r + 0.7152 * g + 0.0722 * b) / 1.00000
+    z = (0.0193 * r + 0.1192 * g + 0.9505 * b) / 1.08883
+
+    def f(t):
+        return t ** (1 / 3) if t > 0.008856 else 7.787 * t + 16 / 116
+
+    fx, fy, fz = f(x), f(y), f(z)
+    return (116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz))
+
+
+def color_distance_key(prompt, base_color=BASE_COLOR):
+    """Distância Euclidiana no espaço RGB até a cor base."""
+    base = hex_to_rgb(base_color)
+    return sum((a - b) ** 2 for a, b in zip(prompt.rgb, base)) ** 0.5
+
+
+def lab_group_key(prompt):
+    """
+    Perceptual grouping: neutral colours first (dark to light), then one group
+    per hue slice around the CIELAB colour wheel, dark to light inside each.
+    """
+    lightness, a, b = hex_to_lab(prompt.color)
+    if math.hypot(a, b) < NEUTRAL_CHROMA:
+        return (-1, lightness)
+    hue = math.degrees(math.atan2(b, a)) % 360
+    return (int(hue // HUE_GROUP_DEGREES), lightness)
+
+
+def natural_key(text):
+    """
+    Locale-aware, natural-numeric key: ``"Portaria 2"`` < ``"Portaria 10"``
+    and accented letters collate with their base letter.
+    """
+    key = []
+    for part in re.split(r"(\d+)", text.casefold()):
+        if not part:
+            continue
+        if part.isdecimal():
+            key.append((0, int(part), "", ""))
+        else:
+            # Sem acentos como critério principal (o locale "C" colocaria "á"
+            # depois de "z"); o texto original desempata
+            key.append((1, 0, locale.strxfrm(strip_accents(part)), part))
+    return tuple(key)
+
+
+def strip_accents(text):
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def alpha_key(prompt):
+    return natural_key(prompt.name)
+
+
+# Chaves que só dependem do próprio prompt (nome/cor) e podem ser memorizadas
+KEY_FUNCTIONS = {
+    "color": color_distance_key,
+    "lab": lab_group_key,
+    "alpha": alpha_key,
+}
+
+
+def use_system_collation():
+    """Adopt the user's locale for string collation (called once at startup)."""
+    try:
+        locale.setlocale(locale.LC_COLLATE, "")
+    except locale.Error:
+        pass  # Locale inválido no sistema: mantém a ordenação por código
@@ -0,0 +1,167 @@
+import os
+import re
+import sys
+import sqlite3
+import threading
+
+from journal import JournalBackend, DEFAULT_COLOR
+from instrumentation import span, count
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS prompts (
+    id      INTEGER PRIMARY KEY,
+    name    TEXT NOT NULL UNIQUE,
+    content TEXT NOT NULL,
+    color   TEXT NOT NULL DEFAULT '#444444'
+);
+"""
+
+# Índice de texto completo sincronizado com a tabela por triggers (external content)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS prompts_fts USING fts5(
+    name, content, content='prompts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS prompts_ai AFTER INSERT ON prompts BEGIN
+    INSERT INTO prompts_fts(rowid, name, content) VALUES (new.id, new.name, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS prompts_ad AFTER DELETE ON prompts BEGIN
+    INSERT INTO prompts_fts(prompts_fts, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS prompts_au AFTER UPDATE ON prompts BEGIN
+    INSERT INTO prompts_fts(prompts_fts, rowid, name, content) VALUES ('delete', old.id, old.name, old.content);
+    INSERT INTO prompts_fts(rowid, name, content) VALUES (new.id, new.name, new.content);
+END;
+"""
+
+
+class SQLiteBackend:
+    """
+    Prompt storage in a local SQLite file (WAL mode) with an FTS5 index.
+
+    Implements the same backend interface as ``JournalBackend`` (``load``,
+    ``record_upsert``, ``record_delete``, ``write_all``, ``close``) plus
+    ``search`` for full-text queries over ``name`` and ``content``. If the
+    SQLite build lacks FTS5, search falls back to ``LIKE``.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # A conexão é compartilhada entre threads, protegida pelo lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self._conn.commit()
+
+    # ------------------------------------------------------------------ #
+    # Leitura
+    # ------------------------------------------------------------------ #
+    def load(self):
+        count("banco.leituras")
+        with self._lock, span("sqlite.carregar"):
+            rows = self._conn.execute("SELECT name, content, color FROM prompts ORDER BY id").fetchall()
+        return [{"name": name, "content": content, "color": color or DEFAULT_COLOR}
+                for name, content, color in rows]
+
+    def search(self, query, limit=50):
+        """Return the names of prompts matching ``query`` (best matches first)."""
+        terms = re.findall(r"\w+", query, flags=re.UNICODE)
+        if not terms:
+            return []
+
+        with self._lock:
+            if self.has_fts:
+                # Cada termo vira uma busca por prefixo: "oiti" encontra "oitiva"
+                match = " AND ".join(f'"{term}"*' for term in terms)
+                rows = self._conn.execute(
+                    "SELECT p.name FROM prompts_fts f JOIN prompts p ON p.id = f.rowid "
+                    "WHERE prompts_fts MATCH ? ORDER BY bm25(prompts_fts, 10.0, 1.0) LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+            else:
+                where = " AND ".join("(name LIKE ? OR content LIKE ?)" for _ in terms)
+                params = [value for term in terms for value in (f"%{term}%", f"%{term}%")]
+                rows = self._conn.execute(
+                    f"SELECT name FROM prompts WHERE {where} ORDER BY id LIMIT ?",
+                    (*params, limit),
+                ).fetchall()
+        return [name for (name,) in rows]
+
+    # ------------------------------------------------------------------ #
+    # Escrita
+    # ------------------------------------------------------------------ #
+    def record_upsert(self, prompt, original_name=None):
+        with self._lock, self._conn:
+            self._upsert(prompt, original_name)
+
+    def record_delete(self, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prompts WHERE name = ?", (name,))
+
+    def record_batch(self, ops):
+        """Apply several operations in a single transaction."""
+        count("banco.gravacoes")
+        with self._lock, self._conn:
+            for op in ops:
+                if op[0] == "upsert":
+                    self._upsert(op[1], op[2])
+                else:
+                    self._conn.execute("DELETE FROM prompts WHERE name = ?", (op[1],))
+
+    def _upsert(self, prompt, original_name):
+        if original_name and original_name != prompt["name"] and self._conn.execute(
+                "SELECT 1 FROM prompts WHERE name = ?", (prompt["name"],)).fetchone():
+            # Verificado antes do UPDATE: a restrição UNIQUE levantaria IntegrityError
+            raise ValueError(f"Já existe um prompt chamado '{prompt['name']}'.")
+        cursor = self._conn.execute(
+            "UPDATE prompts SET name = ?, content = ?, color = ? WHERE name = ?",
+            (prompt["name"], prompt["content"], prompt.get("color", DEFAULT_COLOR),
+             original_name or prompt["name"]),
+        )
+        if cursor.rowcount == 0:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO prompts (name, content, color) VALUES (?, ?, ?)",
+                (prompt["name"], prompt["content"], prompt.get("color", DEFAULT_COLOR)),
+            )
+
+    def write_all(self, prompts):
+        """Replace the whole library in a single transaction."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prompts")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prompts (name, content, color) VALUES (?, ?, ?)",
+                [(p["name"], p["content"], p.get("color", DEFAULT_COLOR)) for p in prompts],
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """
+    One-shot migration of a ``prompts.json`` library (including any pending
+    journal records) into a SQLite database. Returns the number of prompts.
+    """
+    prompts = JournalBackend(json_path).load()
+    backend = SQLiteBackend(db_path)
+    try:
+        backend.write_all(prompts)
+    finally:
+        backend.close()
+    return len(prompts)
+
+
+if __name__ == "__main__":
+    # Uso: python sqlite_backend.py [prompts.json] [prompts.db]
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    source = sys.argv[1] if len(sys.argv) > 1 else os.path.join(script_dir, "prompts.json")
+    target = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(source)[0] + ".db"
+    count = migrate_json_to_sqlite(source, target)
+    print(f"{count} prompts migrados de {source} para {target}.")
@@ -0,0 +1,96 @@
+"""
+Cold-start report for the GUI (``python main.py --startup-report``).
+
+The application is re-launched in a child interpreter with ``-X importtime``;
+the child records a few milestones (imports done, QApplication, window built,
+first paint) and exits right after the first paint. The parent prints the
+slowest imports and the milestone timeline.
+"""
+import os
+import sys
+import json
+import time
+import subprocess
+
+REPORT_FLAG = "--startup-report"
+CHILD_FLAG = "--startup-report-child"
+T0_ENV = "PROMPT_MANAGER_STARTUP_T0"
+MILESTONE_PREFIX = "STARTUP_MILESTONES "
+
+_milestones = []
+
+
+def is_child():
+    return CHILD_FLAG in sys.argv
+
+
+def mark(label):
+    """Record a milestone (seconds since the parent launched the child)."""
+    if is_child():
+        t0 = float(os.environ.get(T0_ENV, "0")) or time.time()
+        _milestones.append((label, time.time() - t0))
+
+
+def emit_milestones():
+    print(MILESTONE_PREFIX + json.dumps(_milestones), flush=True)
+
+
+def install_first_paint_probe(window):
+    """In the child: mark the first paint of ``window``, report and quit."""
+    from PyQt6.QtCore import QObject, QEvent, QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    class FirstPaintProbe(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                obj.removeEventFilter(self)
+                mark("primeira pintura")
+                emit_milestones()
+                QTimer.singleShot(0, QApplication.instance().quit)
+            return False
+
+    probe = FirstPaintProbe(window)
+    window.installEventFilter(probe)
+    return probe
+
+
+def parse_importtime(stderr):
+    """Return ``[(module, self_us, cumulative_us, depth)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # Cada nível de aninhamento acrescenta dois espaços antes do nome
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def run_report(script, top=15):
+    env = dict(os.environ, **{T0_ENV: repr(time.time())})
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", script, CHILD_FLAG],
+        capture_output=True, text=True, env=env, encoding="utf-8", errors="replace",
+    )
+
+    milestones = []
+    for line in result.stdout.splitlines():
+        if line.startswith(MILESTONE_PREFIX):
+            milestones = json.loads(line[len(MILESTONE_PREFIX):])
+
+    rows = parse_importtime(result.stderr)
+    top_level = sorted((row for row in rows if row[3] == 0), key=lambda row: row[2], reverse=True)
+
+    print("== Importações mais lentas (acumulado, nível superior) ==")
+    for name, self_us, cumulative_us, _ in top_level[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  (próprio {self_us / 1000:6.1f} ms)  {name}")
+    print(f"  total de importações: {sum(row[2] for row in top_level) / 1000:.1f} ms")
+
+    print("== Linha do tempo (desde o lançamento do processo) ==")
+    for label, seconds in milestones:
+        print(f"  {seconds * 1000:8.1f} ms  {label}")
+    if not milestones:
+        print("  (o processo filho não reportou marcos; saída de erro abaixo)")
+        print(result.stderr[-2000:])
+    return result.returncode
@@ -0,0 +1,136 @@
+import math
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QColor, QPalette
+
+# Mapeia cores por tipo de mensagem
+STATUS_COLORS = {
+    "success": "#90EE90",  # verde claro
+    "warning": "#FFD700",  # amarelo ouro
+    "error":   "#FF7F7F",  # vermelho claro
+    "info":    "#D3D3D3",  # cinza claro padrão
+}
+
+# Estilo fixo das labels; a cor (com a pulsação) vai pela paleta, sem reprocessar CSS
+STATUS_STYLE = """
+    font-style: italic;
+    font-weight: bold;
+    font-size: 16px;
+    qproperty-alignment: 'AlignCenter';
+"""
+
+FRAME_MS = 30             # Intervalo da animação enquanto há mensagem visível
+PULSE_PERIOD_MS = 700     # Período de uma pulsação completa (claro -> escuro -> claro)
+MIN_ALPHA = 100
+MIN_VISIBLE_MS = 400      # Tempo mínimo de uma mensagem quando há outras na fila
+MAX_QUEUE = 3
+
+
+class StatusNotifier(QObject):
+    """
+    Animated status line shared by one or more labels.
+
+    A single timer drives the pulse of every label and runs only while a
+    message is visible. The pulse changes only the labels' palette colour, so
+    no stylesheet is re-parsed per frame. Repeating the visible message just
+    restarts its countdown; different messages queue (up to ``MAX_QUEUE``) and
+    cut the current one short once it has been readable for a moment.
+    """
+
+    def __init__(self, labels=(), parent=None):
+        super().__init__(parent)
+        self._labels = []
+        self._queue = deque(maxlen=MAX_QUEUE)
+        self._current = None  # (mensagem, tipo, duração em ms)
+        self._started = 0.0
+        self._last_alpha = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(FRAME_MS)
+        self._timer.timeout.connect(self._tick)
+
+        for label in labels:
+            self.add_label(label)
+
+    def add_label(self, label):
+        """Mirror the status on ``label`` too (e.g. a tab built lazily)."""
+        label.setStyleSheet(STATUS_STYLE)
+        label.setText(self._current[0] if self._current else " ")
+        self._labels.append(label)
+        if self._current:
+            # Direto no rótulo novo: _apply_color ignoraria o alfa que já está em uso
+            self._paint(label, self._color(255 if self._last_alpha is None else self._last_alpha))
+
+    @property
+    def active(self):
+        return self._timer.isActive()
+
+    def show(self, message, tipo="info", duration_ms=2000):
+        entry = (message, tipo, duration_ms)
+        if self._current is None:
+            self._start(entry)
+        elif self._current[:2] == entry[:2]:
+            self._started = time.monotonic()  # Mesma mensagem: só reinicia a contagem
+        elif not self._queue or self._queue[-1][:2] != entry[:2]:
+            self._queue.append(entry)
+
+    def clear(self):
+        self._queue.clear()
+        self._finish()
+
+    def _start(self, entry):
+        self._current = entry
+        self._started = time.monotonic()
+        self._last_alpha = None
+        for label in self._labels:
+            label.setText(entry[0])
+        self._apply_color(255)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _finish(self):
+        self._timer.stop()
+        self._current = None
+        for label in self._labels:
+            label.setText(" ")
+
+    def _tick(self):
+        elapsed_ms = (time.monotonic() - self._started) * 1000
+        duration_ms = self._current[2]
+        if self._queue:
+            duration_ms = min(duration_ms, MIN_VISIBLE_MS)
+
+        if elapsed_ms >= duration_ms:
+            if self._queue:
+                self._start(self._queue.popleft())
+            else:
+                self._finish()
+            return
+
+        # Pulsação: cosseno entre 255 e MIN_ALPHA, calculado a partir do tempo
+        phase = (elapsed_ms % PULSE_PERIOD_MS) / PULSE_PERIOD_MS
+        alpha = int(MIN_ALPHA + (255 - MIN_ALPHA) * (0.5 + 0.5 * math.cos(2 * math.pi * phase)))
+        self._apply_color(alpha)
+
+    def _apply_color(self, alpha):
+        # Degraus pequenos de alfa não são visíveis: evita repintar à toa
+        if self._last_alpha is not None and abs(alpha - self._last_alpha) < 4:
+            return
+        self._last_alpha = alpha
+
+        color = self._color(alpha)
+        for label in self._labels:
+            self._paint(label, color)
+
+    def _color(self, alpha):
+        color = QColor(STATUS_COLORS.get(self._current[1], STATUS_COLORS["info"]))
+        color.setAlpha(alpha)
+        return color
+
+    @staticmethod
+    def _paint(label, color):
+        palette = label.palette()
+        palette.setColor(QPalette.ColorRole.WindowText, color)
+        label.setPalette(palette)
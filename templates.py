@@ -0,0 +1,90 @@
+"""
+Prompt templates: named placeholders inside the prompt content.
+
+    Relato de {{nome do declarante}}, processo nº {{processo|sem número}}:
+    {{texto}}
+
+``{{campo}}`` is filled from the form of the main tab (or ``--set`` in the
+CLI), ``{{campo|padrão}}`` falls back to ``padrão`` when left empty, and
+``{{texto}}`` is where the user text goes. Prompts without ``{{texto}}``
+keep the old behaviour: ``prompt "texto do usuário"``.
+
+A template is parsed into a ``CompiledTemplate`` (literal pieces
+interleaved with field slots); rendering is one ``str.join`` over them, so
+a large transcript is copied once and never re-scanned.
+"""
+import re
+
+USER_TEXT_FIELD = "texto"
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([^{}|\s][^{}|]*?)\s*(?:\|([^{}]*))?\}\}")  # Nome não vazio
+
+
+class TemplateField:
+    __slots__ = ("name", "default")
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+    @property
+    def required(self):
+        return self.default is None
+
+    def __repr__(self):
+        return f"TemplateField({self.name!r}, default={self.default!r})"
+
+
+class CompiledTemplate:
+    """
+    A parsed prompt: ``parts`` alternates literal text (even positions) and
+    the index of a field in ``slots`` (odd positions).
+    """
+
+    __slots__ = ("parts", "slots", "fields", "has_user_text")
+
+    def __init__(self, parts, slots):
+        self.parts = parts
+        self.slots = slots
+        self.has_user_text = any(field.name == USER_TEXT_FIELD for field in slots)
+        # Campos do formulário: um por nome, na ordem em que aparecem (sem o texto do usuário)
+        fields = {}
+        for field in slots:
+            if field.name != USER_TEXT_FIELD:
+                known = fields.setdefault(field.name, field)
+                if known.default is None and field.default is not None:
+                    fields[field.name] = field
+        self.fields = tuple(fields.values())
+
+    def missing(self, values):
+        """Names of required fields left empty in ``values``."""
+        return [field.name for field in self.fields if field.required and not (values or {}).get(field.name)]
+
+    def render(self, user_text="", values=None):
+        """Fill the placeholders in a single pass; missing fields use their default (or stay empty)."""
+        user_text = user_text.strip()
+        values = values or {}
+        resolved = []
+        for field in self.slots:
+            value = user_text if field.name == USER_TEXT_FIELD else values.get(field.name)
+            resolved.append(value or field.default or "")
+
+        pieces = list(self.parts)
+        pieces[1::2] = resolved
+        if user_text and not self.has_user_text:
+            pieces += (' "', user_text, '"')
+        # Um único join: o texto do usuário é copiado uma vez, sem intermediários
+        return "".join(pieces)
+
+
+def compile_template(content):
+    """Parse ``content`` once into a ``CompiledTemplate``."""
+    parts, slots = [], []
+    position = 0
+    for match in _PLACEHOLDER.finditer(content):
+        parts.append(content[position:match.start()])
+        parts.append(len(slots))
+        slots.append(TemplateField(match.group(1), match.group(2)))
+        position = match.end()
+    parts.append(content[position:])
+    return CompiledTemplate(tuple(parts), tuple(slots))
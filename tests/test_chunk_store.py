@@ -0,0 +1,104 @@
+import os
+from array import array
+
+from chunk_store import ChunkBackend, split_chunks, MAX_CHUNK
+
+PARAGRAPH = "Parágrafo compartilhado por vários prompts, longo o bastante para virar um trecho. " * 6 + "\n"
+INTRO = "Introdução própria do segundo prompt, que sozinha já passa do tamanho mínimo. " * 4 + "\n"
+
+
+def library():
+    return [
+        {"name": "um", "content": PARAGRAPH + "Final do primeiro.", "color": "#111111"},
+        {"name": "dois", "content": INTRO + PARAGRAPH, "color": "#222222"},
+        {"name": "vazio", "content": "", "color": "#333333"},
+    ]
+
+
+def test_split_chunks_gives_the_text_back_and_respects_the_maximum():
+    text = ("linha curta\n" * 50) + ("Frase longa sem quebra de linha. " * 400) + "\nfim"
+    chunks = split_chunks(text)
+    assert "".join(chunks) == text
+    assert all(len(chunk) <= MAX_CHUNK for chunk in chunks)
+
+
+def test_round_trip_through_a_new_backend(tmp_path):
+    backend = ChunkBackend(str(tmp_path))
+    backend.write_all(library())
+    backend.close()
+
+    reopened = ChunkBackend(str(tmp_path))
+    assert reopened.load() == library()
+    assert [(prompt.name, prompt.content) for prompt in reopened.load_lazy()] == \
+        [(prompt["name"], prompt["content"]) for prompt in library()]
+    assert reopened.load_index()[1] == {"name": "dois", "color": "#222222"}
+
+
+def test_shared_paragraphs_are_stored_once(tmp_path):
+    backend = ChunkBackend(str(tmp_path))
+    backend.write_all(library())
+    entries = backend.index.load()
+    one, two = (set(entry["content"]) for entry in entries[:2])
+    assert one & two
+
+    size = os.path.getsize(backend.pack_path)
+    backend.record_upsert({"name": "três", "content": PARAGRAPH})  # Só trechos já guardados
+    assert os.path.getsize(backend.pack_path) == size
+
+
+def test_empty_body_is_read_without_the_pack(tmp_path):
+    backend = ChunkBackend(str(tmp_path))
+    assert backend.read_body(array("I")) == ""
+    assert not os.path.exists(backend.pack_path)
+
+
+def test_truncated_record_at_the_end_of_the_pack_is_dropped(tmp_path):
+    backend = ChunkBackend(str(tmp_path))
+    backend.write_all(library()[:1])
+    with open(backend.pack_path, "ab") as file:
+        file.write(b"\x07\x00\x00\x00registro pela metade")
+
+    reopened = ChunkBackend(str(tmp_path))
+    assert reopened.load() == library()[:1]
+    reopened.record_upsert({"name": "novo", "content": "Conteúdo novo depois da queda."})
+    assert ChunkBackend(str(tmp_path)).load()[-1]["content"] == "Conteúdo novo depois da queda."
+
+
+def test_garbage_collection_drops_unused_chunks_only(tmp_path):
+    backend = ChunkBackend(str(tmp_path))
+    backend.write_all(library())
+    backend.record_delete("um")
+    backend.record_upsert({"name": "dois", "content": "Agora curto."})
+    size = os.path.getsize(backend.pack_path)
+
+    assert backend.collect_garbage(force=True)
+    assert os.path.getsize(backend.pack_path) < size
+    assert [prompt.content for prompt in backend.load_lazy()] == ["Agora curto.", ""]
+    backend.close()
+    assert ChunkBackend(str(tmp_path)).load()[0]["content"] == "Agora curto."
+
+
+def test_two_processes_appending_to_the_same_pack(tmp_path):
+    window, cli = ChunkBackend(str(tmp_path)), ChunkBackend(str(tmp_path))  # Cada um com o seu estado
+    window.record_upsert({"name": "um", "content": PARAGRAPH + "Final do primeiro."})
+    cli.record_upsert({"name": "dois", "content": INTRO + PARAGRAPH})  # Não trunca o que a janela gravou
+    window.record_upsert({"name": "três", "content": INTRO + "Final do terceiro."})
+
+    reopened = ChunkBackend(str(tmp_path))
+    assert [(prompt["name"], prompt["content"]) for prompt in reopened.load()] == [
+        ("um", PARAGRAPH + "Final do primeiro."), ("dois", INTRO + PARAGRAPH), ("três", INTRO + "Final do terceiro.")]
+    assert len(reopened._by_digest) == len(reopened._chunks)  # Ids únicos e trechos comuns guardados uma vez
+    assert {prompt.name: prompt.content for prompt in window.load_lazy()}["dois"] == INTRO + PARAGRAPH
+
+
+def test_pack_rewritten_by_another_process_is_read_again(tmp_path):
+    window, cli = ChunkBackend(str(tmp_path)), ChunkBackend(str(tmp_path))
+    window.write_all(library())
+    cli.record_upsert({"name": "um", "content": "Conteúdo novo, sem o parágrafo compartilhado."})
+    cli.record_delete("dois")
+    assert cli.collect_garbage(force=True)
+
+    window.record_upsert({"name": "quatro", "content": INTRO})
+    assert {prompt.name: prompt.content for prompt in window.load_lazy()} == {
+        "um": "Conteúdo novo, sem o parágrafo compartilhado.", "vazio": "", "quatro": INTRO}
+    assert ChunkBackend(str(tmp_path)).load()[-1]["content"] == INTRO
@@ -0,0 +1,80 @@
+import pytest
+
+from fuzzy_index import TrigramIndex, normalize, trigrams
+from prompt_record import Prompt
+
+NAMES = ["Oitiva de testemunha", "Láudo Pericial", "Relato do Declarante", "Síntese da oitiva", "Conclusão"]
+
+
+@pytest.fixture
+def index():
+    index = TrigramIndex()
+    index.rebuild([Prompt(name, "") for name in NAMES])
+    return index
+
+
+def test_normalize_and_trigrams():
+    assert normalize("  Láudo   PERICIAL!  ") == "laudo pericial"
+    assert trigrams("oi") == {"  o", " oi", "oi "}
+    assert trigrams("oi", pad_end=False) == {"  o", " oi"}
+
+
+def test_search_ignores_case_and_accents(index):
+    assert index.search("laudo") == ["Láudo Pericial"]
+    assert index.search("SINTESE")[0] == "Síntese da oitiva"
+
+
+def test_prefix_ranks_above_substring_and_shorter_names_win_ties(index):
+    assert index.search("oitiva") == ["Oitiva de testemunha", "Síntese da oitiva"]
+    index.add("Oitiva")
+    assert index.search("oitiva")[0] == "Oitiva"
+
+
+def test_partial_last_word_and_typos_still_match(index):
+    assert index.search("relato do decl")[0] == "Relato do Declarante"
+    assert "Láudo Pericial" in index.search("laudo pericail")  # Letras trocadas
+    assert index.search("xyzw") == []
+
+
+def test_limit_keeps_the_best_matches(index):
+    assert index.search("oitiva", limit=1) == ["Oitiva de testemunha"]
+    assert index.search("o") == ["Oitiva de testemunha"]  # Uma letra: início do nome
+
+
+def test_add_remove_and_rename_are_seen_by_the_next_search(index):
+    assert index.search("oiti") == ["Oitiva de testemunha", "Síntese da oitiva"]  # Prefixo em cache
+    index.add("Oitiva complementar")
+    assert "Oitiva complementar" in index.search("oitiv")
+    index.remove("Oitiva de testemunha")
+    assert "Oitiva de testemunha" not in index.search("oitiva")
+    index.rename("Conclusão", "Conclusão final")
+    assert index.search("conclusao") == ["Conclusão final"]
+    assert "Conclusão" not in index and len(index) == len(NAMES)
+
+
+def test_content_matches_rank_below_name_matches():
+    index = TrigramIndex(include_content=True)
+    index.rebuild([Prompt("Resumo", "texto sobre a testemunha ocular"), Prompt("Testemunha", "outro assunto")])
+    assert index.search("testemunha") == ["Testemunha", "Resumo"]
+    assert index.search("testemunha", include_content=False) == ["Testemunha"]
+    assert index.search("ocular") == ["Resumo"]
+
+
+def test_deferred_rebuild_is_built_in_steps_and_by_the_next_search():
+    prompts = [Prompt(f"Prompt {number}", "") for number in range(10)]
+    index = TrigramIndex()
+    index.rebuild(prompts, deferred=True)
+    assert len(index) == 0
+    assert not index.build_step(4)
+    assert len(index) == 4
+
+    index.store_listener("delete", prompts[0].name, prompts[0])  # Excluído antes da vez dele
+    assert set(index.search("prompt")) == {prompt.name for prompt in prompts[1:]}
+    assert index.build_step()
+
+
+def test_store_listener_follows_inserts_updates_and_renames(index):
+    index.store_listener("insert", "Novo prompt", Prompt("Novo prompt"))
+    index.store_listener("update", "Laudo complementar", Prompt("Laudo complementar"), old_name="Láudo Pericial")
+    assert index.search("novo") == ["Novo prompt"]
+    assert index.search("laudo") == ["Laudo complementar"]
@@ -0,0 +1,127 @@
+import os
+
+import pytest
+
+from history import HistoryStore, make_delta, apply_delta, split_pieces
+
+TEXT = ("Primeira frase do parágrafo. Segunda frase, um pouco mais longa que a primeira. "
+        "Terceira frase encerra o parágrafo.\n") * 20
+
+
+def edit(text, number):
+    return text.replace("Segunda frase", f"Segunda frase (edição {number})", 1)
+
+
+def test_delta_round_trip():
+    new = edit(TEXT, 1).replace("Terceira", "Última") + "Linha nova.\n"
+    assert "".join(split_pieces(TEXT)) == TEXT
+    assert apply_delta(TEXT, make_delta(TEXT, new)) == new
+    assert apply_delta(TEXT, make_delta(TEXT, "")) == ""
+    assert apply_delta("", make_delta("", TEXT)) == TEXT
+
+
+def test_small_edit_stores_a_delta_and_keyframes_follow_the_interval(tmp_path):
+    history = HistoryStore(str(tmp_path), keyframe_interval=4)
+    contents = [TEXT]
+    for number in range(1, 10):
+        contents.append(edit(contents[-1], number))
+    for content in contents:
+        history.record("p", content)
+
+    revisions = history.revisions("p")
+    assert [revision.rev for revision in revisions] == list(range(1, 11))
+    assert [revision.keyframe for revision in revisions] == [
+        True, False, False, False, True, False, False, False, True, False]
+    log_size = os.path.getsize(history.path_for("p"))
+    assert log_size < len(TEXT.encode("utf-8")) * 4  # 3 keyframes + deltas pequenos
+
+    fresh = HistoryStore(str(tmp_path), keyframe_interval=4)  # Sem cache: reconstrói do log
+    for revision, content in zip(revisions, contents):
+        assert fresh.content_at("p", revision.rev) == content
+        assert revision.size == len(content)
+
+
+def test_previous_content_becomes_the_first_revision(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    assert history.record("p", "versão 2", previous="versão 1") == 2
+    assert history.record("p", "versão 2") is None  # Conteúdo igual: nada gravado
+    assert [history.content_at("p", rev) for rev in (1, 2)] == ["versão 1", "versão 2"]
+
+
+def test_unknown_revision_raises_key_error(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    history.record("p", TEXT)
+    with pytest.raises(KeyError):
+        history.content_at("p", 7)
+
+
+def test_truncated_line_is_ignored_and_numbering_continues(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    history.record("p", TEXT)
+    history.record("p", edit(TEXT, 1))
+    with open(history.path_for("p"), "a", encoding="utf-8") as file:
+        file.write("3\t17000")  # Queda no meio da gravação
+
+    fresh = HistoryStore(str(tmp_path))
+    assert [revision.rev for revision in fresh.revisions("p")] == [1, 2]
+    assert fresh.latest("p")[1] == edit(TEXT, 1)
+
+    fresh.record("p", edit(TEXT, 2))  # Começa em linha nova, não emendada na incompleta
+    assert [revision.rev for revision in HistoryStore(str(tmp_path)).revisions("p")] == [1, 2, 3]
+    assert HistoryStore(str(tmp_path)).content_at("p", 3) == edit(TEXT, 2)
+
+
+def test_rename_moves_the_log(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    history.record("antigo", TEXT)
+    history.record("novo", edit(TEXT, 1), renamed_from="antigo")
+
+    assert history.revisions("antigo") == []
+    assert [history.content_at("novo", rev) for rev in (1, 2)] == [TEXT, edit(TEXT, 1)]
+
+
+def test_rename_onto_the_name_of_a_deleted_prompt_archives_its_history(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    history.record("excluído", "conteúdo do prompt excluído")
+    history.record("excluído", "segunda versão do excluído")
+    history.record_delete("excluído")  # O histórico fica para trás
+    history.record("antigo", TEXT)
+
+    history.record("excluído", edit(TEXT, 1), renamed_from="antigo")
+
+    assert history.revisions("antigo") == []
+    assert [history.content_at("excluído", rev) for rev in (1, 2)] == [TEXT, edit(TEXT, 1)]
+    archived = [entry for entry in os.listdir(tmp_path) if ".arquivado-" in entry]
+    assert len(archived) == 1
+    with open(tmp_path / archived[0], encoding="utf-8") as file:
+        assert len(file.read().splitlines()) == 2
+
+
+def test_line_and_paragraph_separators_in_the_content_stay_in_one_revision(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    separated = "Antes\u2028depois\u2029fim\x85."
+    history.record("p", TEXT)
+    history.record("p", TEXT + separated)
+    history.record("p", separated)
+
+    fresh = HistoryStore(str(tmp_path))
+    assert [revision.rev for revision in fresh.revisions("p")] == [1, 2, 3]
+    assert fresh.latest("p")[1] == separated
+    assert fresh.content_at("p", 2) == TEXT + separated
+    assert fresh.record("p", separated + " editado") == 4
+
+
+def test_damaged_revision_is_reported_and_the_next_one_is_a_keyframe(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    history.record("p", TEXT)
+    history.record("p", edit(TEXT, 1))
+    with open(history.path_for("p"), "a", encoding="utf-8") as file:
+        file.write('3\t17000.000\t10\tD\t[2,["sem fim\n')  # Cabeçalho legível, JSON danificado
+
+    fresh = HistoryStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        fresh.content_at("p", 3)
+    assert fresh.content_at("p", 2) == edit(TEXT, 1)
+    assert fresh.record("p", edit(TEXT, 2)) == 4
+    assert fresh.revisions("p")[-1].keyframe  # Não depende da revisão danificada
+    assert HistoryStore(str(tmp_path)).content_at("p", 4) == edit(TEXT, 2)
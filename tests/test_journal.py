@@ -0,0 +1,96 @@
+import json
+
+from journal import JournalBackend, write_snapshot
+
+
+def snapshot(path, *prompts):
+    write_snapshot(str(path), [dict(prompt) for prompt in prompts])
+
+
+def names_and_contents(prompts):
+    return [(prompt["name"], prompt["content"]) for prompt in prompts]
+
+
+def test_replay_applies_journal_over_snapshot(tmp_path):
+    path = tmp_path / "prompts.json"
+    snapshot(path, {"name": "a", "content": "1", "color": "#111111"}, {"name": "b", "content": "2"})
+    backend = JournalBackend(str(path))
+    backend.record_upsert({"name": "a", "content": "1 editado", "color": "#222222"})
+    backend.record_upsert({"name": "c", "content": "3"})
+    backend.record_upsert({"name": "b2", "content": "2"}, original_name="b")
+    backend.record_delete("c")
+
+    prompts = JournalBackend(str(path)).load()
+    assert names_and_contents(prompts) == [("a", "1 editado"), ("b2", "2")]
+    assert prompts[0]["color"] == "#222222"
+    assert prompts[1]["color"] == "#444444"  # Cor padrão para registros sem cor
+
+
+def test_replay_is_idempotent_over_a_snapshot_that_already_has_the_records(tmp_path):
+    # Queda entre a gravação do snapshot e o corte do journal
+    path = tmp_path / "prompts.json"
+    snapshot(path, {"name": "a", "content": "1"})
+    backend = JournalBackend(str(path))
+    backend.record_upsert({"name": "a2", "content": "1"}, original_name="a")
+    backend.record_upsert({"name": "b", "content": "2"})
+    backend.record_delete("b")
+    expected = JournalBackend(str(path)).load()
+
+    snapshot(path, *expected)  # Snapshot já com as operações; journal intacto
+    assert JournalBackend(str(path)).load() == expected
+
+
+def test_truncated_last_line_is_skipped_and_next_record_starts_a_new_line(tmp_path):
+    path = tmp_path / "prompts.json"
+    snapshot(path, {"name": "a", "content": "1"})
+    backend = JournalBackend(str(path))
+    backend.record_upsert({"name": "b", "content": "2"})
+    with open(backend.journal_path, "ab") as file:
+        file.write(b'{"op": "upsert", "name": "meia linha", "con')
+
+    assert [prompt["name"] for prompt in JournalBackend(str(path)).load()] == ["a", "b"]
+
+    backend.record_upsert({"name": "c", "content": "3"})
+    assert [prompt["name"] for prompt in JournalBackend(str(path)).load()] == ["a", "b", "c"]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    path = tmp_path / "prompts.json"
+    snapshot(path, {"name": "a", "content": "1"})
+    backend = JournalBackend(str(path))
+    backend.load()
+    for number in range(20):
+        backend.record_upsert({"name": f"p{number}", "content": "x" * number})
+    backend.record_delete("a")
+    expected = JournalBackend(str(path)).load()
+
+    backend.compact()
+
+    assert not (tmp_path / "prompts.json.journal").exists()
+    with open(path, encoding="utf-8") as file:
+        assert json.load(file)["prompts"] == expected
+    assert JournalBackend(str(path)).load() == expected
+    assert not backend.has_external_change()  # O snapshot novo é da própria aplicação
+
+
+def test_journal_past_threshold_is_compacted_and_newer_records_survive(tmp_path):
+    path = tmp_path / "prompts.json"
+    snapshot(path)
+    backend = JournalBackend(str(path), compact_threshold=2048)
+    for number in range(40):
+        backend.record_upsert({"name": f"p{number}", "content": "conteúdo " * 10})
+    backend.close()  # Espera a compactação em segundo plano e dobra o resto
+
+    assert not (tmp_path / "prompts.json.journal").exists()
+    assert [prompt["name"] for prompt in JournalBackend(str(path)).load()] == [f"p{n}" for n in range(40)]
+
+
+def test_write_all_replaces_library_and_empties_journal(tmp_path):
+    path = tmp_path / "prompts.json"
+    snapshot(path, {"name": "a", "content": "1"})
+    backend = JournalBackend(str(path))
+    backend.record_upsert({"name": "b", "content": "2"})
+    backend.write_all([{"name": "z", "content": "novo", "color": "#000000"}])
+
+    assert not (tmp_path / "prompts.json.journal").exists()
+    assert names_and_contents(JournalBackend(str(path)).load()) == [("z", "novo")]
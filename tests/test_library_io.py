@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from library_io import ImportPlan, iter_json, read_prompts, write_prompts
+from prompt_record import Prompt
+
+
+def library(*items):
+    return [Prompt(name, content, "#123456") for name, content in items]
+
+
+def test_new_and_identical_records():
+    plan = ImportPlan(library(("a", "1")))
+    assert plan.add({"name": "a", "content": "  1\n"}) == "igual"  # Espaços das pontas não contam
+    assert plan.add({"name": "b", "content": "2", "color": "#ABCDEF"}) == "novo"
+    assert plan.prompts == [{"name": "b", "content": "2", "color": "#ABCDEF"}]
+
+
+@pytest.mark.parametrize("record", [{"name": "", "content": "x"}, {"name": "x", "content": " "}, ["x"], None])
+def test_invalid_records(record):
+    plan = ImportPlan([])
+    assert plan.add(record) == "inválido"
+    assert plan.prompts == []
+
+
+def test_skip_policy_keeps_the_library_version():
+    plan = ImportPlan(library(("a", "1")), "skip")
+    assert plan.add({"name": "a", "content": "outro"}) == "ignorado"
+    assert plan.prompts == []
+
+
+def test_overwrite_policy_replaces_and_sees_later_duplicates():
+    plan = ImportPlan(library(("a", "1")), "overwrite")
+    assert plan.add({"name": "a", "content": "2"}) == "substituído"
+    assert plan.add({"name": "a", "content": "2"}) == "igual"  # Repetido no próprio arquivo
+    assert plan.add({"name": "a", "content": "3"}) == "substituído"
+    assert [record["content"] for record in plan.prompts] == ["2", "3"]
+
+
+def test_rename_policy_picks_a_free_name():
+    plan = ImportPlan(library(("a", "1"), ("a (2)", "outro")), "rename")
+    assert plan.add({"name": "a", "content": "novo"}) == "renomeado"
+    assert plan.prompts[-1]["name"] == "a (3)"
+    assert plan.add({"name": "a", "content": "novo"}) == "igual"  # Já criado por este plano
+    assert plan.add({"name": "a", "content": "mais um"}) == "renomeado"
+    assert plan.prompts[-1]["name"] == "a (4)"
+
+
+def test_rename_policy_recognises_an_earlier_import():
+    plan = ImportPlan(library(("a", "1"), ("a (2)", "novo")), "rename")
+    assert plan.add({"name": "a", "content": "novo"}) == "igual"
+    assert plan.prompts == []
+
+
+def test_rename_policy_ignores_user_names_that_only_look_alike():
+    plan = ImportPlan(library(("a", "1"), ("a (versão antiga)", "novo"), ("a (02)", "novo")), "rename")
+    assert plan.add({"name": "a", "content": "novo"}) == "renomeado"
+    assert plan.prompts[-1]["name"] == "a (2)"
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        ImportPlan([], "merge")
+
+
+def test_summary_counts_outcomes():
+    plan = ImportPlan(library(("a", "1")), "skip")
+    for record in ({"name": "a", "content": "1"}, {"name": "a", "content": "2"}, {"name": "b", "content": "3"}):
+        plan.add(record)
+    assert plan.summary() == "1 novos, 1 iguais, 1 ignorados (nome em uso)"
+
+
+def test_iter_json_finds_prompts_by_key_not_by_text(tmp_path):
+    records = [{"name": f"p{number}", "content": "x" * number} for number in range(50)]
+    path = tmp_path / "biblioteca.json"
+    path.write_text(json.dumps({
+        "nota": 'exportado com "prompts": [{"name": "falso"}]',
+        "meta": {"prompts": "não é a lista"},
+        "prompts": records,
+        "depois": 1,
+    }), encoding="utf-8")
+    assert list(iter_json(str(path), chunk_chars=16)) == records
+
+
+def test_iter_json_accepts_a_bare_list_and_rejects_other_objects(tmp_path):
+    path = tmp_path / "lista.json"
+    path.write_text(json.dumps([{"name": "a", "content": "1"}]), encoding="utf-8")
+    assert list(iter_json(str(path))) == [{"name": "a", "content": "1"}]
+
+    path.write_text(json.dumps({"outra": []}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_json(str(path)))
+
+
+@pytest.mark.parametrize("target", ["saida.json", "saida.jsonl", "saida.csv", "saida_md"])
+def test_export_and_import_round_trip(tmp_path, target):
+    prompts = [
+        {"name": "Relatório", "content": "Linha 1\nLinha 2, com vírgula e \"aspas\".", "color": "#FF0000"},
+        {"name": "Outro", "content": "---\nnão é cabeçalho", "color": "#00FF00"},
+    ]
+    path = str(tmp_path / target)
+    assert write_prompts(prompts, path) == 2
+    assert sorted(read_prompts(path), key=lambda record: record["name"]) == \
+        sorted(prompts, key=lambda record: record["name"])
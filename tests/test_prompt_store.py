@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from journal import PromptConflictError, write_snapshot
+from prompt_store import PromptStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "prompts.json")
+    write_snapshot(path, [{"name": "a", "content": "1", "color": "#111111"},
+                          {"name": "b", "content": "2", "color": "#222222"}])
+    return path
+
+
+def test_saves_are_refused_after_an_external_rewrite(path):
+    store = PromptStore(path)
+    store.upsert("c", "3")
+    write_snapshot(path, [{"name": "a", "content": "versão de outra máquina"}])
+
+    with pytest.raises(PromptConflictError):
+        store.upsert("a", "minha versão")
+    with pytest.raises(PromptConflictError):
+        store.delete("b")
+    assert store.content("a") == "1"  # Nada foi alterado em memória
+    assert "b" in store
+
+
+def test_touching_the_file_is_not_a_conflict(path):
+    store = PromptStore(path)
+    store.names()
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert not store.backend.has_external_change()
+    store.upsert("a", "editado")
+    assert PromptStore(path).content("a") == "editado"
+
+
+def test_own_compaction_is_not_a_conflict(path):
+    store = PromptStore(path)
+    store.upsert("c", "3")
+    store.backend.compact()
+
+    store.upsert("d", "4")
+    assert PromptStore(path).names() == ["a", "b", "c", "d"]
+
+
+def test_external_changes_are_applied_per_prompt_and_accepted(path):
+    store = PromptStore(path)
+    untouched = store.get("b")
+    events = []
+    store.subscribe(lambda event, name, prompt=None, old_name=None: events.append((event, name)))
+    write_snapshot(path, [{"name": "a", "content": "1 editado", "color": "#111111"},
+                          {"name": "b", "content": "2", "color": "#222222"},
+                          {"name": "novo", "content": "3"}])
+
+    assert store.backend.has_external_change()
+    prompts, fingerprint = store.backend.load_external()
+    assert store.apply_external(prompts) == 2
+    store.backend.accept_snapshot(fingerprint)
+
+    assert sorted(events) == [("insert", "novo"), ("update", "a")]
+    assert store.get("b") is untouched  # Registros iguais não são trocados
+    assert store.content("a") == "1 editado"
+    store.upsert("b", "2 editado")  # Versão aceita: gravar volta a ser permitido
+    assert PromptStore(path).content("b") == "2 editado"
+
+
+def test_external_deletion_removes_the_prompt(path):
+    store = PromptStore(path)
+    store.names()
+    write_snapshot(path, [{"name": "a", "content": "1", "color": "#111111"}])
+
+    prompts, fingerprint = store.backend.load_external()
+    assert store.apply_external(prompts) == 1
+    assert store.names() == ["a"]
+
+
+def test_rename_onto_an_existing_name_is_refused_before_any_change(path):
+    store = PromptStore(path)
+    store.names()
+    events = []
+    store.subscribe(lambda event, name, prompt=None, old_name=None: events.append((event, name)))
+
+    with pytest.raises(ValueError):
+        store.upsert("a", "2 editado", original_name="b")
+    with pytest.raises(ValueError):
+        store.upsert("a", "outro", original_name="inexistente")
+
+    assert events == []
+    assert store.names() == ["a", "b"]
+    assert [store.content(name) for name in ("a", "b")] == ["1", "2"]
+    assert PromptStore(path).names() == ["a", "b"]
@@ -0,0 +1,65 @@
+import pytest
+
+from journal import write_snapshot
+from prompt_record import Prompt
+from prompt_store import PromptStore
+from sorting import alpha_key, color_distance_key, lab_group_key, natural_key
+
+
+def names(prompts, key):
+    return [prompt.name for prompt in sorted(prompts, key=key)]
+
+
+def test_alphabetical_order_ignores_case_and_accents():
+    prompts = [Prompt(name) for name in ("beta", "Ábaco", "abelha", "Zebra", "édito", "Edito")]
+    assert names(prompts, alpha_key) == ["Ábaco", "abelha", "beta", "Edito", "édito", "Zebra"]
+
+
+def test_numbers_are_ordered_by_value():
+    assert natural_key("Portaria 2") < natural_key("Portaria 10") < natural_key("Portaria 10 a")
+    assert natural_key("2 Relato") < natural_key("Relato")
+
+
+def test_colour_orderings():
+    prompts = [Prompt("vermelho", color="#ff0000"), Prompt("cinza claro", color="#dddddd"),
+               Prompt("base", color="#444444"), Prompt("vermelho escuro", color="#880000"),
+               Prompt("preto", color="#000000")]
+    # "vermelho escuro" e "preto" ficam à mesma distância da base: o empate mantém a ordem de entrada
+    assert names(prompts, color_distance_key) == ["base", "vermelho escuro", "preto", "vermelho", "cinza claro"]
+    # Neutras primeiro (escura -> clara), depois por faixa de matiz
+    assert names(prompts, lab_group_key) == ["preto", "base", "cinza claro", "vermelho escuro", "vermelho"]
+
+
+def test_invalid_colour_sorts_as_the_default():
+    assert color_distance_key(Prompt("ruim", color="#zzz")) == color_distance_key(Prompt("padrão"))
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "prompts.json")
+    write_snapshot(path, [{"name": name, "content": "x", "color": color} for name, color in (
+        ("c", "#ff0000"), ("a", "#444444"), ("b", "#ff0000"), ("d", "#444444"))])
+    return PromptStore(path)
+
+
+def test_equal_keys_keep_file_order(store):
+    # O modelo do seletor depende da estabilidade: empates ficam na ordem do arquivo
+    assert names(store.all(), store.key_function("color")) == ["a", "d", "c", "b"]
+
+
+def test_cached_keys_follow_saves_and_renames(store):
+    key = store.key_function("alpha")
+    assert names(store.all(), key) == ["a", "b", "c", "d"]
+    store.upsert("0 primeiro", "x", "#ff0000", original_name="d")
+    store.upsert("c", "x", "#444444")
+    assert names(store.all(), key) == ["0 primeiro", "a", "b", "c"]
+    assert names(store.all(), store.key_function("color"))[:2] == ["c", "a"]
+
+
+def test_usage_orderings(store):
+    store.usage.record("b", now=1_000)
+    store.usage.record("d", now=2_000)
+    assert names(store.all(), store.key_function("mru"))[:2] == ["d", "b"]
+    store.usage.record("b", now=2_000)
+    # Mais usados primeiro; quem nunca foi usado fica na ordem de cor
+    assert names(store.all(), store.key_function("frecency")) == ["b", "d", "a", "c"]
@@ -0,0 +1,39 @@
+import pytest
+
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "prompts.db"))
+    backend.write_all([{"name": "a", "content": "1"}, {"name": "b", "content": "2"}])
+    yield backend
+    backend.close()
+
+
+def test_upsert_inserts_updates_and_renames(backend):
+    backend.record_upsert({"name": "c", "content": "3"})
+    backend.record_upsert({"name": "a", "content": "1 editado"})
+    backend.record_upsert({"name": "novo", "content": "2 editado"}, original_name="b")
+
+    assert [(p["name"], p["content"]) for p in backend.load()] == [
+        ("a", "1 editado"), ("novo", "2 editado"), ("c", "3")]
+
+
+def test_rename_onto_an_existing_name_is_refused_without_changes(backend):
+    with pytest.raises(ValueError):
+        backend.record_upsert({"name": "a", "content": "2 editado"}, original_name="b")
+    with pytest.raises(ValueError):
+        backend.record_batch([("upsert", {"name": "c", "content": "3"}, None),
+                              ("upsert", {"name": "a", "content": "2"}, "b")])
+
+    assert [(p["name"], p["content"]) for p in backend.load()] == [("a", "1"), ("b", "2")]
+
+
+def test_search_follows_renames_and_deletes(backend):
+    backend.record_upsert({"name": "oitiva", "content": "depoimento da testemunha"}, original_name="a")
+    backend.record_delete("b")
+
+    assert backend.search("testem") == ["oitiva"]
+    assert backend.search("oiti") == ["oitiva"]
+    assert backend.search("2") == []
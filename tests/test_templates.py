@@ -0,0 +1,47 @@
+from templates import compile_template
+
+TEMPLATE = "Relato de {{nome do declarante}}, processo nº {{ processo | sem número }}:\n{{texto}}"
+
+
+def test_placeholders_are_filled_from_the_values_and_the_user_text():
+    template = compile_template(TEMPLATE)
+    rendered = template.render("  fala transcrita  ", {"nome do declarante": "Fulano", "processo": "123"})
+    assert rendered == "Relato de Fulano, processo nº 123:\nfala transcrita"
+    assert template.has_user_text
+    assert [(field.name, field.default) for field in template.fields] == [
+        ("nome do declarante", None), ("processo", " sem número ")]
+
+
+def test_missing_required_field_stays_empty_and_default_fills_its_field():
+    template = compile_template("{{nome}} / {{processo|s/n}}")
+    assert template.missing({}) == ["nome"]
+    assert template.missing({"nome": "Fulano"}) == []
+    assert template.render("", {}) == " / s/n"
+    assert template.render("", {"nome": "Fulano", "processo": ""}) == "Fulano / s/n"
+    assert template.render("", {"processo": "123"}) == " / 123"
+
+
+def test_repeated_field_is_asked_once_and_keeps_its_default():
+    template = compile_template("{{nome}} e {{nome|ninguém}}")
+    assert [(field.name, field.default) for field in template.fields] == [("nome", "ninguém")]
+    assert template.render("", {"nome": "Fulano"}) == "Fulano e Fulano"
+
+
+def test_prompt_without_user_text_field_gets_the_text_quoted_at_the_end():
+    template = compile_template("Resuma o texto abaixo.")
+    assert not template.has_user_text
+    assert template.render("  fala  ") == 'Resuma o texto abaixo. "fala"'
+    assert template.render("") == "Resuma o texto abaixo."
+
+
+def test_values_and_user_text_are_inserted_verbatim():
+    template = compile_template("{{campo}}: {{texto}}")
+    text = 'Ele disse "{{campo}}" e {chaves} \\1 $1'
+    assert template.render(text, {"campo": "{{texto}}"}) == "{{texto}}: " + text
+
+
+def test_text_that_is_not_a_placeholder_is_kept():
+    content = "JSON: {\"a\": 1}, chaves soltas {{ }} e {{sem fim"
+    template = compile_template(content)
+    assert template.fields == ()
+    assert template.render() == content
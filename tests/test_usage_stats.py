@@ -0,0 +1,93 @@
+import json
+import math
+
+import pytest
+
+from usage_stats import UsageStats
+
+DAY = 86400
+NOW = 1_800_000_000.0
+
+
+def test_each_use_loses_half_its_weight_every_half_life():
+    stats = UsageStats(half_life_days=7)
+    stats.record("a", now=NOW)
+    assert stats.weight("a", now=NOW) == pytest.approx(1.0)
+    assert stats.weight("a", now=NOW + 7 * DAY) == pytest.approx(0.5)
+    stats.record("a", now=NOW + 7 * DAY)
+    assert stats.weight("a", now=NOW + 7 * DAY) == pytest.approx(1.5)
+    assert stats.uses("a") == 2 and stats.last_used("a") == NOW + 7 * DAY
+    assert stats.score("nunca") == -math.inf and stats.weight("nunca") == 0.0
+
+
+def test_recent_use_outranks_many_old_uses_and_scores_do_not_change_with_time():
+    stats = UsageStats(half_life_days=7)
+    for _ in range(4):
+        stats.record("antigo", now=NOW)
+    stats.record("recente", now=NOW + 21 * DAY)  # 4 usos × 1/8 = 0,5 < 1
+
+    assert stats.score("recente") > stats.score("antigo")
+    score = stats.score("antigo")
+    assert stats.weight("antigo", now=NOW + 100 * DAY) < stats.weight("antigo", now=NOW)
+    assert stats.score("antigo") == score  # A ordem entre os prompts não depende de "agora"
+
+
+def test_pinned_keeps_the_top_names_and_reports_the_one_pushed_out():
+    stats = UsageStats(pinned_count=2)
+    assert stats.record("a", now=NOW) == []
+    assert stats.record("b", now=NOW + 1) == []
+    assert stats.pinned() == ("b", "a")
+    assert stats.record("c", now=NOW + 2) == ["a"]
+    assert stats.pinned() == ("c", "b")
+
+    assert stats.forget("c") == ["a"]  # Promovido ao topo
+    assert stats.pinned() == ("b", "a")
+    assert stats.forget("nenhum") == []
+
+
+def test_rename_moves_the_counters_and_the_pinned_place():
+    stats = UsageStats(pinned_count=2)
+    stats.record("antigo", now=NOW)
+    stats.record("outro", now=NOW - DAY)
+    score = stats.score("antigo")
+
+    stats.rename("antigo", "novo")
+    assert stats.score("novo") == score and stats.uses("antigo") == 0
+    assert stats.pinned() == ("novo", "outro")
+
+
+def test_counters_are_written_after_flush_every_uses_and_read_back(tmp_path):
+    path = str(tmp_path / "prompts.usage.json")
+    stats = UsageStats(path, flush_every=3)
+    stats.record("a", now=NOW)
+    stats.record("b", now=NOW + 1)
+    assert not (tmp_path / "prompts.usage.json").exists()  # Ainda só em memória
+    stats.record("a", now=NOW + 2)
+    stats.rename("b", "c")
+    stats.close()
+
+    reloaded = UsageStats(path)
+    assert reloaded.uses("a") == 2 and reloaded.uses("c") == 1 and reloaded.uses("b") == 0
+    assert reloaded.score("a") == stats.score("a")
+    assert reloaded.pinned() == ("a", "c")
+
+
+def test_changed_half_life_approximates_the_scores(tmp_path):
+    path = str(tmp_path / "prompts.usage.json")
+    stats = UsageStats(path, half_life_days=7)
+    stats.record("a", now=NOW)
+    stats.close()
+
+    longer = UsageStats(path, half_life_days=14)
+    assert longer.weight("a", now=NOW) == pytest.approx(1.0)
+    assert longer.weight("a", now=NOW + 14 * DAY) == pytest.approx(0.5)
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "prompts.usage.json"
+    path.write_text("{não é json", encoding="utf-8")
+    stats = UsageStats(str(path))
+    assert stats.pinned() == ()
+    stats.record("a", now=NOW)
+    stats.close()
+    assert json.loads(path.read_text(encoding="utf-8"))["prompts"]["a"][0] == 1
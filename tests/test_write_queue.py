@@ -0,0 +1,106 @@
+import pytest
+
+from write_queue import MAX_ATTEMPTS, WriteQueue, coalesce
+
+WAIT_FOR_FLUSH = 60_000  # Sem gravação antes do flush: cada flush é uma tentativa
+
+
+def upsert(name, content, original_name=None, **extra):
+    return ("upsert", dict({"name": name, "content": content}, **extra), original_name)
+
+
+class Backend:
+    """Records what reaches the disk; upserts of the names in ``broken`` always fail."""
+
+    def __init__(self, broken=(), failures=0):
+        self.broken = set(broken)
+        self.failures = failures  # Falhas passageiras antes de qualquer gravação
+        self.written = []
+
+    def record_upsert(self, prompt, original_name=None):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disco ocupado")
+        if prompt["name"] in self.broken:
+            raise OSError("registro recusado")
+        self.written.append(("upsert", prompt["name"], prompt["content"]))
+
+    def record_delete(self, name):
+        self.written.append(("delete", name))
+
+
+def test_successive_upserts_collapse_into_the_last():
+    ops = [upsert("a", "1"), upsert("b", "1"), upsert("a", "2")]
+    assert coalesce(ops) == [upsert("a", "2"), upsert("b", "1")]
+
+
+def test_collapsed_upserts_keep_the_first_rename_and_previous_content():
+    ops = [upsert("novo", "1", "antigo", previous="0"), upsert("novo", "2", previous="1")]
+    assert coalesce(ops) == [upsert("novo", "2", "antigo", previous="0")]
+
+
+def test_deletes_and_renames_keep_their_order():
+    ops = [upsert("a", "1"), ("delete", "a"), upsert("a", "2"), upsert("b", "3", "a"), upsert("a", "4")]
+    assert coalesce(ops) == ops
+
+
+def test_batch_is_written_in_order_and_reported():
+    backend, written = Backend(), []
+    queue = WriteQueue(backend, on_written=written.extend, coalesce_ms=WAIT_FOR_FLUSH)
+    queue.submit(upsert("a", "1"))
+    queue.submit(("delete", "b"))
+    assert queue.flush(5)
+    queue.close()
+    assert backend.written == [("upsert", "a", "1"), ("delete", "b")]
+    assert written == ["a", "b"]
+
+
+def test_failed_batch_is_retried_on_the_next_flush():
+    backend, errors = Backend(failures=1), []
+    queue = WriteQueue(backend, on_error=errors.append, coalesce_ms=WAIT_FOR_FLUSH)
+    queue.submit(upsert("a", "1"))
+    assert not queue.flush(5)
+    assert queue.pending() == 1
+    assert queue.flush(5)
+    queue.close()
+    assert backend.written == [("upsert", "a", "1")]
+    assert errors == ["disco ocupado"]
+    assert queue.dropped == []
+
+
+def test_operation_that_always_fails_is_set_aside_and_later_writes_go_on():
+    backend, errors = Backend(broken={"ruim"}), []
+    queue = WriteQueue(backend, on_error=errors.append, coalesce_ms=WAIT_FOR_FLUSH)
+    queue.submit(upsert("ruim", "1"))
+    queue.submit(upsert("bom", "2"))
+    for _ in range(MAX_ATTEMPTS - 1):
+        assert not queue.flush(5)
+    assert queue.flush(5)
+    assert queue.pending() == 0
+    assert backend.written == [("upsert", "bom", "2")]
+    assert queue.dropped == [upsert("ruim", "1")]
+    assert len(errors) == MAX_ATTEMPTS and "ruim" in errors[-1]
+
+    queue.submit(upsert("outro", "3"))  # A fila não fica travada
+    assert queue.flush(5)
+    queue.close()
+    assert backend.written[-1] == ("upsert", "outro", "3")
+
+
+def test_close_sets_aside_what_still_fails_and_reports_it():
+    backend, errors = Backend(broken={"ruim"}), []
+    queue = WriteQueue(backend, on_error=errors.append, coalesce_ms=WAIT_FOR_FLUSH)
+    queue.submit(upsert("ruim", "1"))
+    queue.submit(upsert("bom", "2"))
+    queue.flush(5)
+    queue.close()
+    assert backend.written == [("upsert", "bom", "2")]
+    assert queue.dropped == [upsert("ruim", "1")]
+
+
+def test_close_without_error_callback_raises():
+    queue = WriteQueue(Backend(broken={"ruim"}), coalesce_ms=WAIT_FOR_FLUSH)
+    queue.submit(upsert("ruim", "1"))
+    queue.flush(5)
+    with pytest.raises(OSError):
+        queue.close()
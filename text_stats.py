@@ -0,0 +1,63 @@
+"""
+Size of a text as characters, words and an approximate token count.
+
+The token estimate is a heuristic (no tokenizer is bundled): about four
+characters per token, but never fewer than 4/3 of a token per word, which
+is closer for Portuguese prose full of short words and punctuation.
+"""
+import os
+from collections import namedtuple
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_WORD = 4 / 3
+COUNT_CHUNK_CHARS = 1 << 20  # Textos grandes são contados em partes (memória limitada)
+
+# Limite avisado na aba principal (tokens estimados); PROMPTS_TOKEN_LIMIT altera
+DEFAULT_TOKEN_LIMIT = 128_000
+
+
+def token_limit():
+    try:
+        return int(os.environ.get("PROMPTS_TOKEN_LIMIT", DEFAULT_TOKEN_LIMIT))
+    except ValueError:
+        return DEFAULT_TOKEN_LIMIT
+
+
+def estimate_tokens(chars, words):
+    return max(-(-chars // CHARS_PER_TOKEN), round(words * TOKENS_PER_WORD))
+
+
+class TextStats(namedtuple("TextStats", "chars words")):
+    __slots__ = ()
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.chars, self.words)
+
+
+EMPTY_STATS = TextStats(0, 0)
+
+
+def combine(*stats):
+    return TextStats(sum(item.chars for item in stats), sum(item.words for item in stats))
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def count_text(text, chunk_chars=COUNT_CHUNK_CHARS):
+    """Count ``text``, splitting a large one at whitespace into chunks so no word is cut."""
+    words, start, size = 0, 0, len(text)
+    while start < size:
+        end = min(start + chunk_chars, size)
+        while end < size and not text[end].isspace():
+            end += 1
+        words += count_words(text[start:end])
+        start = end
+    return TextStats(size, words)
+
+
+def count_lines(text, separator="\n"):
+    """Words per line (one entry per ``separator``-separated line), for incremental recounts."""
+    return [count_words(line) for line in text.split(separator)]
@@ -0,0 +1,174 @@
+import os
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QPlainTextEdit
+
+from instrumentation import span
+from live_counter import DocumentCounter
+
+READ_CHUNK_CHARS = 1 << 20   # Caracteres lidos por vez do arquivo
+LARGE_INPUT_CHARS = 1 << 20  # Acima disso o editor mostra só uma prévia
+PREVIEW_CHARS = 64 * 1024
+
+
+def _strip_parts(parts):
+    """Strip the whitespace around the text spread over ``parts``, in place, without joining."""
+    while parts:
+        parts[0] = parts[0].lstrip()
+        if parts[0]:
+            break
+        parts.pop(0)
+    while parts:
+        parts[-1] = parts[-1].rstrip()
+        if parts[-1]:
+            break
+        parts.pop()
+
+
+def read_transcript(path, chunk_chars=READ_CHUNK_CHARS, progress=None):
+    """
+    Read a text file in chunks (UTF-8, with or without BOM) and return it
+    stripped, building the final string only once. ``progress(read, total)``
+    is called in bytes after every chunk.
+    """
+    total = os.path.getsize(path)
+    parts = []
+    with span("transcrição.ler", bytes=total), \
+            open(path, "r", encoding="utf-8-sig", errors="replace") as file:
+        while True:
+            chunk = file.read(chunk_chars)
+            if not chunk:
+                break
+            parts.append(chunk)
+            if progress is not None:
+                progress(file.buffer.tell(), total)
+        _strip_parts(parts)
+        return "".join(parts)
+
+
+class _ReadSignals(QObject):
+    progress = pyqtSignal(int, int)     # (bytes lidos, total)
+    # object: a string chega à thread da UI sem conversão (e cópia) para QString
+    finished = pyqtSignal(str, object)  # (caminho, texto)
+    failed = pyqtSignal(str, str)       # (caminho, mensagem)
+
+
+class _ReadTask(QRunnable):
+    """Reads one transcript on a pool thread so the UI never blocks on the disk."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = _ReadSignals()
+
+    def run(self):
+        try:
+            text = read_transcript(self.path, progress=self.signals.progress.emit)
+        except (OSError, ValueError) as e:
+            self.signals.failed.emit(self.path, str(e))
+            return
+        self.signals.finished.emit(self.path, text)
+
+
+class TranscriptLoader(QObject):
+    """
+    Loads text files off the UI thread. Only the most recent ``load`` is
+    reported: starting another one discards the result of the previous.
+    """
+
+    progress = pyqtSignal(str, int, int)  # (caminho, bytes lidos, total)
+    loaded = pyqtSignal(str, object)      # (caminho, texto sem espaços nas pontas)
+    failed = pyqtSignal(str, str)         # (caminho, mensagem)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._task = None
+
+    def load(self, path):
+        task = self._task = _ReadTask(path)
+        task.setAutoDelete(False)  # Os sinais ainda podem chegar depois do run()
+        task.signals.progress.connect(lambda done, total: self._relay(task, "progress", done, total))
+        task.signals.finished.connect(lambda path, text: self._relay(task, "loaded", text))
+        task.signals.failed.connect(lambda path, message: self._relay(task, "failed", message))
+        QThreadPool.globalInstance().start(task)
+
+    def _relay(self, task, signal, *args):
+        if task is not self._task:
+            return  # Leitura substituída por outra mais recente
+        if signal != "progress":
+            self._task = None
+        getattr(self, signal).emit(task.path, *args)
+
+
+class TranscriptEdit(QPlainTextEdit):
+    """
+    Plain-text input for the user text (no rich-text layout), accepting
+    dropped files.
+
+    Small files are loaded into the editor; a large one is kept as a Python
+    string and the editor only shows a read-only preview, so neither the
+    layout nor ``toPlainText()`` ever handles the whole transcript.
+    ``user_text()`` returns what will be composed in both cases, and
+    ``counter`` counts it live (the whole transcript, not the preview).
+    """
+
+    file_dropped = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._full_text = None  # Transcrição grande (só a prévia está no editor)
+        self.counter = DocumentCounter(self.document(), self)
+
+    def user_text(self):
+        if self._full_text is not None:
+            return self._full_text
+        return self.toPlainText().strip()
+
+    def is_large(self):
+        return self._full_text is not None
+
+    def set_user_text(self, text, source_name=""):
+        """Show ``text`` (already stripped); large texts become a read-only preview."""
+        if len(text) <= LARGE_INPUT_CHARS:
+            self.clear_input()
+            self.setPlainText(text)
+            return
+        self._full_text = text
+        self.counter.use_text(text)
+        self.setReadOnly(True)
+        size = f"{len(text) / 1e6:.1f}".replace(".", ",")
+        self.setPlainText(
+            f"{text[:PREVIEW_CHARS]}\n\n[… prévia de {source_name}: {size} milhões de caracteres; "
+            "o texto completo será usado ao copiar]"
+        )
+
+    def clear_input(self):
+        self._full_text = None
+        self.counter.use_text(None)
+        self.setReadOnly(False)
+        self.clear()
+
+    def _dropped_file(self, event):
+        urls = event.mimeData().urls() if event.mimeData().hasUrls() else []
+        files = [url.toLocalFile() for url in urls if url.isLocalFile()]
+        return files[0] if files and os.path.isfile(files[0]) else None
+
+    def dragEnterEvent(self, event):
+        if self._dropped_file(event):
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event):
+        if self._dropped_file(event):
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
+
+    def dropEvent(self, event):
+        path = self._dropped_file(event)
+        if path:
+            event.acceptProposedAction()
+            self.file_dropped.emit(path)
+        else:
+            super().dropEvent(event)
@@ -0,0 +1,203 @@
+"""
+Usage statistics of the prompts (how often and how recently each was copied).
+
+Each prompt has a use count, the time of its last use and a frecency score:
+every use is worth 1 at the moment it happens and loses half its weight
+every ``HALF_LIFE_DAYS``. The score is stored as ``log2`` of the sum of the
+uses' weights measured against a fixed reference time (the Unix epoch), so
+all scores decay at the same rate and their *order* never changes with the
+passage of time: a use only moves the prompt that was used, and the
+selectors re-sort that one row instead of the whole list.
+
+Counters live in memory. They are written to a small file of their own
+(``prompts.usage.json``, never the library) after ``FLUSH_EVERY`` uses, on
+``flush()`` (the interface calls it periodically) and on exit.
+"""
+import os
+import json
+import math
+import time
+import threading
+
+from instrumentation import logger, count
+
+HALF_LIFE_DAYS = 7.0  # Um uso vale metade depois de uma semana
+PINNED_COUNT = 5  # Prompts mais usados fixados no topo do seletor principal
+FLUSH_EVERY = 20  # Usos acumulados em memória antes de gravar
+
+
+def log2_add(a, b):
+    """``log2(2 ** a + 2 ** b)`` without overflowing."""
+    if a < b:
+        a, b = b, a
+    if b == -math.inf:
+        return a
+    return a + math.log2(1 + 2 ** (b - a))
+
+
+class UsageStats:
+    """
+    Use counters of one library, keyed by prompt name, plus the
+    ``PINNED_COUNT`` highest-scored names, kept up to date use by use.
+    ``path`` None keeps everything in memory only.
+    """
+
+    def __init__(self, path=None, half_life_days=HALF_LIFE_DAYS, pinned_count=PINNED_COUNT,
+                 flush_every=FLUSH_EVERY):
+        self.path = path
+        self.half_life = half_life_days * 86400
+        self.pinned_count = pinned_count
+        self.flush_every = flush_every
+        self._entries = {}  # nome -> [usos, último uso, pontuação (log2)]
+        self._pinned = ()   # Nomes fixados, da maior para a menor (tupla trocada inteira, lida sem trava)
+        self._unsaved = 0   # Usos ainda não gravados
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        # Leituras não pegam a trava depois da carga: chamadas a cada comparação da ordenação
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+                    self._loaded = True
+
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                count("arquivo.leituras")
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            logger.warning("Estatísticas de uso ilegíveis em %s; começando do zero.", self.path, exc_info=True)
+            return
+        same_decay = data.get("half_life") == self.half_life
+        for name, (uses, last, score) in data.get("prompts", {}).items():
+            if not same_decay:
+                # Meia-vida alterada: aproxima como se todos os usos fossem no último
+                score = last / self.half_life + math.log2(uses)
+            self._entries[name] = [uses, last, score]
+        self._rebuild_pinned()
+
+    # ------------------------------------------------------------------ #
+    # Consulta
+    # ------------------------------------------------------------------ #
+    def score(self, name):
+        """Frecency score of ``name`` (comparable across prompts at any time; -inf if never used)."""
+        self._ensure_loaded()
+        entry = self._entries.get(name)
+        return entry[2] if entry else -math.inf
+
+    def last_used(self, name):
+        self._ensure_loaded()
+        entry = self._entries.get(name)
+        return entry[1] if entry else 0.0
+
+    def uses(self, name):
+        self._ensure_loaded()
+        entry = self._entries.get(name)
+        return entry[0] if entry else 0
+
+    def weight(self, name, now=None):
+        """Decayed number of uses of ``name`` right now (the score in readable units)."""
+        score = self.score(name)
+        if score == -math.inf:
+            return 0.0
+        return 2 ** (score - (now or time.time()) / self.half_life)
+
+    def pinned(self):
+        """The most used names, best first (a tuple; cheap enough to call per comparison)."""
+        self._ensure_loaded()
+        return self._pinned
+
+    # ------------------------------------------------------------------ #
+    # Alteração
+    # ------------------------------------------------------------------ #
+    def record(self, name, now=None):
+        """
+        Count one use of ``name``. Returns the other names whose pinned
+        state changed (the one pushed out of the top), so only their rows
+        need to move.
+        """
+        now = now or time.time()
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = [0, 0.0, -math.inf]
+            entry[0] += 1
+            entry[1] = now
+            entry[2] = log2_add(entry[2], now / self.half_life)
+            changed = self._update_pinned(name)
+            self._unsaved += 1
+            due = self._unsaved >= self.flush_every
+        if due:
+            self.flush()
+        return changed
+
+    def _update_pinned(self, name):
+        # Lista pequena: reordenar a cada uso custa ~PINNED_COUNT comparações
+        score = self._entries[name][2]
+        pinned, changed = list(self._pinned), []
+        if name not in pinned:
+            if len(pinned) >= self.pinned_count:
+                if self.pinned_count == 0 or score <= self._entries[pinned[-1]][2]:
+                    return changed
+                changed.append(pinned.pop())
+            pinned.append(name)
+        pinned.sort(key=lambda other: self._entries[other][2], reverse=True)
+        self._pinned = tuple(pinned)
+        return changed
+
+    def _rebuild_pinned(self):
+        ranked = sorted(self._entries, key=lambda other: self._entries[other][2], reverse=True)
+        self._pinned = tuple(ranked[:self.pinned_count])
+
+    def rename(self, old_name, new_name):
+        self._ensure_loaded()
+        with self._lock:
+            if old_name not in self._entries:
+                return
+            self._entries[new_name] = self._entries.pop(old_name)
+            self._pinned = tuple(new_name if other == old_name else other for other in self._pinned)
+            self._unsaved += 1
+
+    def forget(self, name):
+        """Drop the counters of a deleted prompt. Returns the name promoted to the top, if any."""
+        self._ensure_loaded()
+        with self._lock:
+            if self._entries.pop(name, None) is None:
+                return []
+            self._unsaved += 1
+            if name not in self._pinned:
+                return []
+            before = set(self._pinned) - {name}
+            self._rebuild_pinned()
+            return [other for other in self._pinned if other not in before]
+
+    # ------------------------------------------------------------------ #
+    # Gravação
+    # ------------------------------------------------------------------ #
+    def flush(self):
+        """Write the counters if any use is still only in memory."""
+        with self._lock:
+            if not self._unsaved or self.path is None:
+                return
+            data = {"half_life": self.half_life, "prompts": self._entries}
+            text = json.dumps(data, ensure_ascii=False)
+            self._unsaved = 0
+        count("arquivo.gravacoes")
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Estatísticas são descartáveis: não interrompem a cópia do prompt
+            logger.warning("Não foi possível gravar %s.", self.path, exc_info=True)
+
+    def close(self):
+        self.flush()
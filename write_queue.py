@@ -0,0 +1,199 @@
+import threading
+from collections import deque
+
+from instrumentation import logger, span
+
+# Janela para juntar uma rajada de edições em uma única gravação
+COALESCE_MS = 50
+# Tentativas de um lote antes de separar as operações que sempre falham
+MAX_ATTEMPTS = 3
+
+
+def coalesce(ops):
+    """
+    Merge a burst of storage operations without changing the end result.
+
+    Operations are ``("upsert", prompt, original_name)`` or ``("delete", name)``.
+    Successive upserts of the same prompt collapse into the last one (keeping
+    the first ``original_name`` when the burst started with a rename, and the
+    first ``previous`` content when the ops carry one); deletes and renames
+    are kept in order.
+    """
+    kept = []
+    last_upsert = {}  # nome resultante -> índice em kept
+    for op in ops:
+        if op[0] == "upsert":
+            prompt, original_name = op[1], op[2]
+            name = prompt["name"]
+            renaming = bool(original_name) and original_name != name
+            index = None if renaming else last_upsert.get(name)
+            if index is not None:
+                first = kept[index][1]
+                if "previous" in first:
+                    # Histórico: o conteúdo de antes da rajada, não o intermediário
+                    prompt = dict(prompt, previous=first["previous"])
+                kept[index] = ("upsert", prompt, kept[index][2])
+                continue
+            if renaming:
+                last_upsert.pop(original_name, None)
+            last_upsert[name] = len(kept)
+        else:
+            last_upsert.pop(op[1], None)
+        kept.append(op)
+    return kept
+
+
+def apply_ops(backend, ops):
+    """Persist ``ops`` through ``backend``, in one batch when it supports it."""
+    batch = getattr(backend, "record_batch", None)
+    if batch is not None:
+        batch(ops)
+        return
+    for op in ops:
+        if op[0] == "upsert":
+            backend.record_upsert(op[1], op[2])
+        else:
+            backend.record_delete(op[1])
+
+
+def op_name(op):
+    return op[1]["name"] if op[0] == "upsert" else op[1]
+
+
+class WriteQueue:
+    """
+    Single background writer for a storage backend.
+
+    Operations run on one worker thread strictly in submission order; each
+    wake-up drains everything queued, coalesces it and writes it as one batch.
+    ``on_written(names)`` / ``on_error(message)`` are called from the worker
+    thread. A failed batch stays at the head of the queue and is retried on
+    the next submit, ``flush()`` or ``close()``; after ``MAX_ATTEMPTS``
+    failures its operations are written one at a time and those that still
+    fail are set aside in ``dropped`` and reported, so later writes go on.
+    """
+
+    def __init__(self, backend, on_written=None, on_error=None, coalesce_ms=COALESCE_MS):
+        self.backend = backend
+        self.on_written = on_written
+        self.on_error = on_error
+        self.coalesce_ms = coalesce_ms
+        self.dropped = []  # Operações abandonadas depois de MAX_ATTEMPTS falhas
+        self._ops = deque()
+        self._busy = False
+        self._failed = False
+        self._attempts = 0  # Falhas seguidas do lote na frente da fila
+        self._closed = False
+        self._flushing = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="prompt-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, op):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("A fila de gravação já foi encerrada.")
+            self._ops.append(op)
+            self._failed = False
+            self._cond.notify_all()
+
+    def submit_many(self, ops):
+        """Queue several operations at once (a bulk import) for the same batch."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("A fila de gravação já foi encerrada.")
+            self._ops.extend(ops)
+            self._failed = False
+            self._cond.notify_all()
+
+    def pending(self):
+        """Number of operations not yet on disk (including one being written)."""
+        with self._cond:
+            return len(self._ops) + (1 if self._busy else 0)
+
+    def flush(self, timeout=None):
+        """Block until everything submitted so far is written (or has failed)."""
+        with self._cond:
+            self._failed = False
+            self._flushing = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._failed or (not self._ops and not self._busy), timeout)
+            self._flushing = False
+            return done and not self._failed
+
+    def close(self):
+        """
+        Write what is left and stop the worker. Operations that still fail
+        are set aside and reported to ``on_error`` (raised when there is none).
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if not self._ops:
+            return
+        # Última tentativa na própria thread
+        ops = coalesce(list(self._ops))
+        self._ops.clear()
+        try:
+            apply_ops(self.backend, ops)
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(str(e))
+            self._write_each(ops)
+
+    def _write_each(self, ops):
+        """Write ``ops`` one at a time, setting aside those that fail; returns the names written."""
+        written = []
+        for op in ops:
+            try:
+                apply_ops(self.backend, [op])
+            except Exception as e:
+                self.dropped.append(op)
+                logger.error("Gravação de '%s' abandonada: %s", op_name(op), e)
+                if self.on_error:
+                    self.on_error(f"'{op_name(op)}' não foi gravado e foi deixado de lado: {e}")
+                continue
+            written.append(op_name(op))
+        return written
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or (self._ops and not self._failed))
+                if self._closed:
+                    return
+                # Dá tempo para a rajada terminar, a menos que alguém espere pelo flush
+                if not self._flushing:
+                    self._cond.wait_for(lambda: self._closed or self._flushing, self.coalesce_ms / 1000)
+                    if self._closed:
+                        return
+                ops = list(self._ops)
+                self._ops.clear()
+                self._busy = True
+
+            written = [op_name(op) for op in ops]
+            try:
+                with span("gravação.lote", ops=len(ops)):
+                    apply_ops(self.backend, coalesce(ops))
+            except Exception as e:
+                self._attempts += 1
+                if self._attempts < MAX_ATTEMPTS:
+                    with self._cond:
+                        self._ops.extendleft(reversed(ops))  # Mantém a ordem para a próxima tentativa
+                        self._busy = False
+                        self._failed = True
+                        self._cond.notify_all()
+                    if self.on_error:
+                        self.on_error(str(e))
+                    continue
+                # Falha persistente: grava o que puder, sem travar a fila para sempre
+                written = self._write_each(coalesce(ops))
+            self._attempts = 0
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+            if self.on_written and written:
+                self.on_written(written)